@@ -0,0 +1,276 @@
+"""
+過去データ一括取得モジュール
+長期間の日足を期間指定のチャンクに分けて並行取得し、重複を除いた連続した系列として保存（チェックポイントから再開）
+"""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta, timezone
+
+from release_calendar import to_market_time
+
+# 取得できる系列: 名前 → (取得元, シンボル・シリーズID, 既定の開始日)
+SOURCES = {
+    'sp500': ('yahoo', '^GSPC', date(1950, 1, 3)),
+    'vix': ('yahoo', '^VIX', date(1990, 1, 2)),
+    'treasury_10y': ('fred', 'DGS10', date(1962, 1, 2)),
+    'treasury_30y': ('fred', 'DGS30', date(1977, 2, 15)),
+    'vix_fred': ('fred', 'VIXCLS', date(1990, 1, 2))
+}
+
+# チャンクの境界の基準日（開始日・終了日を変えても同じ境界になり、チェックポイントを使い回せる）
+CHUNK_ORIGIN = date(1900, 1, 1)
+
+
+def split_range(start, end, chunk_days):
+    """
+    期間を含むチャンクを CHUNK_ORIGIN から chunk_days 日ごとの境界で列挙
+    
+    最初と最後のチャンクは期間の外まで含む（境界を期間で切らないため、同じチャンクは常に同じ範囲になる）
+    
+    Args:
+        start: 開始日（含む）
+        end: 終了日（含む）
+        chunk_days: 1チャンクの日数
+    
+    Returns:
+        list: (開始日, 終了日) のリスト（両端を含む、古い順）
+    """
+    chunks = []
+    offset = (start - CHUNK_ORIGIN).days // chunk_days * chunk_days
+    chunk_start = CHUNK_ORIGIN + timedelta(days=offset)
+    while chunk_start <= end:
+        chunk_end = chunk_start + timedelta(days=chunk_days - 1)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def merge_bars(chunks):
+    """
+    チャンクの日足を日付で重複排除して結合（同じ日付は後のチャンクの値を使う）
+    
+    Args:
+        chunks: (日付, 値) のリストのリスト（古いチャンクから順）
+    
+    Returns:
+        list: (日付, 値) のリスト（古い順）
+    """
+    merged = {}
+    for bars in chunks:
+        merged.update(bars)
+    return sorted(merged.items())
+
+
+def find_gaps(bars, max_days):
+    """
+    日足の間隔が max_days 日を超える箇所
+    
+    Returns:
+        list: (前の日付, 次の日付) のリスト
+    """
+    gaps = []
+    for (previous, _), (current, _) in zip(bars, bars[1:]):
+        if (date.fromisoformat(current) - date.fromisoformat(previous)).days > max_days:
+            gaps.append((previous, current))
+    return gaps
+
+
+class BarBackfill:
+    """
+    日足の一括取得
+    
+    チャンクごとに取得が終わるとチェックポイント（<名前>.chunks/<開始日>_<終了日>.json）に保存し、
+    中断後の再実行では保存済みのチャンクを取得しない。
+    直近 SETTLE_DAYS 日を含むチャンクは公表の遅れ・修正がありうるため保存せず、毎回取得する。
+    日足が1本もなかったチャンクも一時的な空の応答の可能性があるため保存しない
+    """
+    
+    # 1チャンクの日数・同時に取得するチャンク数
+    CHUNK_DAYS = 365
+    WORKERS = 4
+    
+    # チャンクの取得に失敗した場合の再試行回数と待ち時間（秒、回数ごとに倍）
+    RETRIES = 3
+    RETRY_DELAY = 2.0
+    
+    # 日足の間隔がこれを超えたら欠落として報告（日、2001年9月の休場は7日）
+    GAP_DAYS = 10
+    
+    # 終了日からこの日数が経ったチャンクのみチェックポイントに保存
+    SETTLE_DAYS = 7
+    
+    def __init__(self, fetcher, output_dir, chunk_days=None, workers=None):
+        """
+        Args:
+            fetcher: DataFetcher
+            output_dir: 出力先（<名前>.csv とチェックポイント）
+            chunk_days: 1チャンクの日数
+            workers: 同時に取得するチャンク数
+        """
+        self.fetcher = fetcher
+        self.output_dir = output_dir
+        self.chunk_days = chunk_days or self.CHUNK_DAYS
+        self.workers = workers or self.WORKERS
+    
+    def series_path(self, name):
+        """結合した系列の保存先"""
+        return os.path.join(self.output_dir, f"{name}.csv")
+    
+    def checkpoint_path(self, name, start, end):
+        """チャンクのチェックポイントの保存先"""
+        return os.path.join(self.output_dir, f"{name}.chunks", f"{start}_{end}.json")
+    
+    def _fetch_chunk(self, name, start, end):
+        """1チャンクを取得（今日より先は取得しない、失敗時は RETRIES 回まで再試行）"""
+        source, symbol, _ = SOURCES[name]
+        end = min(end, to_market_time(datetime.now(timezone.utc)).date())
+        for attempt in range(self.RETRIES + 1):
+            try:
+                if source == 'yahoo':
+                    return self.fetcher.fetch_yahoo_bars(symbol, start, end)
+                return self.fetcher.fetch_fred_range(symbol, start, end)
+            except Exception:
+                if attempt == self.RETRIES:
+                    raise
+                time.sleep(self.RETRY_DELAY * 2 ** attempt)
+    
+    def _save_checkpoint(self, path, bars):
+        """チェックポイントを保存（一時ファイル経由で置き換え）"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(bars, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    
+    def _load_checkpoint(self, path):
+        """チェックポイントを読み込み（ない・壊れている場合は None）"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return [tuple(bar) for bar in json.load(f)]
+        except (OSError, ValueError):
+            return None
+    
+    def run(self, name, start=None, end=None):
+        """
+        系列を取得して <名前>.csv に保存
+        
+        Args:
+            name: SOURCES の名前
+            start: 開始日（省略時は SOURCES の既定値）
+            end: 終了日（省略時は今日）
+        
+        Returns:
+            dict: path, bars, chunks, resumed（チェックポイントを使ったチャンク数）, failed, gaps, seconds
+        
+        Raises:
+            KeyboardInterrupt: 中断（取得済みのチャンクはチェックポイントに保存済み）
+        """
+        source, symbol, default_start = SOURCES[name]
+        today = to_market_time(datetime.now(timezone.utc)).date()
+        start = start or default_start
+        end = min(end or today, today)
+        
+        chunks = split_range(start, end, self.chunk_days)
+        results = {}
+        for chunk in chunks:
+            bars = self._load_checkpoint(self.checkpoint_path(name, *chunk))
+            if bars is not None:
+                results[chunk] = bars
+        resumed = len(results)
+        
+        print(
+            f"📥 {name}（{symbol}）{start}〜{end}: {len(chunks)}チャンク"
+            f"（保存済み {resumed}・同時 {self.workers}）"
+        )
+        
+        failed = []
+        fetched_bars = 0
+        origin = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='backfill')
+        try:
+            running = {
+                executor.submit(self._fetch_chunk, name, *chunk): chunk
+                for chunk in chunks if chunk not in results
+            }
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = running.pop(future)
+                    try:
+                        bars = future.result()
+                    except Exception as e:
+                        failed.append(chunk)
+                        print(f"⚠️  {name} {chunk[0]}〜{chunk[1]} 取得失敗: {e}")
+                        continue
+                    
+                    results[chunk] = bars
+                    fetched_bars += len(bars)
+                    if bars and (today - chunk[1]).days > self.SETTLE_DAYS:
+                        self._save_checkpoint(self.checkpoint_path(name, *chunk), bars)
+                    
+                    elapsed = time.perf_counter() - origin
+                    print(
+                        f"   [{len(results)}/{len(chunks)}] {chunk[0]}〜{chunk[1]} {len(bars)}本"
+                        f"（{fetched_bars / elapsed:,.0f}本/秒・{(len(results) - resumed) / elapsed:.1f}チャンク/秒）"
+                    )
+        finally:
+            # Ctrl+C などで中断した場合は未着手のチャンクを取り消す（完了分は保存済み）
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        report = {
+            'path': self.series_path(name),
+            'bars': 0,
+            'chunks': len(chunks),
+            'resumed': resumed,
+            'failed': sorted(failed),
+            'gaps': [],
+            'seconds': time.perf_counter() - origin
+        }
+        if failed:
+            return report
+        
+        # チャンクのうち期間外の日足は除く
+        bars = [
+            bar for bar in merge_bars(results[chunk] for chunk in chunks)
+            if start.isoformat() <= bar[0] <= end.isoformat()
+        ]
+        report['bars'] = len(bars)
+        report['gaps'] = find_gaps(bars, self.GAP_DAYS)
+        
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp_path = f"{report['path']}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('date,value\n')
+            f.writelines(f"{day},{value}\n" for day, value in bars)
+        os.replace(tmp_path, report['path'])
+        
+        return report
+
+
+def load_bars(path):
+    """
+    保存した系列を読み込み
+    
+    Returns:
+        list: (日付, 値) のリスト（古い順）
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        next(f, None)
+        return [(day, float(value)) for day, value in (line.rstrip('\n').split(',') for line in f)]
+
+
+# テスト用
+if __name__ == "__main__":
+    print("\n=== チャンク分割 ===")
+    for chunk in split_range(date(1990, 1, 2), date(1993, 6, 30), 365):
+        print(f"{chunk[0]} 〜 {chunk[1]}")
+    
+    print("\n=== 重複排除 ===")
+    bars = merge_bars([
+        [('1990-01-02', 17.24), ('1990-01-03', 18.19)],
+        [('1990-01-03', 18.19), ('1990-01-04', 19.22)]
+    ])
+    print(bars)
@@ -0,0 +1,962 @@
+"""
+ベンチマークモジュール
+ローカルのSlackスタブに大量の通知を送り、スループット・レイテンシ・再試行・レート制限遵守を計測
+"""
+
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+from channels import SlackChannel
+from slack_stub import SlackStubServer
+from templates import PLACEHOLDER
+
+# テンプレートのベンチマーク用のダミー結果
+SAMPLE_RESULT = {
+    'total_score': 72.5,
+    'status': {'level': 'alert', 'label': '警戒', 'emoji': '🚨', 'color': '#ef4444'},
+    'category_scores': {'interest_rate': {'total': 68.3}, 'risk_off': {'total': 75.2}},
+    'boost_conditions': {'boost_applied': True, 'boost_multiplier': 1.15, 'conditions': ['金利2週連続急低下']},
+    'signals': ['10年債低水準 (3.2%)', '金利急低下 (-0.8%)', 'VIX上昇 (22.5)', 'S&P500 200日線割れ (-5.2%)']
+}
+SAMPLE_PREVIOUS = {
+    'total_score': 58.2,
+    'status': {'level': 'precursor', 'label': '前兆', 'emoji': '⚠️', 'color': '#f59e0b'}
+}
+SAMPLE_CHARTS = {
+    'score-30d': {'label': 'TMFスコア', 'path': 'charts/score-30d.svg', 'hash': '0123456789ab'},
+    'vix-30d': {'label': 'VIX', 'path': 'charts/vix-30d.svg', 'hash': 'ba9876543210'}
+}
+
+
+def percentile(values, p):
+    """パーセンタイル（最近順位法）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def bench_notifier(messages=2000, concurrency=4, stub_rate=200.0, client_rate=None,
+                   slow_rate=0.01, slow_delay=0.2, error_rate=0.01, seed=0):
+    """
+    通知チャネルの送信経路（レート制限・再試行込み）をSlackスタブに対して計測
+    
+    Args:
+        messages: 送信するメッセージ数
+        concurrency: 同時送信数
+        stub_rate: スタブの1秒あたり受付上限
+        client_rate: チャネル側のレート制限（省略時は stub_rate と同じ）
+        slow_rate: スタブが遅延応答する割合
+        slow_delay: 遅延応答の遅延（秒）
+        error_rate: スタブが5xxを返す割合
+        seed: 乱数シード
+    
+    Returns:
+        dict: 計測結果
+    """
+    client_rate = client_rate or stub_rate
+    
+    with SlackStubServer(
+        rate_limit=stub_rate,
+        slow_rate=slow_rate,
+        slow_delay=slow_delay,
+        error_rate=error_rate,
+        seed=seed
+    ) as stub:
+        channel = SlackChannel(stub.url, rate_limit=client_rate)
+        payloads = [
+            {'blocks': [{'type': 'section', 'text': {'type': 'mrkdwn', 'text': f"ベンチマーク #{i}"}}]}
+            for i in range(messages)
+        ]
+        
+        def send(i):
+            start = time.perf_counter()
+            ok = channel.send(payloads[i], idempotency_key=f"bench-{i}")
+            return ok, time.perf_counter() - start
+        
+        # 失敗時のログは計測のノイズになるため抑止
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(send, range(messages)))
+            elapsed = time.perf_counter() - start
+        
+        channel.close()
+        latencies = [latency for _, latency in results]
+        peak = stub.max_rate(1.0)
+        
+        return {
+            'messages': messages,
+            'elapsed': elapsed,
+            'throughput': messages / elapsed,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'max_ms': max(latencies) * 1000,
+            'sent': sum(1 for ok, _ in results if ok),
+            'failed': sum(1 for ok, _ in results if not ok),
+            'retries': channel.stats['retries'],
+            'rate_limited': stub.stats['rate_limited'],
+            'server_errors': stub.stats['errors'],
+            'duplicates': stub.stats['duplicates'],
+            'peak_per_second': peak,
+            'stub_rate': stub_rate,
+            'client_rate': client_rate,
+            'compliant': stub.stats['rate_limited'] == 0
+        }
+
+
+def _fill_naive(node, rendered):
+    """比較用: 入れ子のブロックを毎回組み立て直してスロットを埋める（従来の f-string 方式相当）"""
+    if isinstance(node, dict):
+        return {key: _fill_naive(value, rendered) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_fill_naive(value, rendered) for value in node]
+    if isinstance(node, str):
+        return PLACEHOLDER.sub(lambda m: rendered[m.group(1)], node)
+    return node
+
+
+def bench_templates(iterations=20000):
+    """
+    通知メッセージ1通あたりの構築コストを計測
+    
+    - 組み立て直し: ブロックの辞書を毎回組み立てて json.dumps（従来方式相当）
+    - テンプレート: コンパイル済みテンプレートにスロットを埋めてbytesを生成
+    - 構築全体: SlackNotifier._build_message（スロット値の計算 + JSON + テキスト）
+    
+    Returns:
+        dict: {メッセージ種別: {方式: µs/通}}
+    """
+    from notify import SlackNotifier, message_template
+    
+    notifier = SlackNotifier('http://127.0.0.1/', channels=[])
+    now = datetime.now()
+    variants = {
+        'ステータス変化': (['status_change'], None),
+        '定期サマリー': (['daily_summary'], SAMPLE_CHARTS),
+        '統合': (['status_change', 'daily_summary'], SAMPLE_CHARTS)
+    }
+    
+    def timed(func):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) / iterations * 1e6
+    
+    report = {}
+    for name, (kinds, charts) in variants.items():
+        template = message_template(tuple(kinds), bool(charts))
+        values = {
+            'status_emoji': '🚨', 'status_label': '警戒', 'score': 72.5, 'dashboard_url': 'https://example.github.io/tmf-monitor/',
+            **notifier._status_change_values(SAMPLE_RESULT, SAMPLE_PREVIOUS, now),
+            **notifier._daily_summary_values(SAMPLE_RESULT, SAMPLE_PREVIOUS, now),
+            'chart_links': 'TMFスコア / VIX'
+        }
+        
+        def naive():
+            rendered = {slot_name: slot.render(values[slot_name]) for slot_name, slot in template.slots.items()}
+            return json.dumps({'blocks': _fill_naive(template.blocks, rendered)}, ensure_ascii=False).encode('utf-8')
+        
+        assert json.loads(naive()) == json.loads(template.render(values))
+        
+        report[name] = {
+            '組み立て直し': timed(naive),
+            'テンプレート': timed(lambda: template.render(values)),
+            '構築全体': timed(lambda: notifier._build_message(kinds, SAMPLE_RESULT, SAMPLE_PREVIOUS, 'https://example.github.io/tmf-monitor/', charts, now))
+        }
+    
+    notifier.close()
+    return report
+
+
+# 起動時間の予算（インタプリタ自体の起動を除いた ms）
+STARTUP_BUDGET_MS = 60
+
+# 軽いコマンドで読み込まれてはいけないモジュール
+STARTUP_FORBIDDEN = ('requests', 'urllib3', 'data_fetch', 'channels', 'notify', 'render', 'scoring')
+
+# 計測するコマンド（main.py への引数）
+STARTUP_COMMANDS = (('show',), ('--help',))
+
+
+def bench_startup(runs=10, budget_ms=STARTUP_BUDGET_MS):
+    """
+    main.py の軽いコマンドの起動時間と読み込まれたモジュールを計測
+    
+    別プロセスで実行し、`python -c pass` との差（インポートと処理の時間）を予算と比較する
+    
+    Args:
+        runs: 各コマンドの実行回数（中央値を使用）
+        budget_ms: 許容する起動時間（ms）
+    
+    Returns:
+        dict: {'baseline_ms', 'commands': {コマンド: {'ms', 'overhead_ms', 'forbidden'}}, 'ok'}
+    """
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    
+    def timed(args):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+    
+    with tempfile.TemporaryDirectory() as docs_dir:
+        data = {
+            'last_updated': datetime.now().isoformat(),
+            'score': SAMPLE_RESULT['total_score'],
+            'status': SAMPLE_RESULT['status'],
+            'category_scores': SAMPLE_RESULT['category_scores'],
+            'signals': SAMPLE_RESULT['signals']
+        }
+        with open(os.path.join(docs_dir, 'data.json'), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        
+        baseline = timed([sys.executable, '-c', 'pass'])
+        commands = {}
+        for command in STARTUP_COMMANDS:
+            args = [sys.executable, main_path, *command]
+            if command[0] == 'show':
+                args += ['--docs-dir', docs_dir]
+            
+            # -X importtime の出力（"import time: self | cumulative | name"）から読み込まれたモジュールを取得
+            trace = subprocess.run(
+                [sys.executable, '-X', 'importtime', *args[1:]],
+                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True
+            )
+            modules = {
+                line.rsplit('|', 1)[1].strip()
+                for line in trace.stderr.splitlines()
+                if line.startswith('import time:') and '|' in line
+            }
+            
+            ms = timed(args)
+            commands[' '.join(command)] = {
+                'ms': ms,
+                'overhead_ms': ms - baseline,
+                'forbidden': sorted(name for name in STARTUP_FORBIDDEN if name in modules)
+            }
+    
+    return {
+        'baseline_ms': baseline,
+        'budget_ms': budget_ms,
+        'commands': commands,
+        'ok': all(c['overhead_ms'] <= budget_ms and not c['forbidden'] for c in commands.values())
+    }
+
+
+def sample_data(days=730):
+    """
+    APIサーバーのベンチマーク用の data.json と日次履歴（SAMPLE_RESULT を日ごとに変化させたもの）
+    
+    Returns:
+        tuple: (最新の data.json, 日次データのリスト)
+    """
+    first = date(2024, 1, 1)
+    history = []
+    for i in range(days):
+        score = round(SAMPLE_RESULT['total_score'] + 20 * ((i * 37) % 100 - 50) / 50, 1)
+        history.append({
+            'last_updated': f"{first + timedelta(days=i)}T22:00:00",
+            'date': str(first + timedelta(days=i)),
+            'score': score,
+            'status': SAMPLE_RESULT['status'],
+            'category_scores': SAMPLE_RESULT['category_scores'],
+            'boost_conditions': SAMPLE_RESULT['boost_conditions'],
+            'signals': SAMPLE_RESULT['signals'],
+            'raw_data': {'treasury_10y': 3.2, 'treasury_30y': 3.7, 'vix': 22.5}
+        })
+    return history[-1], history
+
+
+def _run_api_server(days, ready):
+    """ベンチマーク用のAPIサーバー（別プロセスで実行）"""
+    from server import APIServer, ResultCache
+    
+    data, history = sample_data(days)
+    cache = ResultCache()
+    cache.set_history(history)
+    cache.update(data)
+    
+    server = APIServer(cache, port=0)
+    ready.put(server.url)
+    server.serve_forever()
+
+
+def bench_server(requests_total=20000, concurrency=8, days=730, gzip_rate=0.5, revalidate_rate=0.3):
+    """
+    APIサーバーのスループットとレイテンシを計測
+    
+    サーバーは別プロセス（クライアントとGILを共有しない）で起動し、
+    クライアントはキープアライブの接続を concurrency 本使って
+    /score・/status・/indicators・/history を順に要求する。
+    一部は gzip を受け付け、一部は前回のETagで再検証（304）する
+    
+    Args:
+        requests_total: リクエスト数
+        concurrency: 同時接続数
+        days: 履歴の日数
+        gzip_rate: Accept-Encoding: gzip を付ける割合
+        revalidate_rate: If-None-Match を付ける割合
+    
+    Returns:
+        dict: 計測結果
+    """
+    paths = ('/score', '/status', '/indicators', '/history?from=2025-06-01&to=2025-06-30', '/history')
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run_api_server, args=(days, ready), daemon=True)
+    process.start()
+    
+    try:
+        host, port = ready.get(timeout=30).rsplit('/', 1)[1].split(':')
+        per_connection = requests_total // concurrency
+        
+        def client(worker):
+            connection = http.client.HTTPConnection(host, int(port))
+            etags = {}
+            latencies = []
+            counts = {'200': 0, '304': 0, 'gzip': 0, 'bytes': 0, 'errors': 0}
+            for i in range(per_connection):
+                n = worker * per_connection + i
+                path = paths[n % len(paths)]
+                headers = {}
+                if (n * 7919) % 100 < gzip_rate * 100:
+                    headers['Accept-Encoding'] = 'gzip'
+                if path in etags and (n * 104729) % 100 < revalidate_rate * 100:
+                    headers['If-None-Match'] = etags[path]
+                
+                start = time.perf_counter()
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+                latencies.append(time.perf_counter() - start)
+                
+                if response.status == 200:
+                    counts['200'] += 1
+                    etags[path] = response.getheader('ETag')
+                    counts['gzip'] += response.getheader('Content-Encoding') == 'gzip'
+                elif response.status == 304:
+                    counts['304'] += 1
+                else:
+                    counts['errors'] += 1
+                counts['bytes'] += len(body)
+            connection.close()
+            return latencies, counts
+        
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(client, range(concurrency)))
+        elapsed = time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.join()
+    
+    latencies = [latency for worker_latencies, _ in results for latency in worker_latencies]
+    totals = {key: sum(counts[key] for _, counts in results) for key in results[0][1]}
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'cpus': len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count(),
+        'elapsed': elapsed,
+        'throughput': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        **totals
+    }
+
+
+# ベンチマークスイートのフィクスチャとベースラインの置き場所
+BENCH_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench')
+FIXTURE_DIR = os.path.join(BENCH_DIR, 'fixtures')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+# ベースラインから何%遅くなったら失敗とするか
+SUITE_TOLERANCE_PCT = 50
+
+
+def write_fixtures(fixture_dir=FIXTURE_DIR, seed=42):
+    """
+    スイート用の合成フィクスチャを生成（同じシードなら同じ内容）
+    
+    - fred_DGS10.csv: 1962年からの日次（約1.6万行、祝日は "."）
+    - yahoo_gspc_1y.json: Chart API の1年分（range=1y, interval=1d と同じ構造）
+    """
+    import random
+    
+    rng = random.Random(seed)
+    os.makedirs(fixture_dir, exist_ok=True)
+    
+    lines = ['observation_date,DGS10']
+    value = 4.06
+    day = date(1962, 1, 2)
+    while day <= date(2025, 12, 31):
+        if day.weekday() < 5:
+            if rng.random() < 0.04:
+                lines.append(f"{day},.")
+            else:
+                value = min(16.0, max(0.5, value + rng.gauss(0, 0.05)))
+                lines.append(f"{day},{value:.2f}")
+        day += timedelta(days=1)
+    with open(os.path.join(fixture_dir, 'fred_DGS10.csv'), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    
+    timestamps, quote = [], {'open': [], 'high': [], 'low': [], 'close': [], 'volume': []}
+    price = 4700.0
+    day = date(2025, 1, 2)
+    while len(timestamps) < 251:
+        if day.weekday() < 5:
+            open_price = price
+            price *= 1 + rng.gauss(0.0003, 0.01)
+            timestamps.append(int(datetime(day.year, day.month, day.day, 14, 30, tzinfo=timezone.utc).timestamp()))
+            quote['open'].append(open_price)
+            quote['high'].append(max(open_price, price) * (1 + abs(rng.gauss(0, 0.003))))
+            quote['low'].append(min(open_price, price) * (1 - abs(rng.gauss(0, 0.003))))
+            quote['close'].append(price)
+            quote['volume'].append(rng.randint(2_000_000_000, 6_000_000_000))
+        day += timedelta(days=1)
+    # 取引時間中の最終行のように欠損を含める
+    for series in quote.values():
+        series[-1] = None
+    
+    chart = {
+        'chart': {
+            'result': [{
+                'meta': {
+                    'currency': 'USD', 'symbol': '^GSPC', 'exchangeName': 'SNP', 'instrumentType': 'INDEX',
+                    'firstTradeDate': -1325583000, 'regularMarketTime': timestamps[-1], 'gmtoffset': -18000,
+                    'timezone': 'EST', 'exchangeTimezoneName': 'America/New_York',
+                    'regularMarketPrice': quote['close'][-2], 'chartPreviousClose': quote['close'][0],
+                    'priceHint': 2, 'dataGranularity': '1d', 'range': '1y',
+                    'validRanges': ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
+                },
+                'timestamp': timestamps,
+                'indicators': {'quote': [quote], 'adjclose': [{'adjclose': quote['close']}]}
+            }],
+            'error': None
+        }
+    }
+    with open(os.path.join(fixture_dir, 'yahoo_gspc_1y.json'), 'w', encoding='utf-8') as f:
+        json.dump(chart, f, separators=(',', ':'))
+    
+    return sorted(os.listdir(fixture_dir))
+
+
+def suite_cases(fixture_dir=FIXTURE_DIR, work_dir=None):
+    """
+    スイートの計測対象（フィクスチャを読み込み、ネットワーク・Slackなしで実行できる形にしたもの）
+    
+    Args:
+        fixture_dir: フィクスチャのディレクトリ
+        work_dir: 出力先（save_data_json / generate_dashboard_html 用）
+    
+    Returns:
+        dict: {ケース名: 引数なしの関数}
+    """
+    from data_fetch import DataFetcher, extract_chart_arrays, parse_fred_csv, summarize_closes, summarize_sp500
+    from metrics import Metrics
+    from notify import SlackNotifier
+    from quality import QualityGate
+    from render import DashboardRenderer
+    from scoring import TMFScorer
+    
+    with open(os.path.join(fixture_dir, 'fred_DGS10.csv'), 'r', encoding='utf-8') as f:
+        fred_csv = f.read()
+    with open(os.path.join(fixture_dir, 'yahoo_gspc_1y.json'), 'r', encoding='utf-8') as f:
+        yahoo_json = f.read()
+    # 期間を指定した取得（SP500_WINDOW_DAYS 日分・調整後終値なし）の応答
+    period2 = json.loads(yahoo_json)['chart']['result'][0]['timestamp'][-1] + 86400
+    yahoo_lean = narrow_chart(yahoo_json.encode('utf-8'), period2 - DataFetcher.SP500_WINDOW_DAYS * 86400, period2)
+    
+    def raw_data():
+        rows = parse_fred_csv(fred_csv)
+        current, past = rows[-1][1], rows[-11][1]
+        return {
+            'timestamp': '2025-12-31T22:00:00',
+            'date': '2025-12-31',
+            'indicators': {
+                'treasury_10y': current,
+                'treasury_30y': round(current + 0.45, 2),
+                'vix': 22.5,
+                'sp500': summarize_sp500(json.loads(yahoo_json)),
+                'treasury_10y_change': {
+                    'current': current,
+                    'past': past,
+                    'change_pct': round((current - past) / past * 100, 2),
+                    'weeks': 2
+                }
+            }
+        }
+    
+    metrics = Metrics()
+    scorer = TMFScorer(metrics=metrics)
+    notifier = SlackNotifier('http://127.0.0.1/', channels=[])
+    renderer = DashboardRenderer(metrics=metrics)
+    raw = raw_data()
+    result = scorer.calculate_score(raw)
+    kinds = ['status_change', 'daily_summary']
+    now = datetime(2025, 12, 31, 22, 0)
+    url = 'https://example.github.io/tmf-monitor/'
+    data_path = os.path.join(work_dir, 'data.json')
+    html_path = os.path.join(work_dir, 'index.html')
+    
+    # 直近60日分の採用値を持つ品質チェック（フィクスチャの10年債から作成）
+    gate = QualityGate()
+    gate.seed([
+        {'date': f"2025-{10 + i // 30:02d}-{i % 30 + 1:02d}", 'raw_data': {
+            'treasury_10y': value,
+            'treasury_30y': round(value + 0.45, 2),
+            'vix': round(20 + i % 7 * 0.3, 2),
+            'sp500': {'price': 5000.0 + i * 3}
+        }}
+        for i, (_, value) in enumerate(parse_fred_csv(fred_csv)[-61:-1])
+    ])
+    
+    def end_to_end():
+        current = scorer.calculate_score(raw_data())
+        notifier._build_message(kinds, current, SAMPLE_PREVIOUS, url, SAMPLE_CHARTS, now)
+        renderer.save_data_json(current, data_path)
+    
+    return {
+        'fred_csv_parse': lambda: parse_fred_csv(fred_csv),
+        'yahoo_chart_parse': lambda: summarize_sp500(json.loads(yahoo_json)),
+        'yahoo_chart_extract': lambda: summarize_closes(
+            [close for close in extract_chart_arrays(yahoo_lean)['close'] if close is not None]
+        ),
+        'calculate_score': lambda: scorer.calculate_score(raw),
+        'quality_gate': lambda: gate.check(raw),
+        'notify_build': lambda: notifier._build_message(kinds, result, SAMPLE_PREVIOUS, url, SAMPLE_CHARTS, now),
+        'save_data_json': lambda: renderer.save_data_json(result, data_path),
+        'generate_dashboard_html': lambda: renderer.generate_dashboard_html(html_path),
+        'end_to_end': end_to_end
+    }
+
+
+def _reference_workload():
+    """マシンの速さの基準にする処理（文字列・辞書・浮動小数点の混在した純Python処理）"""
+    table = {}
+    for i in range(2000):
+        key = f"{i:05d}"
+        table[key] = float(key) * 1.5
+    return sum(value for key, value in table.items() if key[-1] != '0')
+
+
+def run_suite(cases=None, repeat=7):
+    """
+    スイートを実行
+    
+    各ケースは timeit で0.2秒以上かかる回数を求め、repeat 回計測した最小値を1回あたりの時間とする。
+    共有マシンでは実行ごとにCPUの速さが変わるため、各ケースの直前に基準処理も計測し、
+    その比（normalized）でベースラインと比較する
+    
+    Args:
+        cases: 実行するケース名（省略時は全ケース）
+        repeat: 計測の繰り返し回数
+    
+    Returns:
+        dict: {'python', 'platform', 'cases': {ケース名: µs/回}, 'normalized': {ケース名: 基準処理との比}}
+    """
+    import platform
+    import timeit
+    
+    def measure(func):
+        timer = timeit.Timer(func)
+        loops, _ = timer.autorange()
+        return min(timer.repeat(repeat, loops)) / loops * 1e6
+    
+    with tempfile.TemporaryDirectory() as work_dir, open(os.devnull, 'w') as devnull:
+        # 保存・生成のログは計測のノイズになるため抑止
+        with contextlib.redirect_stdout(devnull):
+            available = suite_cases(work_dir=work_dir)
+            report = {}
+            normalized = {}
+            for name, func in available.items():
+                if cases and name not in cases:
+                    continue
+                reference = measure(_reference_workload)
+                report[name] = measure(func)
+                normalized[name] = report[name] / reference
+    
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cases': report,
+        'normalized': normalized
+    }
+
+
+def compare_baseline(report, baseline, tolerance_pct=None):
+    """
+    ベースラインと比較
+    
+    変化率は基準処理との比（normalized）で判定する
+    
+    Returns:
+        list: (ケース名, ベースライン µs, 今回 µs, 変化率%, 回帰したか) のリスト
+    """
+    tolerance_pct = baseline.get('tolerance_pct', SUITE_TOLERANCE_PCT) if tolerance_pct is None else tolerance_pct
+    rows = []
+    for name, current in report['cases'].items():
+        previous = baseline.get('cases', {}).get(name)
+        previous_ratio = baseline.get('normalized', {}).get(name)
+        if previous is None or previous_ratio is None:
+            rows.append((name, None, current, None, False))
+            continue
+        change = (report['normalized'][name] - previous_ratio) / previous_ratio * 100
+        rows.append((name, previous, current, change, change > tolerance_pct))
+    return rows
+
+
+def narrow_chart(chart, period1, period2, adjclose=False):
+    """
+    Chart API の応答を period1〜period2 の日足に絞る（期間を指定した取得の応答を再現）
+    
+    Args:
+        chart: 応答の本文（bytes、フィクスチャの1年分）
+        period1, period2: 期間（UNIX秒）
+        adjclose: 調整後終値を含めるか（includeAdjustedClose）
+    
+    Returns:
+        bytes: 絞った応答
+    """
+    chart = json.loads(chart)
+    result = chart['chart']['result'][0]
+    keep = [i for i, stamp in enumerate(result['timestamp']) if period1 <= stamp < period2]
+    quote = {key: [values[i] for i in keep] for key, values in result['indicators']['quote'][0].items()}
+    indicators = {'quote': [quote]}
+    if adjclose:
+        indicators['adjclose'] = [{'adjclose': quote['close']}]
+    result = dict(result, timestamp=[result['timestamp'][i] for i in keep], indicators=indicators)
+    result['meta'] = dict(result['meta'], range='')
+    return json.dumps({'chart': {'result': [result], 'error': None}}, separators=(',', ':')).encode('utf-8')
+
+
+class _FixtureResponse:
+    """_FixtureSession の応答（requests.Response のうち DataFetcher が使う部分）"""
+    
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+    
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+    
+    def json(self):
+        return json.loads(self.content)
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class _FixtureSession:
+    """
+    フィクスチャを返す requests.Session の代わり（リクエスト数・受信バイト数を数える）
+    
+    FREDは ETag による条件付きGETに対応し、Yahoo は range=1d なら現在値だけの応答、
+    period1/period2 の指定があればその期間の日足だけの応答を返す
+    """
+    
+    def __init__(self, fixture_dir=FIXTURE_DIR):
+        import hashlib
+        
+        with open(os.path.join(fixture_dir, 'fred_DGS10.csv'), 'rb') as f:
+            self.fred = f.read()
+        with open(os.path.join(fixture_dir, 'yahoo_gspc_1y.json'), 'rb') as f:
+            self.chart = f.read()
+        self.fred_etag = f'"{hashlib.sha256(self.fred).hexdigest()[:16]}"'
+        self.meta = json.loads(self.chart)['chart']['result'][0]['meta']
+        self.headers = {}
+        self.requests = {'fred': 0, 'yahoo': 0}
+        self.bytes = 0
+    
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests['fred' if 'fred' in url else 'yahoo'] += 1
+        if 'fred' in url:
+            if (headers or {}).get('If-None-Match') == self.fred_etag:
+                return _FixtureResponse(304)
+            response = _FixtureResponse(200, self.fred, {'ETag': self.fred_etag})
+        elif (params or {}).get('range') == '1d':
+            meta = dict(self.meta, regularMarketPrice=18.5 if 'VIX' in url else self.meta['regularMarketPrice'])
+            response = _FixtureResponse(200, json.dumps({'chart': {'result': [{'meta': meta}], 'error': None}}).encode('utf-8'))
+        elif 'period1' in (params or {}):
+            adjclose = params.get('includeAdjustedClose') != 'false'
+            response = _FixtureResponse(200, narrow_chart(self.chart, params['period1'], params['period2'], adjclose))
+        else:
+            response = _FixtureResponse(200, self.chart)
+        self.bytes += len(response.content)
+        return response
+
+
+def bench_intraday(minutes=390, interval=60, fixture_dir=FIXTURE_DIR):
+    """
+    取引時間中に interval 秒ごとに取得した場合のリクエスト数・受信バイト数を比較（時刻は仮想）
+    
+    - naive: 毎回新しい DataFetcher で fetch_all_data（キャッシュなし）
+    - daemon: 常駐モード（条件付きGET）
+    - intraday: 高頻度モード（日次の指標は公表時刻までキャッシュ、現在値のみ取得）
+    
+    Returns:
+        dict: {方式: {'requests', 'fred', 'yahoo', 'bytes', 'runs'}}
+    """
+    from data_fetch import DataFetcher
+    
+    # 2026-01-05（月）9:30 ニューヨーク時間から
+    start = datetime(2026, 1, 5, 14, 30, tzinfo=timezone.utc).timestamp()
+    runs = minutes * 60 // interval
+    report = {}
+    
+    for mode in ('naive', 'daemon', 'intraday'):
+        session = _FixtureSession(fixture_dir)
+        clock = [start]
+        fetcher = None
+        for i in range(runs):
+            if fetcher is None or mode == 'naive':
+                fetcher = DataFetcher()
+                fetcher.session = session
+                fetcher.clock = lambda: clock[0]
+                fetcher.REQUEST_INTERVAL = 0
+                fetcher.intraday = mode == 'intraday'
+            clock[0] = start + i * interval
+            with contextlib.redirect_stdout(io.StringIO()):
+                fetcher.fetch_all_data()
+        report[mode] = {
+            'requests': sum(session.requests.values()),
+            **session.requests,
+            'bytes': session.bytes,
+            'runs': runs
+        }
+    
+    return report
+
+
+def bench_yahoo(fixture_dir=FIXTURE_DIR, repeat=7):
+    """
+    S&P500の日足の取得方法を比較（フィクスチャ）
+    
+    - full: range=1y の応答全体を response.json() で読み、summarize_sp500
+    - lean: SP500_WINDOW_DAYS 日分・調整後終値なしの応答から timestamp と close だけを取り出す
+    
+    Returns:
+        dict: {方式: {'bytes', 'bars', 'parse_us'}, 'same_result': 結果が一致したか}
+    """
+    import timeit
+    from data_fetch import DataFetcher, extract_chart_arrays, summarize_closes, summarize_sp500
+    
+    with open(os.path.join(fixture_dir, 'yahoo_gspc_1y.json'), 'rb') as f:
+        full = f.read()
+    stamps = json.loads(full)['chart']['result'][0]['timestamp']
+    period2 = stamps[-1] + 86400
+    lean = narrow_chart(full, period2 - DataFetcher.SP500_WINDOW_DAYS * 86400, period2)
+    
+    def parse_full():
+        return summarize_sp500(json.loads(full))
+    
+    def parse_lean():
+        return summarize_closes([close for close in extract_chart_arrays(lean)['close'] if close is not None])
+    
+    report = {}
+    for name, body, func in (('full', full, parse_full), ('lean', lean, parse_lean)):
+        timer = timeit.Timer(func)
+        loops, _ = timer.autorange()
+        report[name] = {
+            'bytes': len(body),
+            'bars': len(extract_chart_arrays(body)['close']),
+            'parse_us': min(timer.repeat(repeat, loops)) / loops * 1e6
+        }
+    report['same_result'] = parse_full() == parse_lean()
+    return report
+
+
+def print_notifier_report(name, report):
+    """bench_notifier の結果を表示"""
+    print(f"\n=== {name} ===")
+    print(f"送信: {report['sent']}/{report['messages']}件（失敗 {report['failed']}件） {report['elapsed']:.2f}秒")
+    print(f"スループット: {report['throughput']:.1f}件/秒")
+    print(f"レイテンシ: p50 {report['p50_ms']:.1f}ms / p99 {report['p99_ms']:.1f}ms / 最大 {report['max_ms']:.1f}ms")
+    print(f"再試行: {report['retries']}回（429: {report['rate_limited']}回 / 5xx: {report['server_errors']}回 / 重複受信: {report['duplicates']}件）")
+    print(
+        f"レート: 上限 {report['stub_rate']:g}件/秒・送信側 {report['client_rate']:g}件/秒 → "
+        f"最大 {report['peak_per_second']}件/1秒 "
+        f"{'✅ 429なし' if report['compliant'] else '⚠️ 429あり（Retry-After に従って再送）'}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='TMF監視 ベンチマーク')
+    subparsers = parser.add_subparsers(dest='target', required=True)
+    
+    notifier = subparsers.add_parser('notifier', help='通知送信（Slackスタブ）')
+    notifier.add_argument('--messages', type=int, default=2000)
+    notifier.add_argument('--concurrency', type=int, default=4)
+    notifier.add_argument('--stub-rate', type=float, default=200.0, help='スタブの1秒あたり受付上限')
+    notifier.add_argument('--client-rate', type=float, help='送信側のレート制限（省略時はスタブと同じ）')
+    notifier.add_argument('--slow-rate', type=float, default=0.01)
+    notifier.add_argument('--error-rate', type=float, default=0.01)
+    
+    templates = subparsers.add_parser('templates', help='通知メッセージの構築（マイクロベンチマーク）')
+    templates.add_argument('--iterations', type=int, default=20000)
+    
+    server = subparsers.add_parser('server', help='HTTP APIサーバー（ETag・gzip込み）')
+    server.add_argument('--requests', type=int, default=20000)
+    server.add_argument('--concurrency', type=int, default=8)
+    server.add_argument('--days', type=int, default=730, help='履歴の日数')
+    
+    fixtures = subparsers.add_parser('fixtures', help='スイート用の合成フィクスチャを生成（bench/fixtures）')
+    fixtures.add_argument('--seed', type=int, default=42)
+    
+    suite = subparsers.add_parser('suite', help='ホットパスのスイート（ベースラインから回帰していれば終了コード1）')
+    suite.add_argument('--case', action='append', help='実行するケース（複数指定可、省略時は全ケース）')
+    suite.add_argument('--repeat', type=int, default=7)
+    suite.add_argument('--tolerance', type=float, help=f'許容する悪化率（%%、既定はベースラインの値または {SUITE_TOLERANCE_PCT}）')
+    suite.add_argument('--update-baseline', action='store_true', help='今回の結果をベースラインとして保存')
+    
+    intraday = subparsers.add_parser('intraday', help='高頻度モードのリクエスト数（フィクスチャ・仮想時刻）')
+    intraday.add_argument('--minutes', type=int, default=390, help='シミュレートする時間（分、既定は取引時間）')
+    intraday.add_argument('--interval', type=int, default=60, help='取得間隔（秒）')
+    
+    subparsers.add_parser('yahoo', help='S&P500の日足の取得（1年分の全体解析と期間指定・終値のみの比較）')
+    
+    startup = subparsers.add_parser('startup', help='軽いコマンドの起動時間（予算超過・重いモジュールの読み込みで終了コード1）')
+    startup.add_argument('--runs', type=int, default=10)
+    startup.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    
+    args = parser.parse_args(argv)
+    
+    if args.target == 'fixtures':
+        for name in write_fixtures(seed=args.seed):
+            print(f"✅ フィクスチャ生成: {os.path.join(FIXTURE_DIR, name)}")
+    
+    if args.target == 'suite':
+        report = run_suite(args.case, args.repeat)
+        
+        if args.update_baseline:
+            # ベースラインは3回の中央値（1回だけだと計測時のノイズがそのまま基準になる）
+            reports = [report] + [run_suite(args.case, args.repeat) for _ in range(2)]
+            report = {
+                **report,
+                'cases': {name: statistics.median(r['cases'][name] for r in reports) for name in report['cases']},
+                'normalized': {name: statistics.median(r['normalized'][name] for r in reports) for name in report['normalized']}
+            }
+            baseline = {'tolerance_pct': args.tolerance or SUITE_TOLERANCE_PCT, **report}
+            with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+                json.dump(baseline, f, ensure_ascii=False, indent=2)
+                f.write('\n')
+            print(f"✅ ベースライン保存: {BASELINE_PATH}")
+        
+        try:
+            with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError):
+            baseline = {}
+        
+        if baseline and baseline.get('platform') != report['platform']:
+            print(f"⚠️  ベースラインの計測環境が異なります: {baseline.get('platform')} / Python {baseline.get('python')}")
+        
+        rows = compare_baseline(report, baseline, args.tolerance)
+        
+        # 一時的な負荷による誤検出を避けるため、回帰したケースはもう一度計測して確認
+        regressed = [name for name, *_, is_regressed in rows if is_regressed]
+        if regressed:
+            print(f"🔁 再計測: {', '.join(regressed)}")
+            retry = run_suite(regressed, args.repeat)
+            report['cases'].update(retry['cases'])
+            report['normalized'].update(retry['normalized'])
+            rows = compare_baseline(report, baseline, args.tolerance)
+        
+        print(f"\n=== ベンチマークスイート（µs/回） ===")
+        for name, previous, current, change, regressed in rows:
+            if previous is None:
+                print(f"ℹ️  {name:<24} {current:>12.1f}（ベースラインなし）")
+            else:
+                mark = '❌' if regressed else '✅'
+                print(f"{mark} {name:<24} {current:>12.1f}  ベースライン {previous:>12.1f}  {change:+6.1f}%")
+        if any(regressed for *_, regressed in rows):
+            sys.exit(1)
+    
+    if args.target == 'server':
+        report = bench_server(args.requests, args.concurrency, args.days)
+        print(f"\n=== APIサーバー（CPU {report['cpus']}コア、同時接続 {report['concurrency']}） ===")
+        print(f"リクエスト: {report['requests']}件 {report['elapsed']:.2f}秒 → {report['throughput']:.0f}件/秒")
+        print(f"レイテンシ: p50 {report['p50_ms']:.2f}ms / p99 {report['p99_ms']:.2f}ms")
+        print(
+            f"応答: 200 {report['200']}件（gzip {report['gzip']}件） / 304 {report['304']}件 / "
+            f"エラー {report['errors']}件 / 受信 {report['bytes'] / 1024:.0f}KB"
+        )
+    
+    if args.target == 'intraday':
+        report = bench_intraday(args.minutes, args.interval)
+        naive = report['naive']
+        print(f"\n=== 高頻度モード（{args.minutes}分・{args.interval}秒ごと、{naive['runs']}回） ===")
+        for mode, label in (('naive', '毎回取得'), ('daemon', '常駐（条件付きGET）'), ('intraday', '高頻度モード')):
+            row = report[mode]
+            print(
+                f"{label:<14} リクエスト {row['requests']:>6}件（1/{naive['requests'] / max(row['requests'], 1):.1f}・"
+                f"FRED {row['fred']:>5} / Yahoo {row['yahoo']:>5}）  "
+                f"受信 {row['bytes'] / 1024:>9.0f}KB（1/{naive['bytes'] / max(row['bytes'], 1):.0f}）"
+            )
+    
+    if args.target == 'yahoo':
+        report = bench_yahoo()
+        full, lean = report['full'], report['lean']
+        print("\n=== S&P500日足（Yahoo Chart API） ===")
+        for name, label in (('full', 'range=1y・全体を解析'), ('lean', '期間指定・終値のみ')):
+            row = report[name]
+            print(f"{label:<20} {row['bytes'] / 1024:>7.1f}KB  {row['bars']:>4}本  解析 {row['parse_us']:>8.1f}µs")
+        print(
+            f"削減: {(full['bytes'] - lean['bytes']) / 1024:.1f}KB（{1 - lean['bytes'] / full['bytes']:.0%}）・"
+            f"解析 {full['parse_us'] / lean['parse_us']:.1f}倍速  "
+            f"{'✅ 結果一致' if report['same_result'] else '❌ 結果不一致'}"
+        )
+        if not report['same_result']:
+            sys.exit(1)
+    
+    if args.target == 'startup':
+        report = bench_startup(args.runs, args.budget_ms)
+        print(f"\n=== 起動時間（python -c pass: {report['baseline_ms']:.1f}ms、予算 +{report['budget_ms']:g}ms） ===")
+        for command, timing in report['commands'].items():
+            mark = '✅' if timing['overhead_ms'] <= report['budget_ms'] and not timing['forbidden'] else '❌'
+            line = f"{mark} main.py {command}: {timing['ms']:.1f}ms（+{timing['overhead_ms']:.1f}ms）"
+            if timing['forbidden']:
+                line += f" 読み込み不要なモジュール: {', '.join(timing['forbidden'])}"
+            print(line)
+        if not report['ok']:
+            sys.exit(1)
+    
+    if args.target == 'templates':
+        print("\n=== 通知メッセージ構築（µs/通） ===")
+        for name, timings in bench_templates(args.iterations).items():
+            print(f"{name}: " + " / ".join(f"{method} {value:.1f}" for method, value in timings.items()))
+    
+    if args.target == 'notifier':
+        options = {
+            'messages': args.messages,
+            'concurrency': args.concurrency,
+            'stub_rate': args.stub_rate,
+            'slow_rate': args.slow_rate,
+            'error_rate': args.error_rate
+        }
+        if args.client_rate:
+            print_notifier_report('通知送信', bench_notifier(client_rate=args.client_rate, **options))
+        else:
+            print_notifier_report('通知送信（レート上限どおり）', bench_notifier(**options))
+            print_notifier_report('通知送信（上限の2倍で送信）', bench_notifier(client_rate=args.stub_rate * 2, **options))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,513 @@
+"""
+通知チャネルモジュール
+Slack・汎用JSON Webhook・メール（SMTPリレー）へ通知を並行配信
+"""
+
+import json
+import os
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from email.message import EmailMessage
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def blocks_to_text(blocks):
+    """Slack Block Kit のブロックからプレーンテキストを抽出（メール等のフォールバック用）"""
+    lines = []
+    for block in blocks:
+        if block.get('type') == 'divider':
+            lines.append('-' * 40)
+            continue
+        
+        texts = []
+        if 'text' in block:
+            texts.append(block['text']['text'])
+        texts.extend(field['text'] for field in block.get('fields', []))
+        texts.extend(element['text'] for element in block.get('elements', []) if 'text' in element)
+        
+        for text in texts:
+            lines.append(text.replace('*', ''))
+    
+    return '\n'.join(lines)
+
+
+class RetryableError(Exception):
+    """再試行で成功し得る送信失敗（429・5xx・接続エラー）"""
+    
+    def __init__(self, message, retry_after=None):
+        """
+        Args:
+            message: エラー内容
+            retry_after: 送信先が指定した再試行までの秒数（Retry-After）
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """トークンバケット方式のレート制限"""
+    
+    def __init__(self, rate, burst=1):
+        """
+        Args:
+            rate: 1秒あたりの許可数
+            burst: 連続で許可する最大数
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self, timeout):
+        """
+        トークンを1つ取得（timeout 秒以内に取得できなければFalse）
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now < self._paused_until:
+                    wait_time = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                else:
+                    wait_time = (1 - self._tokens) / self.rate
+            
+            if now + wait_time > deadline:
+                return False
+            time.sleep(wait_time)
+    
+    def pause(self, seconds):
+        """
+        指定秒数は許可しない（送信先から Retry-After を受けた場合）
+        
+        再開後にまとめて送らないよう、貯まっていたトークンも破棄する
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class NotificationChannel:
+    """
+    通知チャネルの基底クラス
+    
+    サブクラスは format（通知→送信内容）と _deliver（1通送信）を実装する
+    """
+    
+    # 1通あたりのタイムアウト（秒）
+    TIMEOUT = 10
+    
+    # 1秒あたりの送信上限
+    RATE_LIMIT = 1.0
+    
+    # 429・5xx・接続エラー時の再試行回数と初回の待ち時間（秒、再試行ごとに倍）
+    MAX_RETRIES = 2
+    RETRY_DELAY = 0.5
+    
+    # 計測（NotificationDispatcher が設定、未設定なら stats のみ）
+    metrics = None
+    
+    def __init__(self, name, timeout=None, rate_limit=None):
+        """
+        Args:
+            name: チャネル名（送信待ちキューのディレクトリ名にも使用）
+            timeout: 1通あたりのタイムアウト（秒）
+            rate_limit: 1秒あたりの送信上限
+        """
+        self.name = name
+        self.timeout = timeout or self.TIMEOUT
+        self.rate_limiter = RateLimiter(rate_limit or self.RATE_LIMIT)
+        self.stats = {'sent': 0, 'failed': 0, 'retries': 0, 'rate_limited': 0}
+        self._stats_lock = threading.Lock()
+    
+    def format(self, notification):
+        """
+        通知をこのチャネルの送信内容に変換
+        
+        Args:
+            notification: {'body': SlackへのJSON（bytes）または 'blocks': Slackブロック,
+                           'text': 本文, 'data': 構造化データ}
+        
+        Returns:
+            JSONシリアライズ可能な送信内容、またはシリアライズ済みのbytes
+        """
+        raise NotImplementedError
+    
+    def send(self, payload, idempotency_key=None, timeout=None):
+        """
+        1通送信（レート制限を守り、失敗時はFalse）
+        
+        429・5xx・接続エラーはタイムアウトの範囲内で再試行する。
+        429の Retry-After はレート制限に反映し、同じチャネルの他の送信も待たせる
+        
+        Args:
+            payload: format の戻り値
+            idempotency_key: 冪等キー
+            timeout: 全体のタイムアウト（秒、省略時はチャネル既定値）
+        
+        Returns:
+            bool: 送信成功
+        """
+        timeout = min(timeout or self.timeout, self.timeout)
+        deadline = time.monotonic() + timeout
+        
+        for attempt in range(self.MAX_RETRIES + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.rate_limiter.acquire(remaining):
+                print(f"⏳ {self.name}: レート制限により送信を保留")
+                break
+            
+            try:
+                self._deliver(payload, idempotency_key, deadline - time.monotonic())
+                self._count('sent')
+                return True
+            except RetryableError as e:
+                error = e
+            except Exception as e:
+                print(f"❌ {self.name}: 通知送信失敗: {e}")
+                break
+            
+            if error.retry_after is not None:
+                self._count('rate_limited')
+                self.rate_limiter.pause(error.retry_after)
+                delay = error.retry_after
+            else:
+                delay = self.RETRY_DELAY * 2 ** attempt
+            
+            if attempt == self.MAX_RETRIES or time.monotonic() + delay >= deadline:
+                print(f"❌ {self.name}: 通知送信失敗: {error}")
+                break
+            
+            self._count('retries')
+            if error.retry_after is None:
+                time.sleep(delay)
+        
+        self._count('failed')
+        return False
+    
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+        if self.metrics is not None:
+            self.metrics.count(f"notify_{key}", channel=self.name)
+    
+    def _deliver(self, payload, idempotency_key, timeout):
+        raise NotImplementedError
+    
+    def close(self):
+        """接続などを解放"""
+        pass
+
+
+class _HTTPChannel(NotificationChannel):
+    """JSONをPOSTするチャネルの共通処理（接続プールを使い回す）"""
+    
+    def __init__(self, name, url, timeout=None, rate_limit=None):
+        super().__init__(name, timeout, rate_limit)
+        self.url = url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def _deliver(self, payload, idempotency_key, timeout):
+        headers = {'Content-Type': 'application/json'}
+        if idempotency_key:
+            headers['X-Idempotency-Key'] = idempotency_key
+        
+        # テンプレートで生成済みのbytesはシリアライズし直さずに送る
+        body = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        
+        try:
+            response = self.session.post(self.url, data=body, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise RetryableError(str(e))
+        
+        if response.status_code == 429:
+            retry_after = response.headers.get('Retry-After', '1')
+            raise RetryableError(
+                f"429 rate limited (Retry-After: {retry_after})",
+                retry_after=float(retry_after) if retry_after.replace('.', '', 1).isdigit() else 1.0
+            )
+        if response.status_code >= 500:
+            raise RetryableError(f"{response.status_code} {response.text[:100]}")
+        response.raise_for_status()
+    
+    def close(self):
+        self.session.close()
+
+
+class SlackChannel(_HTTPChannel):
+    """Slack Incoming Webhook（Block Kit）"""
+    
+    def __init__(self, webhook_url, name='slack', timeout=None, rate_limit=None):
+        super().__init__(name, webhook_url, timeout, rate_limit)
+    
+    def format(self, notification):
+        if 'body' in notification:
+            return notification['body']
+        return {'blocks': notification['blocks']}
+
+
+class WebhookChannel(_HTTPChannel):
+    """汎用JSON Webhook（ページャー連携など）"""
+    
+    def __init__(self, url, name='webhook', timeout=None, rate_limit=None):
+        super().__init__(name, url, timeout, rate_limit)
+    
+    def format(self, notification):
+        return {'text': notification['text'], **notification['data']}
+
+
+class EmailChannel(NotificationChannel):
+    """ローカルSMTPリレー経由のメール"""
+    
+    TIMEOUT = 15
+    
+    def __init__(self, host, recipients, sender, port=25, name='email', timeout=None, rate_limit=None):
+        """
+        Args:
+            host: SMTPリレーのホスト
+            recipients: 宛先のリスト
+            sender: 差出人
+            port: SMTPリレーのポート
+        """
+        super().__init__(name, timeout, rate_limit)
+        self.host = host
+        self.port = port
+        self.recipients = recipients
+        self.sender = sender
+    
+    def format(self, notification):
+        return {'subject': notification['data'].get('title', 'TMF監視'), 'body': notification['text']}
+    
+    def _deliver(self, payload, idempotency_key, timeout):
+        message = EmailMessage()
+        message['Subject'] = payload['subject']
+        message['From'] = self.sender
+        message['To'] = ', '.join(self.recipients)
+        if idempotency_key:
+            message['X-Idempotency-Key'] = idempotency_key
+        message.set_content(payload['body'])
+        
+        with smtplib.SMTP(self.host, self.port, timeout=timeout) as smtp:
+            smtp.send_message(message)
+
+
+def channels_from_env(slack_webhook_url=None):
+    """
+    環境変数から通知チャネルを構成
+    
+    - SLACK_WEBHOOK_URL: Slack
+    - ALERT_WEBHOOK_URL: 汎用JSON Webhook
+    - SMTP_HOST / SMTP_PORT / NOTIFY_EMAIL_TO / NOTIFY_EMAIL_FROM: メール
+    
+    Returns:
+        list: NotificationChannel のリスト
+    """
+    channels = []
+    
+    slack_url = slack_webhook_url or os.environ.get('SLACK_WEBHOOK_URL')
+    if slack_url:
+        channels.append(SlackChannel(slack_url))
+    
+    webhook_url = os.environ.get('ALERT_WEBHOOK_URL')
+    if webhook_url:
+        channels.append(WebhookChannel(webhook_url))
+    
+    smtp_host = os.environ.get('SMTP_HOST')
+    recipients = [r.strip() for r in os.environ.get('NOTIFY_EMAIL_TO', '').split(',') if r.strip()]
+    if smtp_host and recipients:
+        channels.append(EmailChannel(
+            smtp_host,
+            recipients,
+            os.environ.get('NOTIFY_EMAIL_FROM') or 'tmf-monitor@localhost',
+            port=int(os.environ.get('SMTP_PORT') or '25')
+        ))
+    
+    return channels
+
+
+def channels_from_config(config):
+    """
+    テナント設定から通知チャネルを構成
+    
+    URLは設定ファイルに書かず、環境変数名で指定する（SMTPサーバーは共通の環境変数を使う）
+    
+    - slack_webhook_env: Slack Webhook URL を持つ環境変数名
+    - webhook_env: 汎用JSON Webhook URL を持つ環境変数名
+    - email_to: メールの宛先（リストまたはカンマ区切り）
+    
+    Returns:
+        list: NotificationChannel のリスト
+    """
+    channels = []
+    
+    slack_url = os.environ.get(config['slack_webhook_env']) if config.get('slack_webhook_env') else None
+    if slack_url:
+        channels.append(SlackChannel(slack_url))
+    
+    webhook_url = os.environ.get(config['webhook_env']) if config.get('webhook_env') else None
+    if webhook_url:
+        channels.append(WebhookChannel(webhook_url))
+    
+    recipients = config.get('email_to') or []
+    if isinstance(recipients, str):
+        recipients = recipients.split(',')
+    recipients = [r.strip() for r in recipients if r.strip()]
+    smtp_host = os.environ.get('SMTP_HOST')
+    if smtp_host and recipients:
+        channels.append(EmailChannel(
+            smtp_host,
+            recipients,
+            os.environ.get('NOTIFY_EMAIL_FROM') or 'tmf-monitor@localhost',
+            port=int(os.environ.get('SMTP_PORT') or '25')
+        ))
+    
+    return channels
+
+
+class NotificationDispatcher:
+    """
+    通知を全チャネルへ並行配信するクラス
+    
+    チャネルごとに別スレッドで送信し、呼び出し元を待たせるのは budget 秒まで
+    （送信待ちキューがあれば、間に合わなかった分は次回以降に再送）
+    """
+    
+    def __init__(self, channels, outbox=None, metrics=None):
+        """
+        Args:
+            channels: NotificationChannel のリスト
+            outbox: NotificationOutbox（指定時は失敗分を保存して再送）
+            metrics: Metrics（チャネルごとの送信時間・再試行を記録）
+        """
+        self.channels = list(channels)
+        self.outbox = outbox
+        self.metrics = metrics
+        if metrics is not None:
+            for channel in self.channels:
+                channel.metrics = metrics
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, len(self.channels)) * 2,
+            thread_name_prefix='notify'
+        )
+    
+    def dispatch(self, notification, budget):
+        """
+        通知を全チャネルへ並行配信
+        
+        Args:
+            notification: {'blocks': ..., 'text': ..., 'data': ...}
+            budget: 呼び出し元を待たせる上限（秒）。各チャネルの送信もこの時間で打ち切る
+        
+        Returns:
+            dict: {チャネル名: 送信成功}（時間内に終わらなかった・キューに保存できなかったチャネルはFalse）
+        """
+        futures = {
+            channel.name: self._executor.submit(self._deliver, channel, channel.format(notification), budget)
+            for channel in self.channels
+        }
+        wait(futures.values(), timeout=budget)
+        
+        results = {}
+        for name, future in futures.items():
+            if not future.done():
+                print(f"⏳ {name}: 送信に{budget}秒以上かかっています（バックグラウンドで継続）")
+                results[name] = False
+                continue
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"❌ {name}: 通知送信失敗: {e}")
+                results[name] = False
+        return results
+    
+    def drain(self, budget):
+        """
+        送信待ちキューを全チャネル並行で再送
+        
+        Returns:
+            dict: 件数の合計（キューなしの場合はNone）
+        """
+        if self.outbox is None:
+            return None
+        
+        futures = [
+            self._executor.submit(self.outbox.drain, {channel.name: channel.send}, budget)
+            for channel in self.channels
+        ]
+        
+        totals = {'sent': 0, 'failed': 0, 'deferred': 0, 'dead': 0}
+        for future in futures:
+            for key, value in future.result().items():
+                totals[key] += value
+        return totals
+    
+    def start_background(self, interval, budget):
+        """送信待ちキューの定期再送を開始（キューなしの場合はNone）"""
+        if self.outbox is None:
+            return None
+        return self.outbox.start_background(
+            {channel.name: channel.send for channel in self.channels},
+            interval=interval,
+            budget=budget
+        )
+    
+    def close(self):
+        """スレッドと各チャネルの接続を解放"""
+        self._executor.shutdown(wait=True)
+        for channel in self.channels:
+            channel.close()
+    
+    def _deliver(self, channel, payload, budget):
+        """1チャネルへ budget 秒以内で送信（キューがあれば経由して順序を保つ）"""
+        if self.metrics is None:
+            return self._deliver_once(channel, payload, budget)
+        with self.metrics.span('notify_send', channel=channel.name):
+            return self._deliver_once(channel, payload, budget)
+    
+    def _deliver_once(self, channel, payload, budget):
+        if self.outbox is None:
+            sent = channel.send(payload, timeout=budget)
+        else:
+            key = self.outbox.enqueue(channel.name, payload)
+            self.outbox.drain({channel.name: channel.send}, budget=budget)
+            sent = self.outbox.is_delivered(channel.name, key)
+        
+        if sent:
+            print(f"✅ {channel.name}: 通知送信成功")
+            return True
+        if self.outbox is None:
+            return False
+        
+        print(f"⏳ {channel.name}: 送信待ちキューに保存しました（次回以降に再送）")
+        return False
+
+
+# テスト用
+if __name__ == "__main__":
+    channels = channels_from_env()
+    
+    print("\n=== 通知チャネル ===")
+    for channel in channels:
+        print(f"{channel.name}: {type(channel).__name__}（タイムアウト {channel.timeout}秒）")
+    if not channels:
+        print("環境変数 SLACK_WEBHOOK_URL / ALERT_WEBHOOK_URL / SMTP_HOST を設定してください")
+    
+    blocks = [
+        {"type": "header", "text": {"type": "plain_text", "text": "🚨 TMFステータス変化"}},
+        {"type": "section", "fields": [{"type": "mrkdwn", "text": "*スコア:*\n72.5点"}]},
+        {"type": "divider"}
+    ]
+    print(f"\nテキスト変換:\n{blocks_to_text(blocks)}")
@@ -4,18 +4,183 @@ FRED (米連邦準備銀行) とYahoo FinanceからTMF関連指標を取得
 """
 
 import requests
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
+import json
 import time
 
+from metrics import Metrics
+from release_calendar import ReleaseCalendar, to_market_time
+
+def parse_fred_csv(text):
+    """
+    FREDのCSVをパース（ヘッダーをスキップ、欠損値 "." は除外）
+    
+    Args:
+        text: fredgraph.csv の本文
+    
+    Returns:
+        list: (日付, 値) のリスト（古い順）
+    """
+    rows = []
+    for line in text.strip().split('\n')[1:]:
+        parts = line.split(',')
+        if len(parts) >= 2 and parts[1] != '.' and parts[1] != '':
+            rows.append((parts[0], float(parts[1])))
+    return rows
+
+
+def summarize_sp500(chart):
+    """
+    Yahoo Finance Chart API の応答から現在値・200日移動平均・乖離率を算出
+    
+    Args:
+        chart: Chart API のJSON（辞書）
+    
+    Returns:
+        dict: 現在値、200日移動平均、乖離率
+    """
+    # データ抽出
+    result = chart['chart']['result'][0]
+    closes = result['indicators']['quote'][0]['close']
+    
+    # None値を除外
+    return summarize_closes([c for c in closes if c is not None])
+
+
+def summarize_closes(valid_closes):
+    """
+    終値の列（古い順、最後が現在値）から現在値・200日移動平均・乖離率を算出
+    
+    Args:
+        valid_closes: 終値のリスト（None を含まない）
+    
+    Returns:
+        dict: 現在値、200日移動平均、乖離率
+    """
+    if len(valid_closes) < 200:
+        raise ValueError("Not enough data for 200-day MA calculation")
+    
+    current_price = valid_closes[-1]
+    ma_200 = sum(valid_closes[-200:]) / 200
+    deviation = ((current_price - ma_200) / ma_200) * 100
+    
+    return {
+        'price': round(current_price, 2),
+        'ma_200': round(ma_200, 2),
+        'deviation_pct': round(deviation, 2)
+    }
+
+
+def extract_chart_arrays(body, keys=('timestamp', 'close')):
+    """
+    Chart API の応答（bytes）から指定した配列だけを取り出す
+    
+    応答全体（meta・始値・高値・安値・出来高など）はオブジェクトにせず、
+    '"<キー>":[' から次の ']' までの数値の配列だけをJSONとして読む
+    
+    Args:
+        body: 応答の本文
+        keys: 取り出す配列のキー（数値と null だけの配列）
+    
+    Returns:
+        dict: {キー: リスト}
+    
+    Raises:
+        ValueError: キーが見つからない場合（エラー応答など）
+    """
+    arrays = {}
+    for key in keys:
+        marker = b'"' + key.encode('ascii') + b'":['
+        start = body.find(marker)
+        if start < 0:
+            raise ValueError(f"Chart API の応答に {key} がありません")
+        start += len(marker) - 1
+        end = body.index(b']', start)
+        arrays[key] = json.loads(body[start:end + 1])
+    return arrays
+
 
 class DataFetcher:
     """無料APIからデータを取得するクラス"""
     
-    def __init__(self):
+    # この秒数以内に取得したFREDシリーズは再取得しない（1回の実行内で同じシリーズを使い回す）
+    SERIES_FRESH_SECONDS = 60
+    
+    # キャッシュに保持するFREDシリーズの件数（最新から）
+    SERIES_KEEP = 400
+    
+    # 高頻度モードで取引時間中も変化する指標の再取得間隔（秒）
+    # ここにない指標（FREDの日次シリーズ）は次回の公表時刻までキャッシュを使う
+    # VIXはスコアの閾値（20）付近以外では数分の遅れが判定に影響しないため、S&P500より長くする
+    INTRADAY_TTL = {
+        'sp500': 60,
+        'vix': 300
+    }
+    
+    # 公表時刻を過ぎても更新がない場合、この秒数の間は FRED_RETRY_SECONDS ごとに確認する
+    FRED_LATE_WINDOW = 4 * 60 * 60
+    FRED_RETRY_SECONDS = 15 * 60
+    
+    # 続けてリクエストする際の間隔（秒）
+    REQUEST_INTERVAL = 0.5
+    
+    # S&P500の日足を取得する期間（暦日）。200日移動平均に必要な200営業日に祝日・余裕分を加えたもの
+    SP500_WINDOW_DAYS = 310
+    
+    def __init__(self, metrics=None):
+        """
+        Args:
+            metrics: Metrics（HTTPリクエストの所要時間・受信バイト数・キャッシュヒットを記録）
+        """
+        self.metrics = metrics or Metrics()
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'TMF-Monitor/1.0'
         })
+        
+        # 高頻度モード（常駐モードで取引時間中に短い間隔で実行する場合に有効化）
+        self.intraday = False
+        
+        # 現在時刻（UNIX秒）。キャッシュの鮮度判定に使う
+        self.clock = time.time
+        
+        # 公表カレンダー（次回の公表時刻までキャッシュを使う）と、取得した値の観測日
+        # {シリーズID: (観測日 'YYYY-MM-DD', Last-Modified)}
+        self.calendar = ReleaseCalendar()
+        self.observations = {}
+        
+        # FREDシリーズのキャッシュ {シリーズID: {'etag', 'last_modified', 'rows', 'fetched', 'fresh_until'}}
+        self._series = {}
+        
+        # 高頻度モードの現在値 {シンボル: (有効期限, 現在値, 取引日)} とS&P500の日足
+        self._quotes = {}
+        self._sp500_history = None
+        
+        # 前回の待機以降にリクエストしたか
+        self._requested = False
+    
+    def export_cache(self):
+        """FREDシリーズのキャッシュを保存用の辞書で取得"""
+        return {
+            series_id: {key: entry[key] for key in ('etag', 'last_modified', 'rows', 'fresh_until')}
+            for series_id, entry in self._series.items()
+        }
+    
+    def load_cache(self, cache):
+        """
+        export_cache で保存したキャッシュを復元
+        
+        次回の取得は条件付きGET（If-None-Match / If-Modified-Since）になり、
+        更新がなければ本文を受信せずにキャッシュを使う
+        """
+        for series_id, entry in cache.items():
+            self._series[series_id] = {
+                'etag': entry.get('etag'),
+                'last_modified': entry.get('last_modified'),
+                'rows': [tuple(row) for row in entry['rows']],
+                'fetched': 0.0,
+                'fresh_until': entry.get('fresh_until', 0.0)
+            }
     
     def fetch_all_data(self):
         """全ての必要なデータを取得"""
@@ -29,45 +194,50 @@ class DataFetcher:
         
         # 金利データ取得（FRED API - 無料、APIキー不要）
         try:
-            data['indicators']['treasury_10y'] = self._fetch_fred_data('DGS10')
+            with self.metrics.span('fetch', indicator='treasury_10y'):
+                data['indicators']['treasury_10y'] = self._fetch_fred_data('DGS10')
             print("✅ 10年国債利回り取得完了")
-            time.sleep(0.5)
+            self._pause()
         except Exception as e:
             print(f"⚠️  10年国債利回り取得失敗: {e}")
             data['indicators']['treasury_10y'] = None
         
         try:
-            data['indicators']['treasury_30y'] = self._fetch_fred_data('DGS30')
+            with self.metrics.span('fetch', indicator='treasury_30y'):
+                data['indicators']['treasury_30y'] = self._fetch_fred_data('DGS30')
             print("✅ 30年国債利回り取得完了")
-            time.sleep(0.5)
+            self._pause()
         except Exception as e:
             print(f"⚠️  30年国債利回り取得失敗: {e}")
             data['indicators']['treasury_30y'] = None
         
-        # VIXデータ取得（FRED）
+        # VIXデータ取得（FRED、高頻度モードではYahoo Financeの現在値）
         try:
-            data['indicators']['vix'] = self._fetch_fred_data('VIXCLS')
+            with self.metrics.span('fetch', indicator='vix'):
+                data['indicators']['vix'] = self._fetch_vix()
             print("✅ VIX取得完了")
-            time.sleep(0.5)
+            self._pause()
         except Exception as e:
             print(f"⚠️  VIX取得失敗: {e}")
             data['indicators']['vix'] = None
         
         # S&P500データ取得（Yahoo Finance - スクレイピング）
         try:
-            sp500_data = self._fetch_yahoo_sp500()
+            with self.metrics.span('fetch', indicator='sp500'):
+                sp500_data = self._fetch_sp500_intraday() if self.intraday else self._fetch_yahoo_sp500()
             data['indicators']['sp500'] = sp500_data
             print("✅ S&P500取得完了")
-            time.sleep(0.5)
+            self._pause()
         except Exception as e:
             print(f"⚠️  S&P500取得失敗: {e}")
             data['indicators']['sp500'] = None
         
         # 金利の変化率を計算
         try:
-            data['indicators']['treasury_10y_change'] = self._calculate_rate_change('DGS10')
+            with self.metrics.span('fetch', indicator='treasury_10y_change'):
+                data['indicators']['treasury_10y_change'] = self._calculate_rate_change('DGS10')
             print("✅ 10年債変化率計算完了")
-            time.sleep(0.5)
+            self._pause()
         except Exception as e:
             print(f"⚠️  10年債変化率計算失敗: {e}")
             data['indicators']['treasury_10y_change'] = None
@@ -75,6 +245,104 @@ class DataFetcher:
         print("✅ 全データ取得完了\n")
         return data
     
+    def _pause(self):
+        """直前にリクエストした場合のみ、次のリクエストまで間隔を空ける（キャッシュで済んだ場合は待たない）"""
+        if self._requested:
+            self._requested = False
+            time.sleep(self.REQUEST_INTERVAL)
+    
+    def _get(self, source, url, **kwargs):
+        """
+        HTTP GET（所要時間・ステータス・受信バイト数を計測）
+        
+        Args:
+            source: データソース名（計測のラベル）
+            url: URL
+            **kwargs: requests の引数
+        """
+        self._requested = True
+        try:
+            with self.metrics.span('http_request', source=source):
+                response = self.session.get(url, **kwargs)
+        except requests.RequestException:
+            self.metrics.count('http_errors', source=source)
+            raise
+        
+        self.metrics.count('http_requests', source=source, status=response.status_code)
+        self.metrics.count('http_response_bytes', len(response.content), source=source)
+        return response
+    
+    def _fetch_fred_series(self, series_id):
+        """
+        FREDからシリーズを取得（有効な値のみ、古い順）
+        
+        直近に取得済みならキャッシュを返し、それ以外は条件付きGETで更新を確認する。
+        高頻度モードでは次回の公表時刻までリクエストしない
+        
+        Args:
+            series_id: FREDのシリーズID
+        
+        Returns:
+            list: (日付, 値) のリスト
+        """
+        cached = self._series.get(series_id)
+        if cached and self.clock() - cached['fetched'] < self.SERIES_FRESH_SECONDS:
+            self.metrics.count('cache_hits', source='fred', kind='memory')
+            return self._observe(series_id, cached)
+        if cached and self.intraday and self.clock() < cached['fresh_until']:
+            self.metrics.count('cache_hits', source='fred', kind='fresh')
+            return self._observe(series_id, cached)
+        
+        url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
+        headers = {}
+        if cached and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+        
+        response = self._get('fred', url, headers=headers, timeout=10)
+        if response.status_code == 304 and cached:
+            self.metrics.count('cache_hits', source='fred', kind='not_modified')
+            cached['fetched'] = self.clock()
+            cached['fresh_until'] = self._fred_fresh_until(series_id, updated=False)
+            return self._observe(series_id, cached)
+        response.raise_for_status()
+        
+        rows = parse_fred_csv(response.text)
+        
+        self._series[series_id] = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'rows': rows[-self.SERIES_KEEP:],
+            'fetched': self.clock(),
+            'fresh_until': self._fred_fresh_until(series_id, updated=bool(cached) and cached['rows'][-1:] != rows[-1:])
+        }
+        return self._observe(series_id, self._series[series_id])
+    
+    def _observe(self, series_id, entry):
+        """取得したシリーズの最新の観測日を記録し、行を返す"""
+        if entry['rows']:
+            self.observations[series_id] = (entry['rows'][-1][0], entry['last_modified'])
+        return entry['rows']
+    
+    def _fred_fresh_until(self, series_id, updated):
+        """
+        FREDシリーズを再取得しなくてよい期限（UNIX秒）
+        
+        通常は次回の公表時刻まで。公表時刻を過ぎて間もないのに更新が確認できない場合は
+        公表が遅れている可能性があるため FRED_RETRY_SECONDS 後に再確認する
+        
+        Args:
+            series_id: FREDのシリーズID
+            updated: 今回の取得で最新の値が変わったか
+        """
+        now = datetime.fromtimestamp(self.clock(), timezone.utc)
+        previous = self.calendar.previous_release(series_id, now)
+        upcoming = self.calendar.next_release(series_id, now)
+        if not updated and (now - previous).total_seconds() < self.FRED_LATE_WINDOW:
+            return min(upcoming.timestamp(), now.timestamp() + self.FRED_RETRY_SECONDS)
+        return upcoming.timestamp()
+    
     def _fetch_fred_data(self, series_id, days_back=1):
         """
         FREDからデータを取得（APIキー不要の公開エンドポイント使用）
@@ -86,30 +354,14 @@ class DataFetcher:
         Returns:
             float: 最新の値
         """
-        # FREDの公開データエンドポイント（CSVフォーマット）
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days_back * 2)  # 余裕を持って取得
-        
-        url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
-        
         try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            # CSVをパース（最終行が最新データ）
-            lines = response.text.strip().split('\n')
-            if len(lines) < 2:
-                raise ValueError(f"No data returned for {series_id}")
-            
-            # 最終行から値を取得
-            for line in reversed(lines[1:]):  # ヘッダーをスキップ
-                parts = line.split(',')
-                if len(parts) >= 2 and parts[1] != '.' and parts[1] != '':
-                    value = float(parts[1])
-                    return value
-            
-            raise ValueError(f"No valid data found for {series_id}")
+            rows = self._fetch_fred_series(series_id)
+            if not rows:
+                raise ValueError(f"No valid data found for {series_id}")
             
+            # 最終行が最新データ
+            return rows[-1][1]
+        
         except Exception as e:
             raise Exception(f"FRED API error for {series_id}: {str(e)}")
     
@@ -120,43 +372,189 @@ class DataFetcher:
         Returns:
             dict: 現在値、200日移動平均、乖離率
         """
+        try:
+            stamps, closes = self._fetch_sp500_chart()
+            valid = [(stamp, close) for stamp, close in zip(stamps, closes) if close is not None]
+            if valid:
+                self.observations['SP500'] = (self._market_date(valid[-1][0]), None)
+            return summarize_closes([close for _, close in valid])
+        
+        except Exception as e:
+            raise Exception(f"Yahoo Finance API error: {str(e)}")
+    
+    def _fetch_sp500_chart(self):
+        """
+        S&P500の日足（200日移動平均に必要な SP500_WINDOW_DAYS 日分）
+        
+        期間は period1/period2 で指定し、調整後終値は要求しない。
+        応答からは timestamp と close の配列だけを取り出し、受信バイト数・解析時間を計測する
+        
+        Returns:
+            tuple: (UNIX秒のリスト, 終値のリスト（取引中・欠損は None）)
+        """
         symbol = "^GSPC"  # S&P500のシンボル
         
         # Yahoo Finance Chart API（公開エンドポイント）
         url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+        now = int(self.clock())
         params = {
             'interval': '1d',
-            'range': '1y'  # 200日移動平均計算用に1年分取得
+            'period1': now - self.SP500_WINDOW_DAYS * 86400,
+            'period2': now,
+            'includePrePost': 'false',
+            'includeAdjustedClose': 'false'
         }
         
+        response = self._get('yahoo', url, params=params, timeout=10)
+        response.raise_for_status()
+        
+        started = time.perf_counter()
         try:
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            # データ抽出
-            result = data['chart']['result'][0]
-            closes = result['indicators']['quote'][0]['close']
-            
-            # None値を除外
-            valid_closes = [c for c in closes if c is not None]
-            
-            if len(valid_closes) < 200:
-                raise ValueError("Not enough data for 200-day MA calculation")
-            
-            current_price = valid_closes[-1]
-            ma_200 = sum(valid_closes[-200:]) / 200
-            deviation = ((current_price - ma_200) / ma_200) * 100
+            arrays = extract_chart_arrays(response.content)
+        except ValueError:
+            # エラー応答は配列を含まないため、全体を読んでエラー内容を表示
+            raise ValueError(f"Chart API error: {(json.loads(response.content).get('chart') or {}).get('error')}")
+        parse_seconds = time.perf_counter() - started
+        
+        # 実際に受信したバイト数（range=1y との比較は benchmark.py yahoo で計測）
+        size = len(response.content)
+        self.metrics.add_span('parse', parse_seconds, source='yahoo')
+        self.metrics.gauge('yahoo_chart_bytes', size)
+        print(f"   S&P500日足: {len(arrays['close'])}本・受信 {size / 1024:.1f}KB・解析 {parse_seconds * 1000:.2f}ms")
+        return arrays['timestamp'], arrays['close']
+    
+    def fetch_yahoo_bars(self, symbol, start, end):
+        """
+        Yahoo Financeから期間を指定して日足の終値を取得（過去データの一括取得用）
+        
+        Args:
+            symbol: シンボル（例: '^GSPC'）
+            start: 開始日（date、含む）
+            end: 終了日（date、含む）
+        
+        Returns:
+            list: (日付 'YYYY-MM-DD'（ニューヨーク時間）, 終値) のリスト（古い順）
+        """
+        url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+        params = {
+            'interval': '1d',
+            'period1': int(datetime(start.year, start.month, start.day, tzinfo=timezone.utc).timestamp()),
+            'period2': int(datetime(end.year, end.month, end.day, tzinfo=timezone.utc).timestamp() + 86400)
+        }
+        
+        response = self._get('yahoo', url, params=params, timeout=30)
+        response.raise_for_status()
+        result = response.json()['chart']['result'][0]
+        
+        # 期間内に取引がない場合は timestamp がない
+        closes = result['indicators']['quote'][0].get('close', []) if result.get('timestamp') else []
+        return [
+            (self._market_date(stamp), round(close, 4))
+            for stamp, close in zip(result.get('timestamp', []), closes)
+            if close is not None
+        ]
+    
+    def fetch_fred_range(self, series_id, start, end):
+        """
+        FREDから期間を指定してシリーズを取得（過去データの一括取得用、キャッシュは使わない）
+        
+        Args:
+            series_id: FREDのシリーズID
+            start: 開始日（date、含む）
+            end: 終了日（date、含む）
+        
+        Returns:
+            list: (日付, 値) のリスト（古い順）
+        """
+        url = "https://fred.stlouisfed.org/graph/fredgraph.csv"
+        params = {'id': series_id, 'cosd': start.isoformat(), 'coed': end.isoformat()}
+        
+        response = self._get('fred', url, params=params, timeout=30)
+        response.raise_for_status()
+        return parse_fred_csv(response.text)
+    
+    def _fetch_yahoo_quote(self, symbol, ttl):
+        """
+        Yahoo Financeから現在値を取得（当日分のみの小さい応答、ttl 秒以内に取得済みならキャッシュを返す）
+        
+        Args:
+            symbol: シンボル（例: '^VIX'）
+            ttl: キャッシュの有効期間（秒）
+        
+        Returns:
+            tuple: (現在値, 取引日 'YYYY-MM-DD'（ニューヨーク時間）)
+        """
+        now = self.clock()
+        cached = self._quotes.get(symbol)
+        if cached and now < cached[0]:
+            self.metrics.count('cache_hits', source='yahoo', kind='fresh')
+            return cached[1:]
+        
+        url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+        response = self._get('yahoo', url, params={'interval': '1d', 'range': '1d'}, timeout=10)
+        response.raise_for_status()
+        meta = response.json()['chart']['result'][0]['meta']
+        
+        session = self._market_date(meta['regularMarketTime'])
+        self._quotes[symbol] = (now + ttl, meta['regularMarketPrice'], session)
+        return meta['regularMarketPrice'], session
+    
+    def _fetch_sp500_intraday(self):
+        """
+        高頻度モードのS&P500
+        
+        200日移動平均に使う日足は公表カレンダーの確定時刻までキャッシュし、
+        現在値だけを INTRADAY_TTL ごとに取得して当日分の終値として使う
+        
+        Returns:
+            dict: 現在値、200日移動平均、乖離率
+        """
+        try:
+            history = self._sp500_history
+            if history is None or self.clock() >= history['fresh_until']:
+                bars = [
+                    (self._market_date(stamp), close)
+                    for stamp, close in zip(*self._fetch_sp500_chart())
+                    if close is not None
+                ]
+                now = datetime.fromtimestamp(self.clock(), timezone.utc)
+                history = self._sp500_history = {
+                    'bars': bars,
+                    'fresh_until': self.calendar.next_release('SP500', now).timestamp()
+                }
+            else:
+                self.metrics.count('cache_hits', source='yahoo', kind='fresh')
             
-            return {
-                'price': round(current_price, 2),
-                'ma_200': round(ma_200, 2),
-                'deviation_pct': round(deviation, 2)
-            }
+            price, session = self._fetch_yahoo_quote('^GSPC', self.INTRADAY_TTL['sp500'])
             
+            # 取引中の日足（未確定）は除き、現在値を当日の終値とする
+            closes = [close for day, close in history['bars'] if day < session]
+            closes.append(price)
+            self.observations['SP500'] = (session, None)
+            return summarize_closes(closes)
+        
         except Exception as e:
             raise Exception(f"Yahoo Finance API error: {str(e)}")
     
+    @staticmethod
+    def _market_date(stamp):
+        """UNIX秒をニューヨーク時間の日付（'YYYY-MM-DD'）に変換"""
+        return to_market_time(datetime.fromtimestamp(stamp, timezone.utc)).strftime('%Y-%m-%d')
+    
+    def _fetch_vix(self):
+        """
+        VIXを取得（高頻度モードではYahoo Financeの現在値、取得できなければFREDの日次終値）
+        
+        Returns:
+            float: VIX
+        """
+        if self.intraday:
+            try:
+                return round(self._fetch_yahoo_quote('^VIX', self.INTRADAY_TTL['vix'])[0], 2)
+            except Exception as e:
+                print(f"⚠️  VIX現在値取得失敗（FREDの終値を使用）: {e}")
+        return self._fetch_fred_data('VIXCLS')
+    
     def _calculate_rate_change(self, series_id, weeks=2):
         """
         金利の変化率を計算（週次）
@@ -172,25 +570,14 @@ class DataFetcher:
             # 現在値
             current = self._fetch_fred_data(series_id, days_back=1)
             
-            # 週次データなので営業日を考慮
-            days_back = weeks * 7 + 5  # 余裕を持って取得
-            
-            # 過去データ取得
-            url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            lines = response.text.strip().split('\n')
+            # 過去データ（キャッシュ済みのシリーズを使い回す）
+            rows = self._fetch_fred_series(series_id)
             
             # 日付でソート済みなので最新から遡る
-            valid_data = []
-            for line in reversed(lines[1:]):
-                parts = line.split(',')
-                if len(parts) >= 2 and parts[1] != '.' and parts[1] != '':
-                    valid_data.append({
-                        'date': parts[0],
-                        'value': float(parts[1])
-                    })
+            valid_data = [
+                {'date': date, 'value': value}
+                for date, value in reversed(rows)
+            ]
             
             if len(valid_data) < weeks * 5:  # 週5営業日
                 raise ValueError("Not enough historical data")
@@ -205,7 +592,7 @@ class DataFetcher:
                 'change_pct': round(change_rate, 2),
                 'weeks': weeks
             }
-            
+        
         except Exception as e:
             raise Exception(f"Rate change calculation error: {str(e)}")
 
@@ -0,0 +1,136 @@
+"""
+履歴管理モジュール
+日次の実行結果をスナップショットとして保存・読み込み
+"""
+
+import json
+import os
+import re
+
+from models import TMFResult, dumps
+
+
+class HistoryStore:
+    """日次スナップショット（history/YYYY-MM-DD.json）を管理するクラス"""
+    
+    DATE_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2})\.json$')
+    
+    def __init__(self, history_dir):
+        """
+        Args:
+            history_dir: スナップショットの保存先ディレクトリ
+        """
+        self.history_dir = history_dir
+    
+    def snapshot_path(self, date):
+        """指定日のスナップショットのパス"""
+        return os.path.join(self.history_dir, f"{date}.json")
+    
+    def save(self, data):
+        """
+        1日分のデータを保存（同じ日付は上書き）
+        
+        Args:
+            data: data.json と同じ形式のデータ（'date' キー必須）
+        
+        Returns:
+            str: 保存先パス
+        """
+        os.makedirs(self.history_dir, exist_ok=True)
+        path = self.snapshot_path(data['date'])
+        
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(dumps(data))
+        os.replace(tmp_path, path)
+        
+        return path
+    
+    def dates(self):
+        """保存済みの日付一覧（昇順）"""
+        if not os.path.isdir(self.history_dir):
+            return []
+        
+        dates = []
+        for filename in os.listdir(self.history_dir):
+            match = self.DATE_PATTERN.match(filename)
+            if match:
+                dates.append(match.group(1))
+        
+        return sorted(dates)
+    
+    def load(self, date):
+        """指定日のデータを読み込み（存在しない場合はNone）"""
+        try:
+            with open(self.snapshot_path(date), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def load_range(self, start=None, end=None):
+        """
+        期間内のデータを日付順に読み込み
+        
+        Args:
+            start: 開始日（YYYY-MM-DD、省略時は最古）
+            end: 終了日（YYYY-MM-DD、省略時は最新）
+        
+        Returns:
+            list: データのリスト
+        """
+        results = []
+        for date in self.dates():
+            if start and date < start:
+                continue
+            if end and date > end:
+                continue
+            data = self.load(date)
+            if data is not None:
+                results.append(data)
+        
+        return results
+    
+    def recent(self, days):
+        """
+        直近の指定日数分のデータを日付順に読み込み
+        
+        Args:
+            days: 件数
+        
+        Returns:
+            list: データのリスト
+        """
+        results = []
+        for date in self.dates()[-days:]:
+            data = self.load(date)
+            if data is not None:
+                results.append(data)
+        
+        return results
+    
+    def load_results(self, start=None, end=None):
+        """
+        期間内のデータを TMFResult として読み込み（バックテスト等で大量に保持する用途）
+        
+        Args:
+            start: 開始日（YYYY-MM-DD、省略時は最古）
+            end: 終了日（YYYY-MM-DD、省略時は最新）
+        
+        Returns:
+            list: TMFResult のリスト
+        """
+        return [TMFResult.from_data_json(data) for data in self.load_range(start, end)]
+
+
+# テスト用
+if __name__ == "__main__":
+    import tempfile
+    
+    store = HistoryStore(tempfile.mkdtemp())
+    store.save({'date': '2024-01-01', 'score': 42.0})
+    store.save({'date': '2024-01-02', 'score': 45.5})
+    
+    print("\n=== 履歴 ===")
+    print(f"保存済み日付: {store.dates()}")
+    for data in store.load_range(start='2024-01-02'):
+        print(f"  {data['date']}: {data['score']}")
@@ -6,36 +6,142 @@
 import os
 import sys
 import json
-from datetime import datetime
+import signal
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 
-# モジュールをインポート
-from data_fetch import DataFetcher
-from scoring import TMFScorer
-from notify import SlackNotifier
-from render import DashboardRenderer
+# 各モジュール（requests 等を含む）は使う時点でインポートし、
+# show などの軽いコマンドは標準ライブラリだけで起動する
+
+
+class MonitorError(Exception):
+    """実行を中断するエラー（メッセージは表示済み）"""
+    pass
 
 
 class TMFMonitor:
     """TMF監視メインクラス"""
     
-    def __init__(self, docs_dir='docs'):
+    # 常駐モードの実行間隔（秒）: 市場時間外 / 米国市場の取引時間中
+    DAEMON_INTERVAL = 60 * 60
+    MARKET_INTERVAL = 5 * 60
+    
+    # 高頻度モードの取引時間中の実行間隔（秒）
+    INTRADAY_INTERVAL = 60
+    
+    # 公表待ち: 公表が近ければ待つ上限・公表が遅れている場合に再取得する間隔と上限（秒）
+    RELEASE_WAIT_LIMIT = 30 * 60
+    RELEASE_POLL_INTERVAL = 2 * 60
+    RELEASE_POLL_LIMIT = 20 * 60
+    
+    # パイプラインの同時実行ステージ数
+    PIPELINE_WORKERS = 6
+    
+    # 失敗したステージ → 表示（それ以外は「ファイル出力失敗」）
+    STAGE_ERRORS = {
+        'fetch': 'データ取得失敗',
+        'quality': 'データ品質チェック失敗',
+        'regime': '株債相関レジーム判定失敗',
+        'score': 'スコアリング失敗'
+    }
+    
+    def __init__(self, docs_dir='docs', state_dir=None, raw_input=None, tenants=None,
+                 profile=None, fetcher=None, metrics=None, wait_for_release=False, snapshot_path=None):
+        """
+        Args:
+            docs_dir: 公開ファイルの出力先
+            state_dir: 実行状態の保存先
+            raw_input: 保存済み指標データのパス（指定時はネットワークから取得しない）
+            tenants: 追加で実行するテナントの TenantProfile のリスト（データ取得は共有）
+            profile: このモニター自身の TenantProfile（テナントとして作られた場合）
+            fetcher: 共有する DataFetcher（テナント用）
+            metrics: 共有する Metrics（テナント用）
+            wait_for_release: 公表済みのはずの値が取得できない場合、しばらく再取得して待つ
+            snapshot_path: 実行状態スナップショットの保存先（指定時は実行ごとに書き出す）
+        """
+        from data_fetch import DataFetcher
+        from scoring import TMFScorer
+        from notify import SlackNotifier
+        from render import DashboardRenderer, ArchiveRenderer, ChartRenderer
+        from history import HistoryStore
+        from outbox import NotificationOutbox
+        from metrics import Metrics
+        from channels import channels_from_config
+        from release_calendar import ReleaseCalendar
+        from quality import QualityGate
+        from regime import RegimeEngine
+        
         self.docs_dir = docs_dir
+        self.tenant_profile = profile
+        # ステージ名の接頭辞（テナントは "<名前>:"）
+        self.stage_prefix = f"{profile.name}:" if profile else ''
+        self.raw_input = raw_input
+        self.wait_for_release = wait_for_release
+        self.snapshot_path = snapshot_path
+        # 公開しない実行状態（送信待ち通知など）の保存先。省略時は docs と同じ階層の state
+        self.state_dir = state_dir or default_state_dir(docs_dir)
         self.data_json_path = os.path.join(docs_dir, 'data.json')
         self.previous_data_path = os.path.join(docs_dir, 'previous.json')
         self.index_html_path = os.path.join(docs_dir, 'index.html')
+        self.daemon_state_path = os.path.join(self.state_dir, 'daemon.json')
+        
+        # 直近の結果（常駐モードでは previous.json を読み直さずに使う）と所要時間
+        self.last_result = None
+        self.last_report = None
+        
+        # HTTP APIサーバー（常駐モードで --serve 指定時、実行ごとにキャッシュを更新）
+        self.api_cache = None
+        self.api_server = None
         
         # GitHub PagesのベースURL（環境変数から取得、なければデフォルト）
         repo_name = os.environ.get('GITHUB_REPOSITORY', 'username/tmf-monitor')
         self.dashboard_url = f"https://{repo_name.split('/')[0]}.github.io/{repo_name.split('/')[1]}/"
         
-        # 各モジュールを初期化
-        self.fetcher = DataFetcher()
-        self.scorer = TMFScorer()
-        self.notifier = SlackNotifier()
-        self.renderer = DashboardRenderer()
+        # 各モジュールを初期化（計測は全モジュール・全テナントで共有し、実行ごとにリセット）
+        self.metrics = metrics or Metrics()
+        self.fetcher = fetcher or DataFetcher(metrics=self.metrics)
+        # 公表カレンダー（データを取得するモニターのみ。公表時刻の実績を state に保存）
+        self.calendar = None
+        if fetcher is None:
+            self.calendar = ReleaseCalendar(release_calendar_path(self.state_dir))
+            self.fetcher.calendar = self.calendar
+        # データ品質チェック（データを取得するモニターのみ。直近の採用値を state に保存）
+        self.quality = QualityGate(os.path.join(self.state_dir, 'quality.json')) if fetcher is None else None
+        # 株債相関レジーム（データを取得するモニターのみ。直近の日足の変化を state に保存）
+        self.regime = RegimeEngine(os.path.join(self.state_dir, 'regime.json')) if fetcher is None else None
+        self.scorer = TMFScorer(metrics=self.metrics, **(profile.scorer_options() if profile else {}))
+        self.notifier = SlackNotifier(
+            outbox=NotificationOutbox(os.path.join(self.state_dir, 'outbox')),
+            channels=channels_from_config(profile.channels) if profile else None,
+            metrics=self.metrics
+        )
+        self.renderer = DashboardRenderer(metrics=self.metrics)
+        self.history = HistoryStore(os.path.join(docs_dir, 'history'))
+        self.archive = ArchiveRenderer(os.path.join(docs_dir, 'archive'))
+        self.charts = ChartRenderer(docs_dir)
+        
+        # テナント: 出力先は docs 配下、実行状態は state/tenants/<名前>
+        self.tenants = [
+            TMFMonitor(
+                docs_dir=os.path.join(docs_dir, tenant.docs_dir),
+                state_dir=os.path.join(self.state_dir, 'tenants', tenant.name),
+                profile=tenant,
+                fetcher=self.fetcher,
+                metrics=self.metrics
+            )
+            for tenant in tenants or []
+        ]
+        for tenant in self.tenants:
+            tenant.dashboard_url = tenant.tenant_profile.dashboard_url or f"{self.dashboard_url}{tenant.tenant_profile.docs_dir.strip('/')}/"
     
     def load_previous_result(self):
         """前回実行結果を読み込み"""
+        if self.last_result is not None:
+            print("✅ 前回データ（メモリ上）を使用")
+            return self.last_result
+        
         if not os.path.exists(self.previous_data_path):
             print("ℹ️  前回データなし（初回実行）")
             return None
@@ -50,61 +156,348 @@ class TMFMonitor:
             return None
     
     def save_current_as_previous(self, result):
-        """現在の結果を前回データとして保存"""
+        """
+        現在の結果を前回データとして保存（保存済みデータの再実行では保存しない）
+        
+        Args:
+            result: TMFResult
+        
+        Returns:
+            dict: 保存した前回データ（次回の比較・通知判定に使う）
+        """
+        from models import to_score_dict
+        
+        previous = to_score_dict(result)
+        if self.raw_input:
+            return previous
         try:
             with open(self.previous_data_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
+                json.dump(previous, f, ensure_ascii=False, indent=2)
             print("✅ 前回データとして保存")
         except Exception as e:
             print(f"⚠️  前回データ保存失敗: {e}")
+        return previous
     
-    def run(self):
-        """メイン処理を実行"""
+    def run(self, daily_summary=True, next_update=None, profiler=None):
+        """
+        メイン処理を実行
+        
+        Args:
+            daily_summary: 定期サマリーを通知するか
+            next_update: 次回更新予定時刻（version.json に記録、省略時は定期実行の時刻）
+            profiler: StageProfiler（指定時はステージを逐次実行して計測）
+        
+        Raises:
+            MonitorError: データ取得・スコアリング・ファイル出力に失敗した場合
+        """
+        from pipeline import PipelineError
+        
         print("=" * 60)
         print("🚀 TMF爆発察知ツール 実行開始")
         print(f"実行日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 60)
         print()
         
-        # ステップ1: データ取得
-        print("【ステップ1】データ取得")
-        print("-" * 60)
+        # docsディレクトリ作成
+        for monitor in [self] + self.tenants:
+            os.makedirs(monitor.docs_dir, exist_ok=True)
+        self.metrics.reset()
+        
+        pipeline = self.build_pipeline(daily_summary, next_update, profiler)
         try:
-            raw_data = self.fetcher.fetch_all_data()
-        except Exception as e:
-            print(f"❌ データ取得失敗: {e}")
-            sys.exit(1)
+            results = pipeline.run()
+        except PipelineError as e:
+            print(f"❌ {self.STAGE_ERRORS.get(e.stage.split(':')[-1], 'ファイル出力失敗')}: {e.stage} {e.error}")
+            self.write_metrics(pipeline, ok=False)
+            self.export_snapshot()
+            raise MonitorError(e.error)
+        
+        result = results['score']
+        self.last_result = results['save_previous']
+        self.last_report = pipeline.report()
+        for tenant in self.tenants:
+            tenant.last_result = results[f"{tenant.stage_prefix}save_previous"]
+        if self.api_cache is not None:
+            self.api_cache.update(results['data'])
+        self.write_metrics(pipeline, ok=True)
+        self.export_snapshot()
+        
+        print()
+        
+        # 実行サマリー
+        print("=" * 60)
+        print("✅ TMF監視実行完了")
+        print("=" * 60)
+        print()
+        print("📊 実行サマリー")
+        print(f"  TMFスコア: {result.total_score}")
+        print(f"  ステータス: {result.status.emoji} {result.status.label}")
+        print(f"  ダッシュボード: {self.dashboard_url}")
+        print()
+        print("主なシグナル:")
+        for signal_text in result.signals[:3]:
+            print(f"  • {signal_text}")
+        print()
         
+        if self.tenants:
+            print("🏢 テナント")
+            for tenant in self.tenants:
+                tenant_result = tenant.last_result
+                print(
+                    f"  {tenant.tenant_profile.name}: {tenant_result['total_score']} "
+                    f"{tenant_result['status']['emoji']} {tenant_result['status']['label']}  {tenant.dashboard_url}"
+                )
+            print()
+        
+        report = self.last_report
+        print(f"⏱️  所要時間: {report['wall']:.2f}秒（ステージ合計 {report['total']:.2f}秒）")
+        print("   クリティカルパス: " + " → ".join(
+            f"{name} {seconds:.2f}秒" for name, seconds in report['critical_path']
+        ))
         print()
         
-        # ステップ2: スコアリング
-        print("【ステップ2】スコアリング")
+        return result
+    
+    def build_pipeline(self, daily_summary=True, next_update=None, profiler=None):
+        """
+        1回分の処理をステージのDAGとして構築
+        
+        前回データの読み込みとHTML生成はデータ取得と並行し、
+        スコアリング後は通知・data.json・アーカイブを並行して実行する
+            
+            fetch → quality → regime → score ─┬─→ compare ←───────────── previous
+                                              └─→ data ─┬─→ notify ←──── previous
+                                                        ├─→ write_data ─┐
+                                                        └─→ archive ────┴→ save_previous（+ dashboard, previous）
+            outbox（送信待ち通知の再送）・dashboard は依存なし
+        
+        テナントがある場合は regime の結果を共有し、テナントごとの score 以降を
+        "<名前>:score" などのステージとして同じDAGに追加する
+        
+        Args:
+            daily_summary: 定期サマリーを通知するか
+            next_update: 次回更新予定時刻
+            profiler: StageProfiler（ステージごとの計測が混ざらないよう逐次実行にする）
+        
+        Returns:
+            Pipeline
+        """
+        from pipeline import Pipeline
+        
+        # テナントのステージも同じDAGで並行実行（データ取得は1回だけ）
+        workers = self.PIPELINE_WORKERS * (1 + len(self.tenants))
+        if profiler is not None:
+            pipeline = Pipeline(max_workers=1, metrics=self.metrics, stage_wrapper=profiler.wrap)
+        else:
+            pipeline = Pipeline(max_workers=workers, metrics=self.metrics)
+        
+        pipeline.add('fetch', self._fetch)
+        pipeline.add('quality', self._check_quality, deps=['fetch'])
+        pipeline.add('regime', self._update_regime, deps=['quality'])
+        self.add_stages(pipeline, daily_summary, next_update, fetch_stage='regime')
+        for tenant in self.tenants:
+            tenant.add_stages(pipeline, daily_summary, next_update, fetch_stage='regime')
+        
+        return pipeline
+    
+    def add_stages(self, pipeline, daily_summary=True, next_update=None, fetch_stage='fetch'):
+        """
+        データ取得以降のステージを追加（テナントはステージ名に "<名前>:" が付く）
+        
+        Args:
+            pipeline: Pipeline（fetch_stage が追加済みのもの）
+            daily_summary: 定期サマリーを通知するか
+            next_update: 次回更新予定時刻
+            fetch_stage: 指標データを返すステージ名
+        """
+        from models import to_score_dict
+        
+        stage = lambda name: self.stage_prefix + name
+        
+        # 前回送信できなかった通知の再送（他のステージと並行）
+        pipeline.add(stage('outbox'), self.notifier.drain_outbox)
+        pipeline.add(stage('previous'), self.load_previous_result)
+        pipeline.add(stage('dashboard'), lambda: self.renderer.generate_dashboard_html(self.index_html_path))
+        
+        pipeline.add(stage('score'), self._score, deps=[fetch_stage])
+        pipeline.add(stage('compare'), self._compare, deps=[stage('score'), stage('previous')])
+        pipeline.add(stage('data'), self._build_outputs, deps=[stage('score'), fetch_stage])
+        
+        pipeline.add(
+            stage('notify'),
+            lambda result, previous, data: self.notifier.send_notifications(
+                to_score_dict(result),
+                previous,
+                self.dashboard_url,
+                charts=data['charts'],
+                daily_summary=daily_summary
+            ),
+            deps=[stage('score'), stage('previous'), stage('data')]
+        )
+        pipeline.add(
+            stage('write_data'),
+            lambda data: self.renderer.write_data_json(data, self.data_json_path, next_update),
+            deps=[stage('data')]
+        )
+        pipeline.add(stage('archive'), self._build_archive, deps=[stage('data')])
+        
+        # 出力がすべて成功してから前回データとして保存（読み込みより後）
+        pipeline.add(
+            stage('save_previous'),
+            lambda result, *done: self.save_current_as_previous(result),
+            deps=[stage('score'), stage('previous'), stage('write_data'), stage('dashboard'), stage('archive')]
+        )
+    
+    def write_metrics(self, pipeline, ok):
+        """実行全体の計測値を追加し、run_report.json / metrics.prom を docs に出力"""
+        report = pipeline.report()
+        self.metrics.gauge('run_duration_seconds', round(report['wall'], 6))
+        self.metrics.gauge('run_success', 1 if ok else 0)
+        for name, seconds in report['critical_path']:
+            self.metrics.gauge('critical_path_seconds', round(seconds, 6), stage=name)
+        
+        try:
+            self.metrics.write(self.docs_dir)
+        except Exception as e:
+            print(f"⚠️  計測レポート保存失敗: {e}")
+    
+    def _fetch(self):
+        """ステージ: データ取得"""
+        print("【ステップ1】データ取得")
         print("-" * 60)
+        if self.raw_input:
+            from profiling import load_raw_snapshot
+            print(f"📂 保存済みデータを使用: {self.raw_input}")
+            return load_raw_snapshot(self.raw_input)
+        
+        data = self.fetcher.fetch_all_data()
+        if self.calendar is None:
+            return data
+        
+        # 公表済みのはずの値がまだ取得できない場合は、公表の遅れとみなして再取得
+        deadline = time.monotonic() + (self.RELEASE_POLL_LIMIT if self.wait_for_release else 0)
+        late = self.calendar.late(self.fetcher.observations, datetime.now(timezone.utc))
+        while late and time.monotonic() < deadline:
+            print(f"⏳ 公表待ち: {', '.join(late)}（{self.RELEASE_POLL_INTERVAL}秒後に再取得）")
+            time.sleep(self.RELEASE_POLL_INTERVAL)
+            data = self.fetcher.fetch_all_data()
+            late = self.calendar.late(self.fetcher.observations, datetime.now(timezone.utc))
+        if late and self.wait_for_release:
+            print(f"⚠️  公表が遅れています（前回までの値を使用）: {', '.join(late)}")
+        
         try:
-            result = self.scorer.calculate_score(raw_data)
+            if self.calendar.observe(self.fetcher.observations, datetime.now(timezone.utc)):
+                self.calendar.save()
+        except OSError as e:
+            print(f"⚠️  公表カレンダー保存失敗: {e}")
+        return data
+    
+    def _check_quality(self, raw_data):
+        """ステージ: データ品質チェック（異常値は前回の採用値で代替し、data.json の quality に記録）"""
+        from quality import describe
+        
+        # 初回は日次スナップショットから直近の採用値を復元
+        self.quality.seed(self.history.recent(self.quality.WINDOW))
+        data, report = self.quality.check(raw_data, self.fetcher.observations)
+        
+        if report['flags']:
+            for flag in report['flags']:
+                print(f"⚠️  データ品質: {describe(flag)}")
+        else:
+            print(f"✅ データ品質: 問題なし（{len(report['checked'])}指標）")
+        print()
+        
+        # 保存済みデータでの再実行では採用値を更新しない
+        if not self.raw_input:
+            try:
+                self.quality.save()
+            except OSError as e:
+                print(f"⚠️  データ品質の状態保存失敗: {e}")
+        return data
+    
+    def _update_regime(self, raw_data):
+        """ステージ: 株債相関レジームを更新し、指標の stock_bond_regime に追加（スコアリングの補正）"""
+        from regime import OBSERVATION_IDS, SERIES
+        
+        # 保存済みデータでの再実行では状態を更新せず、保存済みのレジームを使う
+        if not self.raw_input:
+            if self.regime.empty:
+                self._seed_regime()
             
-            print(f"✅ TMFスコア: {result['total_score']}")
-            print(f"✅ ステータス: {result['status']['emoji']} {result['status']['label']}")
-            print(f"✅ 金利系: {result['category_scores']['interest_rate']['total']}")
-            print(f"✅ リスクオフ: {result['category_scores']['risk_off']['total']}")
+            # 品質チェックで代替した値は観測日と合わないため使わない
+            quarantined = {
+                flag['indicator'] for flag in raw_data.get('quality', {}).get('flags', [])
+                if flag['action'] != 'flagged'
+            }
+            indicators = raw_data['indicators']
+            observations = {}
+            for name in SERIES:
+                value = indicators.get(name)
+                if isinstance(value, dict):
+                    value = value.get('price')
+                if name in quarantined or value is None:
+                    continue
+                observed = self.fetcher.observations.get(OBSERVATION_IDS[name])
+                observations[name] = (observed[0] if observed else raw_data['date'], value)
+            self.regime.observe(observations)
             
-            if result['boost_conditions']['boost_applied']:
-                print(f"⚡ ブースト発動: {', '.join(result['boost_conditions']['conditions'])}")
+            try:
+                self.regime.save()
+            except OSError as e:
+                print(f"⚠️  株債相関レジームの状態保存失敗: {e}")
+        
+        regime = self.regime.regime()
+        if regime is None:
+            print("ℹ️  株債相関レジーム: 日足が不足（判定なし）")
+            print()
+            return raw_data
         
+        print(f"✅ 株債相関レジーム: {regime['label']}（{regime['window']}日相関 {regime['correlation']:+.2f}、{regime['date']}時点）")
+        print()
+        return dict(raw_data, indicators=dict(raw_data['indicators'], stock_bond_regime=regime))
+    
+    def _seed_regime(self):
+        """株債相関レジームの状態がない場合に直近の日足を取得して初期化"""
+        from regime import RegimeEngine, fetch_series
+        
+        # 当日の日足は取引中の値のことがあるため、前日までで初期化して当日分は観測で確定する
+        end = datetime.now(timezone.utc).date() - timedelta(days=1)
+        start = end - timedelta(days=RegimeEngine.SEED_DAYS)
+        try:
+            bars = self.regime.seed(fetch_series(self.fetcher, start, end))
         except Exception as e:
-            print(f"❌ スコアリング失敗: {e}")
-            sys.exit(1)
+            print(f"⚠️  株債相関レジームの初期化失敗（次回再試行）: {e}")
+            return
+        print(f"📥 株債相関レジームを初期化: {bars}本（{start}〜{end}）")
+    
+    def _score(self, raw_data):
+        """ステージ: スコアリング"""
+        result = self.scorer.score_result(raw_data)
         
+        print(f"【ステップ2】スコアリング{f'（{self.tenant_profile.name}）' if self.tenant_profile else ''}")
+        print("-" * 60)
+        print(f"✅ TMFスコア: {result.total_score}")
+        print(f"✅ ステータス: {result.status.emoji} {result.status.label}")
+        print(f"✅ 金利系: {result.interest_rate.total}")
+        print(f"✅ リスクオフ: {result.risk_off.total}")
+        
+        if result.boost.applied:
+            print(f"⚡ ブースト発動: {', '.join(result.boost.conditions)}")
+        regime = result.regime
+        if regime:
+            print(f"{'📈' if regime.multiplier > 1 else '📉'} 株債相関補正（×{regime.multiplier}）: {regime.label}")
         print()
         
-        # ステップ3: 前回データと比較
+        return result
+    
+    def _compare(self, result, previous_result):
+        """ステージ: 前回データと比較"""
         print("【ステップ3】前回データと比較")
         print("-" * 60)
-        previous_result = self.load_previous_result()
         
         if previous_result:
             prev_score = previous_result['total_score']
-            curr_score = result['total_score']
+            curr_score = result.total_score
             diff = curr_score - prev_score
             
             print(f"前回スコア: {prev_score}")
@@ -112,7 +505,7 @@ class TMFMonitor:
             print(f"変化: {diff:+.1f}")
             
             prev_status = previous_result['status']['label']
-            curr_status = result['status']['label']
+            curr_status = result.status.label
             
             if prev_status != curr_status:
                 print(f"⚠️  ステータス変化検知: {prev_status} → {curr_status}")
@@ -120,81 +513,593 @@ class TMFMonitor:
                 print(f"ℹ️  ステータス変化なし: {curr_status}")
         
         print()
-        
-        # ステップ4: Slack通知
-        print("【ステップ4】Slack通知")
+    
+    def _build_archive(self, data):
+        """ステージ: 静的アーカイブを差分生成（保存済みデータの再実行では何もしない）"""
+        if self.raw_input:
+            return None
+        return self.archive.build(self.history)
+    
+    def _build_outputs(self, result, raw_data):
+        """ステージ: 日次スナップショット保存と推移チャート生成（通知から参照するため先に実行）"""
+        print("【ステップ4】ファイル出力・Slack通知")
         print("-" * 60)
         
-        # ステータス変化通知
-        status_changed = self.notifier.send_status_change_notification(
-            result, 
-            previous_result, 
-            self.dashboard_url
-        )
+        # 保存済みデータの再実行（--input）は入力の日時で組み立て、日次スナップショットは更新しない
+        if self.raw_input:
+            data = self.renderer.build_data(result, raw_data.get('timestamp'), raw_data.get('date'))
+        else:
+            data = self.renderer.build_data(result)
+        if 'quality' in raw_data:
+            data['quality'] = raw_data['quality']
+        if self.raw_input:
+            print(f"ℹ️  保存済みデータの再実行のため履歴・アーカイブ・前回データは更新しません（{data['date']}）")
+        else:
+            self.history.save(data)
+        data['charts'] = self.charts.build(self.history.recent(self.charts.max_window))
         
-        # 定期サマリー通知（毎日）
-        summary_sent = self.notifier.send_daily_summary(
-            result,
-            previous_result,
-            self.dashboard_url
-        )
+        return data
+    
+    def profile(self, top=None):
+        """
+        プロファイル付きで1回実行し、ステージごとのホットな関数と割り当て箇所を出力
         
-        print()
+        レポートと pstats は state/profile/<実行日時>/ に保存する
         
-        # ステップ5: ファイル出力
-        print("【ステップ5】ファイル出力")
-        print("-" * 60)
+        Args:
+            top: 表示する件数
+        """
+        from profiling import StageProfiler
+        
+        with StageProfiler(top) as profiler:
+            try:
+                self.run(profiler=profiler)
+            finally:
+                if profiler.stages:
+                    print("🔬 プロファイル（ステージごと、処理時間の長い順）")
+                    print(profiler.format_report())
+                    output_dir = os.path.join(self.state_dir, 'profile', datetime.now().strftime('%Y%m%d-%H%M%S'))
+                    print(f"✅ プロファイル保存: {profiler.dump(output_dir)}")
+    
+    def start_api_server(self, host='127.0.0.1', port=8080):
+        """
+        HTTP APIサーバーを起動（docs の data.json・history で初期化し、以降は実行ごとに更新）
+        
+        Args:
+            host: 待ち受けホスト
+            port: 待ち受けポート
+        """
+        from server import APIServer, ResultCache
         
+        self.api_cache = ResultCache()
+        self.api_cache.load(self.docs_dir)
+        self.api_server = APIServer(self.api_cache, host, port).start()
+        print(f"🌐 APIサーバー起動: {self.api_server.url}/score /status /indicators /history?from=&to=")
+    
+    def close(self):
+        """通知の送信スレッドと接続・APIサーバーを終了"""
+        self.notifier.close()
+        for tenant in self.tenants:
+            tenant.close()
+        if self.api_server is not None:
+            self.api_server.stop()
+            self.api_server = None
+    
+    def export_snapshot(self):
+        """
+        温まった実行状態を snapshot_path に書き出し
+        
+        FREDシリーズ（解析済みの行・ETag / Last-Modified）・公表カレンダー・データ品質と株債相関の
+        ローリングウィンドウを1ファイルにまとめる。前回の結果は docs の previous.json
+        （リポジトリにコミット済み）を正とするため含めない
+        """
+        if not self.snapshot_path or self.raw_input:
+            return
+        from snapshot import write_snapshot
+        
+        sections = {
+            'fred_cache': self.fetcher.export_cache(),
+            'release_calendar': self.calendar.export_state(),
+            'quality': self.quality.export_state(),
+            'regime': self.regime.export_state()
+        }
         try:
-            # docsディレクトリ作成
-            os.makedirs(self.docs_dir, exist_ok=True)
-            
-            # data.json生成
-            self.renderer.save_data_json(result, self.data_json_path)
-            
-            # index.html生成
-            self.renderer.generate_dashboard_html(self.index_html_path)
-            
-            # 前回データとして保存
-            self.save_current_as_previous(result)
-            
-        except Exception as e:
-            print(f"❌ ファイル出力失敗: {e}")
-            sys.exit(1)
+            header = write_snapshot(self.snapshot_path, sections)
+        except OSError as e:
+            print(f"⚠️  スナップショット保存失敗: {e}")
+            return
+        print(f"✅ スナップショット保存: {self.snapshot_path}（{header['bytes'] / 1024:.1f}KB）")
+    
+    def import_snapshot(self):
+        """
+        snapshot_path のスナップショットを読み込んで実行状態を復元
         
-        print()
+        ない・壊れている・バージョンが異なる場合は何もしない（通常どおり取得し直す）
         
-        # 実行サマリー
-        print("=" * 60)
-        print("✅ TMF監視実行完了")
-        print("=" * 60)
-        print()
-        print("📊 実行サマリー")
-        print(f"  TMFスコア: {result['total_score']}")
-        print(f"  ステータス: {result['status']['emoji']} {result['status']['label']}")
-        print(f"  ダッシュボード: {self.dashboard_url}")
-        print()
-        print("主なシグナル:")
-        for signal in result['signals'][:3]:
-            print(f"  • {signal}")
-        print()
+        Returns:
+            bool: 復元したか
+        """
+        from snapshot import SnapshotError, read_snapshot
         
-        return result
+        started = time.perf_counter()
+        try:
+            header, sections = read_snapshot(self.snapshot_path)
+        except FileNotFoundError:
+            print(f"ℹ️  スナップショットなし（初回実行）: {self.snapshot_path}")
+            return False
+        except (OSError, ValueError, SnapshotError) as e:
+            print(f"⚠️  スナップショットを使用しません（取得し直します）: {e}")
+            return False
+        
+        self.fetcher.load_cache(sections.get('fred_cache', {}))
+        self.calendar.load_state(sections.get('release_calendar', {}))
+        self.quality.load_state(sections.get('quality', {}))
+        self.regime.load_state(sections.get('regime', {}))
+        
+        print(
+            f"✅ スナップショット復元: {', '.join(header['sections'])}"
+            f"（{header['bytes'] / 1024:.1f}KB・{(time.perf_counter() - started) * 1000:.1f}ms、{header['created']} 作成）"
+        )
+        return True
+    
+    def load_daemon_state(self):
+        """常駐モードの状態（定期サマリーの送信時刻・FREDキャッシュ）を読み込み"""
+        try:
+            with open(self.daemon_state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        
+        self.fetcher.load_cache(state.get('fred_cache', {}))
+        print("✅ 常駐モードの状態を復元")
+        return state
+    
+    def save_daemon_state(self, state):
+        """常駐モードの状態を保存（一時ファイル経由で置き換え）"""
+        state = dict(state, fred_cache=self.fetcher.export_cache())
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_path = f"{self.daemon_state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.daemon_state_path)
+        print("✅ 常駐モードの状態を保存")
+    
+    def summary_due(self, last_summary_at, now=None):
+        """
+        定期サマリーを送る時刻か
+        
+        定期実行の時刻（UPDATE_TIME_UTC）を過ぎてから、まだ送っていなければTrue
+        """
+        now = now or datetime.now(timezone.utc)
+        hour, minute = self.renderer.UPDATE_TIME_UTC
+        scheduled = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if scheduled > now:
+            scheduled -= timedelta(days=1)
+        
+        return last_summary_at is None or datetime.fromisoformat(last_summary_at) < scheduled
+    
+    def run_daemon(self, interval=None, market_interval=None, intraday=False):
+        """
+        常駐モードで定期実行
+        
+        HTTPセッション・FREDシリーズ・直近の結果をメモリに保持したまま、
+        米国市場の取引時間中は market_interval、それ以外は interval ごとに実行する。
+        SIGTERM / SIGINT を受けると実行中のサイクルを終えてから状態を保存して終了する
+        
+        高頻度モードでは取引時間中に INTRADAY_INTERVAL ごとに実行し、
+        FREDの日次シリーズは次回の公表時刻まで再取得せず、S&P500・VIXの現在値だけを取得する
+        
+        Args:
+            interval: 市場時間外の実行間隔（秒）
+            market_interval: 取引時間中の実行間隔（秒）
+            intraday: 高頻度モード
+        """
+        from release_calendar import is_us_market_open
+        
+        interval = interval or self.DAEMON_INTERVAL
+        market_interval = market_interval or (self.INTRADAY_INTERVAL if intraday else self.MARKET_INTERVAL)
+        self.fetcher.intraday = intraday
+        stop = threading.Event()
+        
+        def request_stop(signum, frame):
+            print(f"\n🛑 シグナル受信（{signal.Signals(signum).name}）: 現在のサイクル完了後に終了します")
+            stop.set()
+        
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+        
+        state = self.load_daemon_state()
+        drainers = [monitor.notifier.start_background_drainer() for monitor in [self] + self.tenants]
+        print(f"🔁 常駐モード開始（間隔: {interval}秒 / 取引時間中: {market_interval}秒{' / 高頻度モード' if intraday else ''}）")
+        
+        try:
+            while not stop.is_set():
+                now = datetime.now(timezone.utc)
+                delay = market_interval if is_us_market_open(now) else interval
+                next_run = now + timedelta(seconds=delay)
+                daily_summary = self.summary_due(state.get('last_summary_at'), now)
+                
+                try:
+                    self.run(daily_summary=daily_summary, next_update=next_run)
+                    if daily_summary:
+                        state['last_summary_at'] = now.isoformat()
+                    state['last_run_at'] = now.isoformat()
+                except MonitorError:
+                    print("⚠️  今回の実行は失敗しました（次回再実行）")
+                except Exception as e:
+                    print(f"❌ 予期しないエラー: {e}")
+                    import traceback
+                    traceback.print_exc()
+                
+                remaining = (next_run - datetime.now(timezone.utc)).total_seconds()
+                print(f"⏰ 次回実行: {next_run.astimezone().strftime('%Y-%m-%d %H:%M:%S')}")
+                stop.wait(max(0, remaining))
+        finally:
+            for drainer in drainers:
+                if drainer is not None:
+                    drainer.set()
+            self.save_daemon_state(state)
+            self.close()
+            print("👋 常駐モード終了")
+
+
+# サブコマンド（先頭がこれ以外の場合は従来どおり run として扱う）
+COMMANDS = ('run', 'render', 'show', 'serve', 'backfill', 'regime', 'snapshot', 'bench')
+
+
+def default_docs_dir():
+    """リポジトリの docs ディレクトリ"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(os.path.dirname(script_dir), 'docs')
+
+
+def default_state_dir(docs_dir):
+    """実行状態の保存先（docs と同じ階層の state）"""
+    return os.path.join(os.path.dirname(os.path.abspath(docs_dir)), 'state')
+
+
+def release_calendar_path(state_dir):
+    """公表カレンダーの実績の保存先"""
+    return os.path.join(state_dir, 'release_calendar.json')
+
+
+def wait_for_release(docs_dir, now=None):
+    """
+    新しいデータが公表済み、またはまもなく公表されるかを判定（requests 等を読み込まずに判定する）
+    
+    まもなく（RELEASE_WAIT_LIMIT 以内に）公表されるシリーズがあれば、その公表時刻まで待つ
+    
+    Returns:
+        bool: 実行するか（False なら新しいデータはない）
+    """
+    from release_calendar import ReleaseCalendar
+    
+    now = now or datetime.now(timezone.utc)
+    calendar = ReleaseCalendar(release_calendar_path(default_state_dir(docs_dir)))
+    pending = calendar.pending(now)
+    upcoming = calendar.upcoming(now, TMFMonitor.RELEASE_WAIT_LIMIT)
+    
+    if not pending and not upcoming:
+        series_id, release = calendar.upcoming(now, float('inf'))[0]
+        print(f"⏭️  新しいデータはまだ公表されていません（次回: {series_id} {release:%Y-%m-%d %H:%M %Z}）")
+        return False
+    
+    if upcoming:
+        series_id, release = upcoming[-1]
+        print(f"⏳ まもなく公表: {', '.join(s for s, _ in upcoming)}（{release:%H:%M %Z} まで待機）")
+        time.sleep(max(0, (release - now).total_seconds()))
+    
+    return True
+
+
+def load_data_json(docs_dir):
+    """保存済みの data.json を読み込み（ない場合は MonitorError）"""
+    path = os.path.join(docs_dir, 'data.json')
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"❌ data.json を読み込めません: {e}")
+        raise MonitorError(e)
+
+
+def command_run(args):
+    """run: データを取得してスコアリング・出力・通知（既定のコマンド）"""
+    tenants = None
+    if args.tenants:
+        from tenants import load_tenants
+        try:
+            tenants = load_tenants(args.tenants)
+        except (OSError, ValueError) as e:
+            print(f"❌ テナント設定を読み込めません: {e}")
+            raise MonitorError(e)
+    
+    if args.when_released and not wait_for_release(args.docs_dir):
+        return
+    
+    monitor = TMFMonitor(docs_dir=args.docs_dir, raw_input=args.input, tenants=tenants,
+                         wait_for_release=args.when_released, snapshot_path=args.snapshot)
+    if args.snapshot:
+        monitor.import_snapshot()
+    
+    if args.daemon:
+        if args.serve is not None:
+            monitor.start_api_server(args.host, args.serve)
+        monitor.run_daemon(args.interval, args.market_interval, args.intraday)
+        return
+    
+    try:
+        if args.profile:
+            monitor.profile(args.profile_top)
+        else:
+            monitor.run()
+    finally:
+        monitor.close()
+
+
+def command_render(args):
+    """render: 保存済みの data.json からダッシュボードを再生成（ネットワーク・スコアリングなし）"""
+    from render import DashboardRenderer
+    
+    data = load_data_json(args.docs_dir)
+    renderer = DashboardRenderer()
+    renderer.generate_dashboard_html(os.path.join(args.docs_dir, 'index.html'))
+    renderer.write_data_json(data, os.path.join(args.docs_dir, 'data.json'))
+
+
+def command_show(args):
+    """show: 直近のスコアを表示（標準ライブラリのみ）"""
+    data = load_data_json(args.docs_dir)
+    
+    if args.json:
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+        return
+    
+    status = data['status']
+    print(f"{status['emoji']} TMFスコア: {data['score']}（{status['label']}）")
+    print(f"   更新日時: {data['last_updated']}")
+    for name, category in data.get('category_scores', {}).items():
+        print(f"   {name}: {category['total']}")
+    for signal_text in data.get('signals', [])[:3]:
+        print(f"  • {signal_text}")
 
 
-def main():
+def command_serve(args):
+    """serve: docs の data.json・history を HTTP API で公開（data.json の更新を定期的に反映）"""
+    from server import serve
+    
+    serve(args.docs_dir, args.host, args.port, args.reload_interval)
+
+
+def command_backfill(args):
+    """backfill: 日次履歴からアーカイブとチャートを作り直し、data.json のチャート情報を更新（--bars 指定時は過去の日足を取得）"""
+    if args.bars:
+        backfill_bars(args)
+        return
+    
+    from history import HistoryStore
+    from render import ArchiveRenderer, ChartRenderer, DashboardRenderer
+    
+    history = HistoryStore(os.path.join(args.docs_dir, 'history'))
+    ArchiveRenderer(os.path.join(args.docs_dir, 'archive')).build(history, force=args.force)
+    
+    charts = ChartRenderer(args.docs_dir)
+    data = load_data_json(args.docs_dir)
+    data['charts'] = charts.build(history.recent(charts.max_window), force=args.force)
+    DashboardRenderer().write_data_json(data, os.path.join(args.docs_dir, 'data.json'))
+
+
+def backfill_bars(args):
+    """backfill --bars: Yahoo Finance・FREDの過去の日足をチャンクに分けて並行取得し state/bars に保存"""
+    from backfill import SOURCES, BarBackfill
+    from data_fetch import DataFetcher
+    
+    names = list(SOURCES) if args.bars == 'all' else [name.strip() for name in args.bars.split(',')]
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown:
+        print(f"❌ 未知の系列: {', '.join(unknown)}（{', '.join(SOURCES)} または all）")
+        raise MonitorError(unknown)
+    
+    try:
+        start = datetime.strptime(args.start, '%Y-%m-%d').date() if args.start else None
+        end = datetime.strptime(args.end, '%Y-%m-%d').date() if args.end else None
+    except ValueError as e:
+        print(f"❌ 日付の形式が不正です（YYYY-MM-DD）: {e}")
+        raise MonitorError(e)
+    
+    backfill = BarBackfill(
+        DataFetcher(),
+        os.path.join(default_state_dir(args.docs_dir), 'bars'),
+        chunk_days=args.chunk_days,
+        workers=args.workers
+    )
+    
+    failed = []
+    try:
+        for name in names:
+            report = backfill.run(name, start, end)
+            if report['failed']:
+                failed.append(name)
+                print(f"❌ {name}: {len(report['failed'])}チャンクの取得に失敗（再実行すると失敗分のみ取得）")
+                continue
+            
+            print(
+                f"✅ {name}: {report['bars']:,}本 → {report['path']}"
+                f"（{report['chunks']}チャンク・保存済み {report['resumed']}・{report['seconds']:.1f}秒）"
+            )
+            for previous, current in report['gaps']:
+                print(f"⚠️  欠落の可能性: {previous} 〜 {current}")
+    except KeyboardInterrupt:
+        print("\n⏸️  中断しました（再実行すると保存済みのチャンクから再開）")
+        raise MonitorError('interrupted')
+    
+    if failed:
+        raise MonitorError(failed)
+
+
+def command_regime(args):
+    """regime: backfill --bars の日足から全期間の株債相関レジームを算出し、年ごとの割合を表示"""
+    from regime import LABELS, RegimeEngine, YIELDS, load_series, regime_history
+    
+    bars_dir = args.bars_dir or os.path.join(default_state_dir(args.docs_dir), 'bars')
+    try:
+        series = load_series(bars_dir)
+    except OSError as e:
+        print(f"❌ 日足を読み込めません（先に backfill --bars sp500,treasury_10y,treasury_30y を実行）: {e}")
+        raise MonitorError(e)
+    
+    started = time.perf_counter()
+    history = regime_history(series)
+    elapsed = time.perf_counter() - started
+    
+    # 年ごとのレジームの割合と判定に使う相関の平均
+    primary = RegimeEngine.PRIMARY_WINDOW
+    years = {}
+    for index, (day, regime) in enumerate(zip(history['dates'], history['regimes'])):
+        if regime is None:
+            continue
+        values = [history['correlations'][(name, primary)][index] for name in YIELDS]
+        values = [value for value in values if value is not None]
+        counts = years.setdefault(day[:4], {'hedge': 0, 'neutral': 0, 'co_move': 0, 'sum': 0.0, 'days': 0})
+        counts[regime] += 1
+        counts['sum'] += sum(values) / len(values)
+        counts['days'] += 1
+    
+    print(f"=== 株債相関レジーム（{primary}日相関、{len(history['dates']):,}本・{elapsed * 1000:.0f}ms） ===")
+    print(f"{'年':<6}{'ヘッジ':>8}{'中立':>8}{'同方向':>8}{'平均相関':>10}")
+    for year, counts in sorted(years.items()):
+        days = counts['days']
+        print(
+            f"{year:<6}{counts['hedge'] / days:>8.0%}{counts['neutral'] / days:>8.0%}"
+            f"{counts['co_move'] / days:>8.0%}{counts['sum'] / days:>+10.2f}"
+        )
+    
+    if history['regimes'] and history['regimes'][-1]:
+        print(f"\n現在: {LABELS[history['regimes'][-1]]}（{history['dates'][-1]}）")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            columns = [(name, window) for name in YIELDS for window in RegimeEngine.WINDOWS]
+            f.write(','.join(['date', 'regime'] + [f"{name}_{window}" for name, window in columns]) + '\n')
+            for index, day in enumerate(history['dates']):
+                values = [history['correlations'][column][index] for column in columns]
+                f.write(','.join(
+                    [day, history['regimes'][index] or ''] + ['' if value is None else f"{value:.4f}" for value in values]
+                ) + '\n')
+        print(f"✅ 出力: {args.output}")
+
+
+def command_snapshot(args):
+    """snapshot: 実行状態スナップショットの整合性を確認して内容を表示（標準ライブラリのみ）"""
+    from snapshot import SnapshotError, read_snapshot
+    
+    try:
+        header, sections = read_snapshot(args.path)
+    except (OSError, ValueError, SnapshotError) as e:
+        print(f"❌ スナップショットを使用できません: {e}")
+        raise MonitorError(e)
+    
+    print(f"✅ {args.path}: バージョン {header['version']}・{header['created']} 作成")
+    print(f"   {header['bytes'] / 1024:.1f}KB（展開後 {header['size'] / 1024:.1f}KB）・SHA-256 {header['sha256'][:16]}…")
+    for name in header['sections']:
+        size = len(json.dumps(sections[name], ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        print(f"   {name:<18} {size / 1024:>8.1f}KB")
+
+
+def command_bench(args):
+    """bench: ベンチマーク（引数は benchmark.py にそのまま渡す）"""
+    import benchmark
+    
+    benchmark.main(args.args)
+
+
+def build_parser():
+    """コマンドラインの定義"""
+    parser = argparse.ArgumentParser(description='TMF爆発察知ツール')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    # docs を読み書きするコマンドの共通オプション
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--docs-dir', metavar='PATH', default=default_docs_dir(), help='出力先（既定はリポジトリの docs）')
+    
+    run = subparsers.add_parser('run', parents=[common], help='データを取得してスコアリング・出力・通知（既定）')
+    run.add_argument('--daemon', action='store_true', help='常駐して定期実行')
+    run.add_argument('--interval', type=int, help=f'常駐モードの実行間隔（秒、既定 {TMFMonitor.DAEMON_INTERVAL}）')
+    run.add_argument('--market-interval', type=int, help=f'米国市場の取引時間中の実行間隔（秒、既定 {TMFMonitor.MARKET_INTERVAL}）')
+    run.add_argument('--intraday', action='store_true', help=f'常駐モードの高頻度モード（取引時間中は既定 {TMFMonitor.INTRADAY_INTERVAL}秒ごと、日次の指標は公表時刻までキャッシュ）')
+    run.add_argument('--when-released', action='store_true', help='公表カレンダーで新しいデータがなければすぐ終了し、公表が近い・遅れている場合は待つ')
+    run.add_argument('--profile', action='store_true', help='ステージごとに cProfile / tracemalloc で計測して1回実行')
+    run.add_argument('--profile-top', type=int, help='プロファイルの表示件数')
+    run.add_argument('--input', metavar='PATH', help='保存済みの指標データ（data.json や docs/history/*.json）を使い、ネットワークから取得しない')
+    run.add_argument('--snapshot', metavar='PATH', help='実行状態スナップショット（起動時に読み込み、実行ごとに書き出す。CIのキャッシュ用）')
+    run.add_argument('--tenants', metavar='PATH', help='テナント設定（JSON）。データ取得を共有して全テナントを実行')
+    run.add_argument('--serve', type=int, metavar='PORT', help='常駐モードで HTTP API を公開（実行ごとに更新）')
+    run.add_argument('--host', default='127.0.0.1', help='HTTP API の待ち受けホスト')
+    run.set_defaults(handler=command_run)
+    
+    render = subparsers.add_parser('render', parents=[common], help='保存済みの data.json からダッシュボードを再生成')
+    render.set_defaults(handler=command_render)
+    
+    show = subparsers.add_parser('show', parents=[common], help='直近のスコアを表示')
+    show.add_argument('--json', action='store_true', help='data.json をそのまま表示')
+    show.set_defaults(handler=command_show)
+    
+    serve = subparsers.add_parser('serve', parents=[common], help='保存済みのデータを HTTP API で公開')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8080)
+    serve.add_argument('--reload-interval', type=float, default=30.0, help='data.json の更新を確認する間隔（秒）')
+    serve.set_defaults(handler=command_serve)
+    
+    backfill = subparsers.add_parser('backfill', parents=[common], help='日次履歴からアーカイブとチャートを再生成')
+    backfill.add_argument('--force', action='store_true', help='キャッシュを使わずにすべて作り直す')
+    backfill.add_argument('--bars', metavar='NAMES', help='過去の日足を取得（sp500,vix,treasury_10y,treasury_30y,vix_fred または all）')
+    backfill.add_argument('--start', metavar='YYYY-MM-DD', help='--bars の開始日（省略時は系列ごとの既定値）')
+    backfill.add_argument('--end', metavar='YYYY-MM-DD', help='--bars の終了日（省略時は今日）')
+    backfill.add_argument('--chunk-days', type=int, help='--bars の1チャンクの日数（既定 365）')
+    backfill.add_argument('--workers', type=int, help='--bars の同時取得数（既定 4）')
+    backfill.set_defaults(handler=command_backfill)
+    
+    regime = subparsers.add_parser('regime', parents=[common], help='過去の日足から全期間の株債相関レジームを算出')
+    regime.add_argument('--bars-dir', metavar='PATH', help='日足の保存先（既定は state/bars）')
+    regime.add_argument('--output', metavar='PATH', help='日ごとのレジームと相関をCSVで出力')
+    regime.set_defaults(handler=command_regime)
+    
+    snapshot = subparsers.add_parser('snapshot', help='実行状態スナップショットの整合性を確認して内容を表示')
+    snapshot.add_argument('path', help='スナップショットのパス')
+    snapshot.set_defaults(handler=command_snapshot)
+    
+    bench = subparsers.add_parser('bench', help='ベンチマーク（例: bench startup / bench templates）')
+    bench.add_argument('args', nargs=argparse.REMAINDER)
+    bench.set_defaults(handler=command_bench)
+    
+    return parser
+
+
+def main(argv=None):
     """エントリーポイント"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    
+    # 従来の `python main.py [--daemon ...]` は run として扱う
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ('-h', '--help')):
+        argv = ['run'] + argv
+    
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'run' and args.serve is not None and not args.daemon:
+        parser.error('--serve は --daemon と併用してください')
+    if args.command == 'run' and args.intraday and not args.daemon:
+        parser.error('--intraday は --daemon と併用してください')
+    if args.command == 'run' and args.snapshot and args.input:
+        parser.error('--snapshot は --input と併用できません')
+    if args.command == 'run' and args.when_released and (args.daemon or args.input):
+        parser.error('--when-released は1回実行（--daemon・--input なし）で使用してください')
+    
     try:
-        # カレントディレクトリからの相対パスでdocsを指定
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(script_dir)
-        docs_dir = os.path.join(project_root, 'docs')
-        
-        monitor = TMFMonitor(docs_dir=docs_dir)
-        result = monitor.run()
-        
+        args.handler(args)
         sys.exit(0)
-        
+    
+    except MonitorError:
+        sys.exit(1)
     except KeyboardInterrupt:
         print("\n\n⚠️  実行が中断されました")
         sys.exit(1)
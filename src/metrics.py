@@ -0,0 +1,267 @@
+"""
+計測モジュール
+実行中の処理時間（スパン）・カウンター・ゲージを集計し、JSONレポートとPrometheusテキスト形式で出力
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from models import dumps
+
+
+def _label_key(labels):
+    """ラベル辞書を集計キー（ソート済みタプル）に変換"""
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key):
+    """Prometheus のラベル表記（{a="1",b="2"}）"""
+    if not key:
+        return ''
+    escaped = (
+        f'{name}="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in key
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+class Metrics:
+    """
+    1回の実行分の計測値を集めるクラス（スレッドセーフ）
+    
+    - span: 処理時間（例: ステージ、HTTPリクエスト）
+    - count: 累積値（例: 受信バイト数、キャッシュヒット、再試行）
+    - gauge: 最新値（例: TMFスコア）
+    """
+    
+    # Prometheus のメトリクス名の接頭辞
+    PREFIX = 'tmf'
+    
+    # 出力ファイル名
+    REPORT_NAME = 'run_report.json'
+    PROMETHEUS_NAME = 'metrics.prom'
+    HISTORY_NAME = 'run_history.jsonl'
+    
+    # run_history.jsonl に残す実行数
+    HISTORY_KEEP = 1000
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """計測値をクリア（実行の開始時に呼ぶ）"""
+        with self._lock:
+            self.started_at = datetime.now(timezone.utc)
+            self._origin = time.perf_counter()
+            self.spans = []
+            self.counters = {}
+            self.gauges = {}
+    
+    @contextmanager
+    def span(self, name, **labels):
+        """
+        with ブロックの処理時間を記録（例外時は ok=False）
+        
+        Args:
+            name: スパン名
+            **labels: ラベル（例: source='fred'）
+        """
+        start = time.perf_counter()
+        ok = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self.add_span(name, time.perf_counter() - start, ok=ok, start=start, **labels)
+    
+    def add_span(self, name, seconds, ok=True, start=None, **labels):
+        """計測済みの処理時間を記録"""
+        start = (start if start is not None else time.perf_counter() - seconds) - self._origin
+        with self._lock:
+            self.spans.append({
+                'name': name,
+                'labels': dict(labels),
+                'start': round(start, 6),
+                'seconds': round(seconds, 6),
+                'ok': ok
+            })
+    
+    def count(self, name, value=1, **labels):
+        """カウンターを加算"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+    
+    def gauge(self, name, value, **labels):
+        """ゲージを設定"""
+        with self._lock:
+            self.gauges[(name, _label_key(labels))] = value
+    
+    def summary(self):
+        """
+        スパンを（名前, ラベル）ごとに集計
+        
+        Returns:
+            dict: {(名前, ラベルキー): {'count', 'seconds', 'max', 'errors'}}
+        """
+        with self._lock:
+            spans = list(self.spans)
+        
+        summary = {}
+        for span in spans:
+            key = (span['name'], _label_key(span['labels']))
+            entry = summary.setdefault(key, {'count': 0, 'seconds': 0.0, 'max': 0.0, 'errors': 0})
+            entry['count'] += 1
+            entry['seconds'] += span['seconds']
+            entry['max'] = max(entry['max'], span['seconds'])
+            entry['errors'] += 0 if span['ok'] else 1
+        
+        return summary
+    
+    def report(self):
+        """
+        構造化レポート（run_report.json の内容）
+        
+        Returns:
+            dict
+        """
+        with self._lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'duration': round(time.perf_counter() - self._origin, 6),
+            'spans': spans,
+            'summary': [
+                {'name': name, 'labels': dict(key), **{k: round(v, 6) for k, v in entry.items()}}
+                for (name, key), entry in sorted(self.summary().items())
+            ],
+            'counters': [
+                {'name': name, 'labels': dict(key), 'value': value}
+                for (name, key), value in sorted(counters.items())
+            ],
+            'gauges': [
+                {'name': name, 'labels': dict(key), 'value': value}
+                for (name, key), value in sorted(gauges.items())
+            ]
+        }
+    
+    def to_prometheus(self):
+        """
+        Prometheus テキスト形式（metrics.prom の内容）
+        
+        スパンは summary 型（_sum / _count）、カウンターは _total、ゲージはそのまま出力する
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        
+        lines = []
+        
+        def family(metric, kind, samples):
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.extend(samples)
+        
+        spans = {}
+        for (name, key), entry in sorted(self.summary().items()):
+            spans.setdefault(name, []).append((key, entry))
+        for name, entries in spans.items():
+            metric = f"{self.PREFIX}_{name}_duration_seconds"
+            samples = []
+            for key, entry in entries:
+                samples.append(f"{metric}_sum{_format_labels(key)} {entry['seconds']:.6f}")
+                samples.append(f"{metric}_count{_format_labels(key)} {entry['count']}")
+            family(metric, 'summary', samples)
+        
+        by_name = {}
+        for (name, key), value in sorted(counters.items()):
+            by_name.setdefault(name, []).append((key, value))
+        for name, entries in by_name.items():
+            metric = f"{self.PREFIX}_{name}_total"
+            family(metric, 'counter', [f"{metric}{_format_labels(key)} {value}" for key, value in entries])
+        
+        by_name = {}
+        for (name, key), value in sorted(gauges.items()):
+            by_name.setdefault(name, []).append((key, value))
+        for name, entries in by_name.items():
+            metric = f"{self.PREFIX}_{name}"
+            family(metric, 'gauge', [f"{metric}{_format_labels(key)} {value}" for key, value in entries])
+        
+        metric = f"{self.PREFIX}_last_run_timestamp_seconds"
+        family(metric, 'gauge', [f"{metric} {int(self.started_at.timestamp())}"])
+        
+        return '\n'.join(lines) + '\n'
+    
+    def history_entry(self):
+        """run_history.jsonl に追記する1行分の要約（スパン名・ラベルごとの合計秒数）"""
+        with self._lock:
+            counters = dict(self.counters)
+        
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'duration': round(time.perf_counter() - self._origin, 3),
+            'spans': {
+                name + _format_labels(key): round(entry['seconds'], 3)
+                for (name, key), entry in sorted(self.summary().items())
+            },
+            'counters': {
+                name + _format_labels(key): value
+                for (name, key), value in sorted(counters.items())
+            }
+        }
+    
+    def write(self, output_dir):
+        """
+        run_report.json・metrics.prom を書き出し、run_history.jsonl に1行追記
+        
+        Args:
+            output_dir: 出力先ディレクトリ（data.json と同じ場所）
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self._write(os.path.join(output_dir, self.REPORT_NAME), dumps(self.report()))
+        self._write(os.path.join(output_dir, self.PROMETHEUS_NAME), self.to_prometheus().encode('utf-8'))
+        
+        # 実行ごとの推移（古いものは HISTORY_KEEP 件まで切り詰め）
+        history_path = os.path.join(output_dir, self.HISTORY_NAME)
+        try:
+            with open(history_path, 'rb') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            lines = []
+        lines.append(dumps(self.history_entry()))
+        self._write(history_path, b'\n'.join(lines[-self.HISTORY_KEEP:]) + b'\n')
+        
+        print(f"✅ 計測レポート保存: {self.REPORT_NAME} / {self.PROMETHEUS_NAME}")
+    
+    @staticmethod
+    def _write(path, content):
+        """一時ファイル経由でアトミックに書き込み"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+# テスト用
+if __name__ == "__main__":
+    metrics = Metrics()
+    
+    with metrics.span('stage', stage='fetch'):
+        for series in ('DGS10', 'DGS30'):
+            with metrics.span('http_request', source='fred'):
+                time.sleep(0.01)
+            metrics.count('http_response_bytes', 12345, source='fred')
+    metrics.count('cache_hits', source='fred', kind='memory')
+    metrics.gauge('score', 66.2)
+    
+    print("\n=== 計測 ===")
+    print(metrics.to_prometheus())
+    print(metrics.history_entry())
@@ -0,0 +1,282 @@
+"""
+結果モデルモジュール
+スコアリング結果を省メモリの型付きクラスで保持し、data.json 形式へシリアライズ
+"""
+
+import json
+from dataclasses import dataclass
+from enum import Enum
+
+try:
+    import orjson  # オプション依存（インストール時はシリアライズを高速化）
+except ImportError:
+    orjson = None
+
+
+class Status(Enum):
+    """TMFステータス（表示用メタデータは各メンバーが1つだけ保持）"""
+    
+    NORMAL = ('normal', '通常', '🟢', '#10b981')
+    PRECURSOR = ('precursor', '前兆', '⚠️', '#f59e0b')
+    ALERT = ('alert', '警戒', '🚨', '#ef4444')
+    IMMINENT = ('imminent', '直前', '💥', '#dc2626')
+    
+    def __init__(self, level, label, emoji, color):
+        self.level = level
+        self.label = label
+        self.emoji = emoji
+        self.color = color
+    
+    @classmethod
+    def from_level(cls, level):
+        """レベル文字列からステータスを取得"""
+        for status in cls:
+            if status.level == level:
+                return status
+        raise ValueError(f"Unknown status level: {level}")
+    
+    def to_dict(self):
+        """data.json 形式の辞書に変換"""
+        return {
+            'level': self.level,
+            'label': self.label,
+            'emoji': self.emoji,
+            'color': self.color
+        }
+
+
+# カテゴリごとの詳細項目（CategoryScore.scores の並び順）
+CATEGORY_DETAILS = {
+    'interest_rate': ('treasury_10y', 'treasury_30y', 'rate_decline'),
+    'risk_off': ('vix', 'sp500_deviation')
+}
+
+
+@dataclass(slots=True)
+class CategoryScore:
+    """カテゴリ別スコア（詳細スコアは CATEGORY_DETAILS の順に保持）"""
+    
+    total: float
+    scores: tuple
+
+
+@dataclass(slots=True)
+class BoostConditions:
+    """補助条件（ブースト）の判定結果"""
+    
+    applied: bool
+    multiplier: float
+    conditions: tuple
+
+
+@dataclass(slots=True)
+class RegimeAdjustment:
+    """株債相関レジームによる補正（ヘッジ局面は引き上げ、株債同方向は引き下げ）"""
+    
+    regime: str
+    label: str
+    multiplier: float
+    
+    def to_dict(self):
+        """data.json 形式の辞書に変換"""
+        return {
+            'regime': self.regime,
+            'label': self.label,
+            'multiplier': self.multiplier
+        }
+
+
+@dataclass(slots=True)
+class TMFResult:
+    """
+    スコアリング結果
+    
+    指標値は raw（DataFetcher の indicators）に1回だけ保持し、
+    詳細スコアの value はシリアライズ時に raw から復元する
+    """
+    
+    total_score: float
+    status: Status
+    interest_rate: CategoryScore
+    risk_off: CategoryScore
+    boost: BoostConditions
+    signals: tuple
+    raw: dict
+    regime: RegimeAdjustment = None
+    date: str = None
+    
+    @classmethod
+    def from_data_json(cls, data):
+        """
+        data.json 形式（履歴スナップショット）から復元
+        
+        Args:
+            data: data.json 形式の辞書
+        
+        Returns:
+            TMFResult
+        """
+        categories = data['category_scores']
+        boost = data['boost_conditions']
+        regime = data.get('regime_adjustment')
+        
+        return cls(
+            total_score=data['score'],
+            status=Status.from_level(data['status']['level']),
+            interest_rate=_category_from_dict('interest_rate', categories['interest_rate']),
+            risk_off=_category_from_dict('risk_off', categories['risk_off']),
+            boost=BoostConditions(
+                applied=boost['boost_applied'],
+                multiplier=boost['boost_multiplier'],
+                conditions=tuple(boost['conditions'])
+            ),
+            signals=tuple(data['signals']),
+            raw=data['raw_data'],
+            regime=RegimeAdjustment(**regime) if regime else None,
+            date=data.get('date')
+        )
+
+
+def _category_from_dict(category, data):
+    """data.json のカテゴリ辞書から CategoryScore を復元"""
+    details = data['details']
+    return CategoryScore(
+        total=data['total'],
+        scores=tuple(details[key]['score'] for key in CATEGORY_DETAILS[category])
+    )
+
+
+def _detail_dict(key, score, raw):
+    """詳細スコアの辞書を raw の指標値から組み立て"""
+    if key == 'rate_decline':
+        change = raw.get('treasury_10y_change')
+        if change is None:
+            return {'value': None, 'score': score}
+        return {'value': change['change_pct'], 'score': score}
+    
+    if key == 'sp500_deviation':
+        sp = raw.get('sp500')
+        if sp is None:
+            return {'value': None, 'score': score}
+        return {
+            'value': sp['deviation_pct'],
+            'price': sp['price'],
+            'ma_200': sp['ma_200'],
+            'score': score
+        }
+    
+    return {'value': raw.get(key), 'score': score}
+
+
+def _category_dict(category, category_score, raw):
+    """CategoryScore を data.json 形式の辞書に変換"""
+    return {
+        'total': category_score.total,
+        'details': {
+            key: _detail_dict(key, score, raw)
+            for key, score in zip(CATEGORY_DETAILS[category], category_score.scores)
+        }
+    }
+
+
+def to_score_dict(result):
+    """
+    TMFResult を TMFScorer.calculate_score の戻り値と同じ形式に変換
+    
+    Args:
+        result: TMFResult
+    
+    Returns:
+        dict
+    """
+    return {
+        'total_score': result.total_score,
+        'status': result.status.to_dict(),
+        'category_scores': {
+            'interest_rate': _category_dict('interest_rate', result.interest_rate, result.raw),
+            'risk_off': _category_dict('risk_off', result.risk_off, result.raw)
+        },
+        'boost_conditions': {
+            'boost_applied': result.boost.applied,
+            'boost_multiplier': result.boost.multiplier,
+            'conditions': list(result.boost.conditions)
+        },
+        'regime_adjustment': result.regime.to_dict() if result.regime else None,
+        'signals': list(result.signals),
+        'raw_data': result.raw
+    }
+
+
+def to_data_json(result, last_updated, date):
+    """
+    TMFResult を data.json と同じ形式に変換
+    
+    Args:
+        result: TMFResult
+        last_updated: 更新日時（ISO8601）
+        date: 日付（YYYY-MM-DD）
+    
+    Returns:
+        dict
+    """
+    score = to_score_dict(result)
+    return {
+        'last_updated': last_updated,
+        'date': date,
+        'score': score['total_score'],
+        'status': score['status'],
+        'category_scores': score['category_scores'],
+        'boost_conditions': score['boost_conditions'],
+        'regime_adjustment': score['regime_adjustment'],
+        'signals': score['signals'],
+        'raw_data': score['raw_data']
+    }
+
+
+def dumps(obj):
+    """
+    JSONを最小化したbytesにシリアライズ
+    
+    orjson がインストールされていれば高速パスを使う
+    （どちらも非ASCII文字はエスケープせずUTF-8で出力）
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# テスト用
+if __name__ == "__main__":
+    import sys
+    import time
+    from dataclasses import replace
+    
+    result = TMFResult(
+        total_score=72.5,
+        status=Status.ALERT,
+        interest_rate=CategoryScore(total=68.3, scores=(70.0, 70.0, 65.0)),
+        risk_off=CategoryScore(total=75.2, scores=(62.5, 87.9)),
+        boost=BoostConditions(applied=True, multiplier=1.15, conditions=('金利2週連続急低下',)),
+        signals=('10年債低水準 (3.2%)', '金利急低下 (-0.8%)'),
+        raw={
+            'treasury_10y': 3.2,
+            'treasury_30y': 3.7,
+            'vix': 22.5,
+            'sp500': {'price': 4650, 'ma_200': 4900, 'deviation_pct': -5.2},
+            'treasury_10y_change': {'current': 3.2, 'past': 3.23, 'change_pct': -0.8, 'weeks': 2}
+        }
+    )
+    
+    data = to_data_json(result, '2024-01-01T07:00:00', '2024-01-01')
+    restored = TMFResult.from_data_json(data)
+    
+    print("\n=== 結果モデル ===")
+    print(f"ステータス: {restored.status.emoji} {restored.status.label}")
+    print(f"往復一致: {restored == replace(result, date='2024-01-01')}")
+    print(f"シリアライザ: {'orjson' if orjson is not None else 'json'}")
+    
+    start = time.perf_counter()
+    for _ in range(10000):
+        dumps(to_data_json(result, '2024-01-01T07:00:00', '2024-01-01'))
+    print(f"シリアライズ: {(time.perf_counter() - start) / 10000 * 1e6:.1f}µs/件")
+    print(f"インスタンスサイズ: {sys.getsizeof(result)} bytes（__dict__なし）")
@@ -4,25 +4,333 @@ Incoming Webhookを使用してSlackに通知
 """
 
 import os
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from channels import NotificationDispatcher, channels_from_env
+from templates import MessageTemplate, Slot
+
+
+# Block Kit レイアウト（"{{name}}" はイベントごとに埋めるスロット）
+STATUS_CHANGE_BLOCKS = [
+    {
+        "type": "header",
+        "text": {
+            "type": "plain_text",
+            "text": "{{trend_emoji}} TMFステータス変化検知",
+            "emoji": True
+        }
+    },
+    {
+        "type": "section",
+        "fields": [
+            {
+                "type": "mrkdwn",
+                "text": "*現在のステータス*\n{{status_emoji}} *{{status_label}}*"
+            },
+            {
+                "type": "mrkdwn",
+                "text": "*TMFスコア*\n*{{score}}点* ({{score_diff}})"
+            }
+        ]
+    },
+    {
+        "type": "section",
+        "fields": [
+            {
+                "type": "mrkdwn",
+                "text": "*前回ステータス*\n{{previous_status}}"
+            },
+            {
+                "type": "mrkdwn",
+                "text": "*変化*\n{{trend}}"
+            }
+        ]
+    },
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "*主なシグナル*\n{{change_signals}}"
+        }
+    },
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "<{{dashboard_url}}|📊 ダッシュボードを見る>"
+        }
+    },
+    {
+        "type": "context",
+        "elements": [
+            {
+                "type": "mrkdwn",
+                "text": "更新日時: {{updated_at}}"
+            }
+        ]
+    }
+]
+
+DAILY_SUMMARY_BLOCKS = [
+    {
+        "type": "header",
+        "text": {
+            "type": "plain_text",
+            "text": "📊 TMF監視 - 定期レポート",
+            "emoji": True
+        }
+    },
+    {
+        "type": "section",
+        "fields": [
+            {
+                "type": "mrkdwn",
+                "text": "*ステータス*\n{{status_emoji}} *{{status_label}}*"
+            },
+            {
+                "type": "mrkdwn",
+                "text": "*TMFスコア*\n*{{score}}点*"
+            }
+        ]
+    },
+    {
+        "type": "section",
+        "fields": [
+            {
+                "type": "mrkdwn",
+                "text": "*前日比*\n{{trend_text}}"
+            },
+            {
+                "type": "mrkdwn",
+                "text": "*日付*\n{{date}}"
+            }
+        ]
+    },
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "*カテゴリ別スコア*\n• 金利系: {{interest}}点\n• リスクオフ: {{risk}}点{{boost_text}}{{regime_text}}"
+        }
+    },
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "*シグナル要因*\n{{summary_signals}}"
+        }
+    },
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "<{{dashboard_url}}|📊 詳細ダッシュボード>"
+        }
+    }
+]
+
+# 推移チャート（ダッシュボードと同じSVGへのリンク）
+CHARTS_BLOCK = {
+    "type": "context",
+    "elements": [
+        {
+            "type": "mrkdwn",
+            "text": "📉 {{chart_links}}"
+        }
+    ]
+}
+
+MESSAGE_SLOTS = [
+    Slot('status_emoji'),
+    Slot('status_label'),
+    Slot('score', float),
+    Slot('dashboard_url'),
+    Slot('trend_emoji'),
+    Slot('score_diff', float, '+.1f'),
+    Slot('previous_status'),
+    Slot('trend'),
+    Slot('change_signals', list, limit=3),
+    Slot('updated_at'),
+    Slot('trend_text'),
+    Slot('date'),
+    Slot('interest', float, '.1f'),
+    Slot('risk', float, '.1f'),
+    Slot('boost_text'),
+    Slot('regime_text'),
+    Slot('summary_signals', list, limit=4),
+    Slot('chart_links')
+]
+
+# (通知種別, チャートあり) ごとのコンパイル済みテンプレート
+_templates = {}
+
+
+def message_template(kinds, with_charts=False):
+    """
+    通知種別の組み合わせに対応するテンプレートを取得（初回のみコンパイル）
+    
+    Args:
+        kinds: 通知種別のタプル（'status_change' / 'daily_summary'）
+        with_charts: チャートリンクを含めるか
+    
+    Returns:
+        MessageTemplate
+    """
+    key = (kinds, with_charts)
+    template = _templates.get(key)
+    if template is None:
+        blocks = []
+        if 'status_change' in kinds:
+            blocks += STATUS_CHANGE_BLOCKS
+        if 'daily_summary' in kinds:
+            if blocks:
+                blocks.append({"type": "divider"})
+            blocks += DAILY_SUMMARY_BLOCKS
+            if with_charts:
+                blocks.append(CHARTS_BLOCK)
+        template = _templates[key] = MessageTemplate(blocks, MESSAGE_SLOTS)
+    return template
+
 
 class SlackNotifier:
-    """Slack Incoming Webhookで通知するクラス"""
+    """
+    Slack Incoming Webhookで通知するクラス
+    
+    環境変数で汎用Webhook・メールのチャネルが設定されていれば同じ通知を並行配信する
+    """
+    
+    # 呼び出し元をブロックしないためのスレッド数（通知送信 + 再送 + 非統合時の個別送信）
+    MAX_WORKERS = 4
     
-    def __init__(self, webhook_url=None):
+    # 1回の送信処理でメインの処理を待たせる上限（秒）
+    DELIVERY_BUDGET = 5.0
+    
+    def __init__(self, webhook_url=None, outbox=None, channels=None, metrics=None):
         """
         Args:
             webhook_url: Slack Incoming Webhook URL (指定なしの場合は環境変数から取得)
+            outbox: NotificationOutbox（指定時は送信失敗分を保存して再送）
+            channels: NotificationChannel のリスト（指定なしの場合は環境変数から構成）
+            metrics: Metrics（送信時間・再試行・再送件数を記録）
         """
         self.webhook_url = webhook_url or os.environ.get('SLACK_WEBHOOK_URL')
+        self.outbox = outbox
         
         if not self.webhook_url:
             print("⚠️  SLACK_WEBHOOK_URL が設定されていません")
-            self.enabled = False
+        
+        if channels is None:
+            channels = channels_from_env(self.webhook_url)
+        self.metrics = metrics
+        self.dispatcher = NotificationDispatcher(channels, outbox=outbox, metrics=metrics)
+        self.enabled = bool(self.dispatcher.channels)
+        
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.MAX_WORKERS,
+            thread_name_prefix='notifier'
+        )
+    
+    def close(self):
+        """送信スレッドと各チャネルの接続を終了"""
+        self._executor.shutdown(wait=True)
+        self.dispatcher.close()
+    
+    def submit_notifications(self, result, previous_result, dashboard_url, charts=None, coalesce=True, daily_summary=True):
+        """
+        send_notifications をバックグラウンドで実行
+        
+        呼び出し元はファイル出力などを進め、必要な時点で結果を待つ
+        
+        Returns:
+            Future: send_notifications の戻り値を返す
+        """
+        return self._executor.submit(
+            self.send_notifications,
+            result,
+            previous_result,
+            dashboard_url,
+            charts,
+            coalesce,
+            daily_summary
+        )
+    
+    def send_notifications(self, result, previous_result, dashboard_url, charts=None, coalesce=True, daily_summary=True):
+        """
+        ステータス変化通知と定期サマリーを送信
+        
+        両方が発火する場合、coalesce=True なら1通に統合して送信し、
+        False なら2通を並行して送信する
+        
+        Args:
+            result: スコアリング結果
+            previous_result: 前回のスコアリング結果
+            dashboard_url: ダッシュボードURL
+            charts: ChartRenderer が生成したチャート情報
+            coalesce: 2通を1通に統合するか
+            daily_summary: 定期サマリーを送るか（常駐モードでは1日1回）
+        
+        Returns:
+            dict: 通知種別ごとの送信結果（status_change / daily_summary）
+        """
+        sent = {'status_change': False, 'daily_summary': False}
+        
+        if not self.enabled:
+            print("⚠️  通知がスキップされました（通知チャネル未設定）")
+            return sent
+        
+        kinds = []
+        if self._status_changed(result, previous_result):
+            kinds.append('status_change')
         else:
-            self.enabled = True
+            print("ℹ️  ステータス変化なし（通知スキップ）")
+        if daily_summary:
+            kinds.append('daily_summary')
+        if not kinds:
+            return sent
+        
+        now = datetime.now()
+        
+        if coalesce and len(kinds) > 1:
+            message = self._build_message(kinds, result, previous_result, dashboard_url, charts, now)
+            data = self._event_data(kinds, result, previous_result, dashboard_url)
+            ok = self._send_to_slack(message, data)
+            return {name: ok for name in kinds}
+        
+        futures = {
+            name: self._executor.submit(
+                self._send_to_slack,
+                self._build_message([name], result, previous_result, dashboard_url, charts, now),
+                self._event_data([name], result, previous_result, dashboard_url)
+            )
+            for name in kinds
+        }
+        for name, future in futures.items():
+            sent[name] = future.result()
+        
+        return sent
+    
+    @staticmethod
+    def _status_changed(current_result, previous_result):
+        """ステータスが変化したか（前回データなしは変化扱い）"""
+        if previous_result is None:
+            return True
+        return current_result['status']['level'] != previous_result['status']['level']
+    
+    @staticmethod
+    def _event_data(kinds, result, previous_result, dashboard_url):
+        """Slack以外のチャネル向けの構造化データ"""
+        status = result['status']
+        return {
+            'title': f"TMF監視: {status['emoji']} {status['label']} ({result['total_score']}点)",
+            'kinds': kinds,
+            'score': result['total_score'],
+            'status': status['level'],
+            'previous_status': previous_result['status']['level'] if previous_result else None,
+            'previous_score': previous_result['total_score'] if previous_result else None,
+            'signals': list(result['signals']),
+            'dashboard_url': dashboard_url
+        }
     
     def send_status_change_notification(self, current_result, previous_result, dashboard_url):
         """
@@ -34,28 +342,29 @@ class SlackNotifier:
             dashboard_url: ダッシュボードURL
         """
         if not self.enabled:
-            print("⚠️  Slack通知がスキップされました（Webhook未設定）")
+            print("⚠️  通知がスキップされました（通知チャネル未設定）")
             return False
         
-        current_status = current_result['status']['level']
-        previous_status = previous_result['status']['level'] if previous_result else 'unknown'
-        
         # ステータスが変化していない場合はスキップ
-        if current_status == previous_status and previous_result is not None:
+        if not self._status_changed(current_result, previous_result):
             print("ℹ️  ステータス変化なし（通知スキップ）")
             return False
         
         # メッセージ作成
-        message = self._build_status_change_message(
+        message = self._build_message(
+            ['status_change'],
             current_result, 
             previous_result, 
             dashboard_url
         )
         
         # 送信
-        return self._send_to_slack(message)
+        return self._send_to_slack(
+            message,
+            self._event_data(['status_change'], current_result, previous_result, dashboard_url)
+        )
     
-    def send_daily_summary(self, result, previous_result, dashboard_url):
+    def send_daily_summary(self, result, previous_result, dashboard_url, charts=None):
         """
         定期サマリー通知を送信（毎日）
         
@@ -63,24 +372,71 @@ class SlackNotifier:
             result: スコアリング結果
             previous_result: 前回のスコアリング結果
             dashboard_url: ダッシュボードURL
+            charts: ChartRenderer が生成したチャート情報（指定時はリンクを添付）
         """
         if not self.enabled:
-            print("⚠️  Slack通知がスキップされました（Webhook未設定）")
+            print("⚠️  通知がスキップされました（通知チャネル未設定）")
             return False
         
         # メッセージ作成
-        message = self._build_daily_summary_message(
+        message = self._build_message(
+            ['daily_summary'],
             result, 
             previous_result, 
-            dashboard_url
+            dashboard_url,
+            charts
         )
         
         # 送信
-        return self._send_to_slack(message)
+        return self._send_to_slack(
+            message,
+            self._event_data(['daily_summary'], result, previous_result, dashboard_url)
+        )
     
-    def _build_status_change_message(self, current, previous, dashboard_url):
-        """ステータス変化通知メッセージを構築"""
-        status = current['status']
+    def _build_message(self, kinds, result, previous, dashboard_url, charts=None, now=None):
+        """
+        通知メッセージを構築（コンパイル済みテンプレートにスロット値を埋める）
+        
+        Args:
+            kinds: 通知種別のリスト（'status_change' / 'daily_summary'）
+            result: スコアリング結果
+            previous: 前回のスコアリング結果
+            dashboard_url: ダッシュボードURL
+            charts: ChartRenderer が生成したチャート情報（定期サマリーにリンクを添付）
+            now: 更新日時（省略時は現在時刻）
+        
+        Returns:
+            dict: {'body': Slackへ送るJSON（bytes）, 'text': プレーンテキスト}
+        """
+        now = now or datetime.now()
+        status = result['status']
+        values = {
+            'status_emoji': status['emoji'],
+            'status_label': status['label'],
+            'score': result['total_score'],
+            'dashboard_url': dashboard_url
+        }
+        
+        if 'status_change' in kinds:
+            values.update(self._status_change_values(result, previous, now))
+        
+        with_charts = 'daily_summary' in kinds and bool(charts)
+        if 'daily_summary' in kinds:
+            values.update(self._daily_summary_values(result, previous, now))
+            if with_charts:
+                links = [
+                    f"<{dashboard_url}{chart['path']}?v={chart['hash']}|{chart['label']}>"
+                    for name, chart in charts.items()
+                    if name.endswith('-30d')
+                ]
+                values['chart_links'] = " / ".join(links)
+        
+        template = message_template(tuple(kinds), with_charts)
+        return {'body': template.render(values), 'text': template.render_text(values)}
+    
+    @staticmethod
+    def _status_change_values(current, previous, now):
+        """ステータス変化通知のスロット値"""
         score = current['total_score']
         
         # 前回スコア
@@ -99,78 +455,23 @@ class SlackNotifier:
             trend_emoji = "ℹ️"
         
         # 前回ステータス
-        prev_status_text = ""
         if previous:
             prev_status_text = f"{previous['status']['emoji']} {previous['status']['label']}"
         else:
             prev_status_text = "（初回実行）"
         
-        # ブロック形式のメッセージ
-        blocks = [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": f"{trend_emoji} TMFステータス変化検知",
-                    "emoji": True
-                }
-            },
-            {
-                "type": "section",
-                "fields": [
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*現在のステータス*\n{status['emoji']} *{status['label']}*"
-                    },
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*TMFスコア*\n*{score}点* ({score_diff:+.1f})"
-                    }
-                ]
-            },
-            {
-                "type": "section",
-                "fields": [
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*前回ステータス*\n{prev_status_text}"
-                    },
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*変化*\n{trend}"
-                    }
-                ]
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"*主なシグナル*\n" + "\n".join([f"• {s}" for s in current['signals'][:3]])
-                }
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"<{dashboard_url}|📊 ダッシュボードを見る>"
-                }
-            },
-            {
-                "type": "context",
-                "elements": [
-                    {
-                        "type": "mrkdwn",
-                        "text": f"更新日時: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-                    }
-                ]
-            }
-        ]
-        
-        return {"blocks": blocks}
+        return {
+            'trend_emoji': trend_emoji,
+            'score_diff': score_diff,
+            'previous_status': prev_status_text,
+            'trend': trend,
+            'change_signals': current['signals'],
+            'updated_at': now.strftime('%Y-%m-%d %H:%M')
+        }
     
-    def _build_daily_summary_message(self, result, previous, dashboard_url):
-        """定期サマリーメッセージを構築"""
-        status = result['status']
+    @staticmethod
+    def _daily_summary_values(result, previous, now):
+        """定期サマリーのスロット値"""
         score = result['total_score']
         
         # 前日比
@@ -184,95 +485,87 @@ class SlackNotifier:
         else:
             trend_text = "→ 変化なし"
         
-        # カテゴリ別スコア
-        interest = result['category_scores']['interest_rate']['total']
-        risk = result['category_scores']['risk_off']['total']
-        
         # ブースト条件
         boost_text = ""
         if result['boost_conditions']['boost_applied']:
             boost_text = "\n⚡ " + "、".join(result['boost_conditions']['conditions'])
         
-        blocks = [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": "📊 TMF監視 - 定期レポート",
-                    "emoji": True
-                }
-            },
-            {
-                "type": "section",
-                "fields": [
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*ステータス*\n{status['emoji']} *{status['label']}*"
-                    },
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*TMFスコア*\n*{score}点*"
-                    }
-                ]
-            },
-            {
-                "type": "section",
-                "fields": [
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*前日比*\n{trend_text}"
-                    },
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*日付*\n{datetime.now().strftime('%Y-%m-%d')}"
-                    }
-                ]
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"*カテゴリ別スコア*\n• 金利系: {interest:.1f}点\n• リスクオフ: {risk:.1f}点{boost_text}"
-                }
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"*シグナル要因*\n" + "\n".join([f"• {s}" for s in result['signals'][:4]])
-                }
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"<{dashboard_url}|📊 詳細ダッシュボード>"
-                }
-            }
-        ]
+        # 株債相関レジーム補正（ブーストとは別に、引き上げ・引き下げを明示）
+        regime_text = ""
+        regime = result.get('regime_adjustment')
+        if regime:
+            direction = "スコア引き上げ" if regime['multiplier'] > 1 else "スコア引き下げ"
+            regime_text = f"\n{'📈' if regime['multiplier'] > 1 else '📉'} {regime['label']}（{direction} ×{regime['multiplier']}）"
         
-        return {"blocks": blocks}
+        return {
+            'trend_text': trend_text,
+            'date': now.strftime('%Y-%m-%d'),
+            'interest': result['category_scores']['interest_rate']['total'],
+            'risk': result['category_scores']['risk_off']['total'],
+            'boost_text': boost_text,
+            'regime_text': regime_text,
+            'summary_signals': result['signals']
+        }
     
-    def _send_to_slack(self, message):
-        """Slackにメッセージを送信"""
+    def _send_to_slack(self, message, data=None):
+        """
+        メッセージを全チャネルへ並行配信
+        
+        Slackにはコンパイル済みテンプレートから生成したJSONをそのまま、
+        他のチャネルにはプレーンテキストと構造化データを送る。送信待ちキューがある場合は失敗分を次回以降に再送する
+        
+        Returns:
+            bool: いずれかのチャネルへ送信できた場合はTrue
+        """
         if not self.enabled:
             return False
         
-        try:
-            response = requests.post(
-                self.webhook_url,
-                json=message,
-                headers={'Content-Type': 'application/json'},
-                timeout=10
-            )
-            response.raise_for_status()
-            
-            print("✅ Slack通知送信成功")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Slack通知送信失敗: {str(e)}")
-            return False
+        notification = {
+            'body': message['body'],
+            'text': message['text'],
+            'data': data or {}
+        }
+        results = self.dispatcher.dispatch(notification, self.DELIVERY_BUDGET)
+        
+        return any(results.values())
+    
+    def drain_outbox(self, budget=None):
+        """
+        送信待ちキューに残っている通知を全チャネル並行で再送
+        
+        Args:
+            budget: 使う最大時間（秒、省略時は DELIVERY_BUDGET）
+        
+        Returns:
+            dict: 件数（キューなし・チャネル未設定の場合はNone）
+        """
+        if not self.enabled:
+            return None
+        
+        stats = self.dispatcher.drain(self.DELIVERY_BUDGET if budget is None else budget)
+        if stats and self.metrics is not None:
+            for key, value in stats.items():
+                self.metrics.count('outbox', value, result=key)
+        if stats and (stats['sent'] or stats['failed']):
+            print(f"📮 送信待ち通知の再送: 成功 {stats['sent']}件 / 失敗 {stats['failed']}件 / 保留 {stats['deferred']}件")
+        
+        return stats
+    
+    def submit_outbox_drain(self, budget=None):
+        """drain_outbox をバックグラウンドで実行（Futureを返す）"""
+        return self._executor.submit(self.drain_outbox, budget)
+    
+    def start_background_drainer(self, interval=60):
+        """
+        送信待ちキューの定期再送を開始
+        
+        Returns:
+            threading.Event: set() で停止（キューなしの場合はNone）
+        """
+        if not self.enabled:
+            return None
+        
+        return self.dispatcher.start_background(interval, self.DELIVERY_BUDGET)
 
 
 # テスト用
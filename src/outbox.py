@@ -0,0 +1,273 @@
+"""
+通知送信待ちキューモジュール
+送信失敗した通知をファイルに保存し、次回以降の実行やバックグラウンドで再送
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class NotificationOutbox:
+    """
+    ファイルベースの通知送信待ちキュー
+    
+    1通につき1ファイル（<spool_dir>/<チャネル>/<連番>-<キー>.json）を
+    一時ファイル経由のリネームで追加する。チャネルごとに古い順に送信し、
+    先頭が送信できない間は後続を送らないことで順序を保証する
+    """
+    
+    # 再送間隔の初期値と上限（秒）。失敗ごとに倍にする
+    BASE_DELAY = 30
+    MAX_DELAY = 6 * 60 * 60
+    
+    # これより古い未送信の通知は dead/ へ移して送信を諦める（秒）
+    MAX_AGE = 3 * 24 * 60 * 60
+    
+    # 1回の送信のタイムアウト上限（秒）
+    SEND_TIMEOUT = 10
+    
+    # 送信済みキーの保持件数
+    DELIVERED_KEEP = 1000
+    
+    def __init__(self, spool_dir):
+        """
+        Args:
+            spool_dir: キューの保存先ディレクトリ
+        """
+        self.spool_dir = spool_dir
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+    
+    def enqueue(self, channel, payload, key=None):
+        """
+        通知をキューに追加
+        
+        同じキーの通知が送信待ち・送信済みの場合は追加しない
+        
+        Args:
+            channel: チャネル名
+            payload: 送信内容（JSONシリアライズ可能な値、またはシリアライズ済みのbytes）
+            key: 冪等キー（省略時はチャネルと内容のハッシュ）
+        
+        Returns:
+            str: 冪等キー
+        """
+        raw = isinstance(payload, bytes)
+        if key is None:
+            body = payload if raw else json.dumps(payload, ensure_ascii=False, sort_keys=True).encode('utf-8')
+            key = hashlib.sha256(channel.encode('utf-8') + b'\0' + body).hexdigest()[:24]
+        
+        with self._lock(channel):
+            if self.is_delivered(channel, key) or any(e['key'] == key for _, e in self.pending(channel)):
+                return key
+            
+            entry = {
+                'key': key,
+                'channel': channel,
+                'created': time.time(),
+                'attempts': 0,
+                'next_attempt': 0,
+                'payload': payload.decode('utf-8') if raw else payload,
+                'raw': raw
+            }
+            channel_dir = self._channel_dir(channel)
+            os.makedirs(channel_dir, exist_ok=True)
+            self._write(os.path.join(channel_dir, f"{time.time_ns():020d}-{key}.json"), entry)
+        
+        return key
+    
+    def channels(self):
+        """送信待ちがあり得るチャネル一覧"""
+        if not os.path.isdir(self.spool_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.spool_dir)
+            if name != 'dead' and os.path.isdir(os.path.join(self.spool_dir, name))
+        )
+    
+    def pending(self, channel):
+        """
+        チャネルの送信待ち一覧（古い順）
+        
+        Returns:
+            list: (ファイルパス, エントリ) のリスト
+        """
+        channel_dir = self._channel_dir(channel)
+        if not os.path.isdir(channel_dir):
+            return []
+        
+        entries = []
+        for filename in sorted(os.listdir(channel_dir)):
+            if not filename.endswith('.json'):
+                continue
+            path = os.path.join(channel_dir, filename)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entries.append((path, json.load(f)))
+            except (OSError, ValueError):
+                continue
+        
+        return entries
+    
+    def is_delivered(self, channel, key):
+        """指定キーの通知が送信済みか"""
+        return key in self._delivered_keys(channel)
+    
+    def drain(self, senders, budget=5.0):
+        """
+        送信待ちの通知を送信
+        
+        Args:
+            senders: {チャネル名: send(payload, key, timeout) -> bool}
+            budget: この処理に使う最大時間（秒）。超えた分は次回に回す
+        
+        Returns:
+            dict: 件数（sent / failed / deferred / dead）
+        """
+        stats = {'sent': 0, 'failed': 0, 'deferred': 0, 'dead': 0}
+        deadline = time.monotonic() + budget
+        
+        for channel, send in senders.items():
+            self._drain_channel(channel, send, deadline, stats)
+        
+        return stats
+    
+    def start_background(self, senders, interval=60, budget=5.0):
+        """
+        バックグラウンドで定期的に drain を実行
+        
+        Args:
+            senders: drain と同じ
+            interval: 実行間隔（秒）
+            budget: 1回の drain に使う最大時間（秒）
+        
+        Returns:
+            threading.Event: set() で停止
+        """
+        stop = threading.Event()
+        
+        def loop():
+            while not stop.wait(interval):
+                self.drain(senders, budget)
+        
+        threading.Thread(target=loop, name='outbox-drainer', daemon=True).start()
+        return stop
+    
+    def _drain_channel(self, channel, send, deadline, stats):
+        """1チャネル分を古い順に送信（失敗・未到来で打ち切り）"""
+        lock = self._lock(channel)
+        if not lock.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            stats['deferred'] += len(self.pending(channel))
+            return
+        
+        try:
+            entries = self.pending(channel)
+            for index, (path, entry) in enumerate(entries):
+                now = time.time()
+                remaining = deadline - time.monotonic()
+                
+                if now - entry['created'] > self.MAX_AGE:
+                    self._move_to_dead(path)
+                    stats['dead'] += 1
+                    continue
+                
+                if self.is_delivered(channel, entry['key']):
+                    os.remove(path)
+                    continue
+                
+                if remaining <= 0 or entry['next_attempt'] > now:
+                    stats['deferred'] += len(entries) - index
+                    break
+                
+                payload = entry['payload'].encode('utf-8') if entry.get('raw') else entry['payload']
+                if send(payload, entry['key'], min(remaining, self.SEND_TIMEOUT)):
+                    self._mark_delivered(channel, entry['key'])
+                    os.remove(path)
+                    stats['sent'] += 1
+                    continue
+                
+                entry['attempts'] += 1
+                entry['next_attempt'] = now + min(
+                    self.BASE_DELAY * 2 ** (entry['attempts'] - 1),
+                    self.MAX_DELAY
+                )
+                self._write(path, entry)
+                stats['failed'] += 1
+                stats['deferred'] += len(entries) - index - 1
+                break
+        finally:
+            lock.release()
+    
+    def _lock(self, channel):
+        """チャネルごとのロック"""
+        with self._locks_guard:
+            return self._locks.setdefault(channel, threading.RLock())
+    
+    def _channel_dir(self, channel):
+        return os.path.join(self.spool_dir, channel)
+    
+    def _delivered_path(self, channel):
+        return os.path.join(self._channel_dir(channel), 'delivered.log')
+    
+    def _delivered_keys(self, channel):
+        """送信済みキーの一覧"""
+        try:
+            with open(self._delivered_path(channel), 'r', encoding='utf-8') as f:
+                return [line.strip() for line in f if line.strip()]
+        except OSError:
+            return []
+    
+    def _mark_delivered(self, channel, key):
+        """送信済みキーを追記（上限を超えたら古いものを切り詰め）"""
+        path = self._delivered_path(channel)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(key + '\n')
+        
+        keys = self._delivered_keys(channel)
+        if len(keys) > self.DELIVERED_KEEP * 2:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(keys[-self.DELIVERED_KEEP:]) + '\n')
+            os.replace(tmp_path, path)
+    
+    def _move_to_dead(self, path):
+        """送信を諦めた通知を dead/ へ移動"""
+        dead_dir = os.path.join(self.spool_dir, 'dead')
+        os.makedirs(dead_dir, exist_ok=True)
+        os.replace(path, os.path.join(dead_dir, os.path.basename(path)))
+    
+    @staticmethod
+    def _write(path, entry):
+        """一時ファイル経由でアトミックに書き込み"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+# テスト用
+if __name__ == "__main__":
+    import tempfile
+    
+    outbox = NotificationOutbox(tempfile.mkdtemp())
+    attempts = []
+    
+    def flaky_send(payload, key, timeout):
+        attempts.append(payload['text'])
+        return len(attempts) > 1
+    
+    outbox.enqueue('slack', {'text': '1通目'})
+    outbox.enqueue('slack', {'text': '2通目'})
+    
+    print("\n=== 送信待ちキュー ===")
+    print(f"1回目: {outbox.drain({'slack': flaky_send})}")
+    
+    # バックオフ待ちを解除して再送
+    for path, entry in outbox.pending('slack'):
+        entry['next_attempt'] = 0
+        outbox._write(path, entry)
+    print(f"2回目: {outbox.drain({'slack': flaky_send})}")
+    print(f"送信順: {attempts}")
@@ -0,0 +1,165 @@
+"""
+パイプライン実行モジュール
+依存関係を宣言したステージのDAGを、依存が揃ったものから並行実行してクリティカルパスを計測
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class PipelineError(Exception):
+    """ステージの失敗（失敗したステージ名と元の例外を保持）"""
+    
+    def __init__(self, stage, error):
+        super().__init__(f"{stage}: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class Pipeline:
+    """
+    ステージのDAGを実行するクラス
+    
+    各ステージは依存ステージの戻り値を引数に受け取る。
+    依存がすべて完了したステージから順にスレッドで実行し、
+    いずれかが失敗した場合は新しいステージを開始せず、実行中のものの完了を待って PipelineError を送出する
+    """
+    
+    def __init__(self, max_workers=4, metrics=None, stage_wrapper=None):
+        """
+        Args:
+            max_workers: 同時に実行するステージ数の上限
+            metrics: Metrics（指定時は各ステージを 'stage' スパンとして記録）
+            stage_wrapper: wrapper(ステージ名, 関数) → 関数（プロファイル等でステージをラップ）
+        """
+        self.max_workers = max_workers
+        self.metrics = metrics
+        self.stage_wrapper = stage_wrapper
+        self.stages = {}
+        self.timings = {}
+    
+    def add(self, name, func, deps=()):
+        """
+        ステージを追加
+        
+        Args:
+            name: ステージ名
+            func: 依存ステージの戻り値を deps の順に受け取る関数
+            deps: 依存するステージ名（追加済みのもの）
+        """
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"未定義の依存ステージ: {name} → {dep}")
+        if self.stage_wrapper is not None:
+            func = self.stage_wrapper(name, func)
+        self.stages[name] = (func, tuple(deps))
+        return self
+    
+    def run(self):
+        """
+        全ステージを実行
+        
+        Returns:
+            dict: {ステージ名: 戻り値}
+        
+        Raises:
+            PipelineError: いずれかのステージが失敗した場合（最初の失敗）
+        """
+        results = {}
+        self.timings = {}
+        waiting = dict(self.stages)
+        running = {}
+        failure = None
+        origin = time.perf_counter()
+        
+        def execute(name, func, args):
+            start = time.perf_counter()
+            ok = False
+            try:
+                value = func(*args)
+                ok = True
+                return value
+            finally:
+                end = time.perf_counter()
+                self.timings[name] = (start - origin, end - origin)
+                if self.metrics is not None:
+                    self.metrics.add_span('stage', end - start, ok=ok, start=start, stage=name)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pipeline') as executor:
+            while waiting or running:
+                if failure is None:
+                    for name, (func, deps) in list(waiting.items()):
+                        if all(dep in results for dep in deps):
+                            args = [results[dep] for dep in deps]
+                            running[executor.submit(execute, name, func, args)] = name
+                            del waiting[name]
+                
+                if not running:
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        if failure is None:
+                            failure = PipelineError(name, e)
+        
+        if failure is not None:
+            raise failure
+        return results
+    
+    def critical_path(self):
+        """
+        直近の実行のクリティカルパス
+        
+        最後に終わったステージから、最も遅く終わった依存ステージを順に遡る
+        
+        Returns:
+            list: ステージ名のリスト（実行順）
+        """
+        if not self.timings:
+            return []
+        
+        path = []
+        name = max(self.timings, key=lambda n: self.timings[n][1])
+        while name is not None:
+            path.append(name)
+            deps = [dep for dep in self.stages[name][1] if dep in self.timings]
+            name = max(deps, key=lambda n: self.timings[n][1]) if deps else None
+        
+        return list(reversed(path))
+    
+    def report(self):
+        """
+        直近の実行の所要時間
+        
+        Returns:
+            dict: wall（全体）, total（全ステージの合計）, critical_path（[(名前, 秒)]）, stages（{名前: 秒}）
+        """
+        stages = {name: end - start for name, (start, end) in self.timings.items()}
+        return {
+            'wall': max((end for _, end in self.timings.values()), default=0.0),
+            'total': sum(stages.values()),
+            'critical_path': [(name, stages[name]) for name in self.critical_path()],
+            'stages': stages
+        }
+
+
+# テスト用
+if __name__ == "__main__":
+    pipeline = Pipeline()
+    pipeline.add('fetch', lambda: time.sleep(0.3) or 'raw')
+    pipeline.add('previous', lambda: time.sleep(0.1) or 'prev')
+    pipeline.add('score', lambda raw: time.sleep(0.05) or f"score({raw})", deps=['fetch'])
+    pipeline.add('notify', lambda score, prev: time.sleep(0.2), deps=['score', 'previous'])
+    pipeline.add('render', lambda score: time.sleep(0.1), deps=['score'])
+    
+    results = pipeline.run()
+    report = pipeline.report()
+    
+    print("\n=== パイプライン ===")
+    print(f"結果: {results['score']}")
+    print(f"所要時間: {report['wall']:.2f}秒（逐次なら {report['total']:.2f}秒）")
+    print("クリティカルパス: " + " → ".join(f"{name} {seconds:.2f}秒" for name, seconds in report['critical_path']))
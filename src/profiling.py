@@ -0,0 +1,205 @@
+"""
+プロファイリングモジュール
+パイプラインの各ステージを cProfile と tracemalloc で計測し、ホットな関数と主な割り当て箇所を出力
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+
+def load_raw_snapshot(path):
+    """
+    保存済みの指標データを DataFetcher.fetch_all_data と同じ形式で読み込み
+    
+    fetch_all_data の出力をそのまま保存したJSONのほか、
+    data.json・履歴スナップショット（docs/history/YYYY-MM-DD.json）も受け付ける
+    
+    Args:
+        path: JSONファイルのパス
+    
+    Returns:
+        dict: {'timestamp', 'date', 'indicators'}
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    if 'indicators' in data:
+        return data
+    
+    if 'raw_data' in data:
+        return {
+            'timestamp': data.get('last_updated'),
+            'date': data.get('date'),
+            'indicators': data['raw_data']
+        }
+    
+    raise ValueError(f"指標データの形式ではありません: {path}")
+
+
+def _format_bytes(size):
+    """バイト数を読みやすい単位で表示"""
+    sign = '-' if size < 0 else '+'
+    size = abs(size)
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024 or unit == 'MB':
+            return f"{sign}{size:.1f}{unit}" if unit != 'B' else f"{sign}{size}{unit}"
+        size /= 1024
+
+
+class StageProfiler:
+    """
+    ステージごとの CPU・メモリのプロファイラ
+    
+    cProfile はスレッドごと、tracemalloc はプロセス全体で計測するため、
+    ステージは逐次実行（Pipeline の max_workers=1）でラップする前提
+    """
+    
+    # 表示する関数・割り当て箇所の件数
+    TOP = 15
+    
+    # tracemalloc が保持するスタックの深さ
+    TRACE_FRAMES = 1
+    
+    def __init__(self, top=None):
+        """
+        Args:
+            top: 表示する件数
+        """
+        self.top = top or self.TOP
+        self.stages = {}
+        self._filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>')
+        ]
+    
+    def __enter__(self):
+        tracemalloc.start(self.TRACE_FRAMES)
+        # フィルタのパターンを先にコンパイルし、最初のステージの割り当てに混ざらないようにする
+        tracemalloc.take_snapshot().filter_traces(self._filters)
+        return self
+    
+    def __exit__(self, *exc):
+        tracemalloc.stop()
+    
+    def wrap(self, name, func):
+        """
+        ステージ関数をプロファイル付きでラップ（Pipeline の stage_wrapper に渡す）
+        
+        Args:
+            name: ステージ名
+            func: ステージ関数
+        """
+        def profiled(*args):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            before = tracemalloc.take_snapshot().filter_traces(self._filters)
+            profile = cProfile.Profile()
+            start = time.perf_counter()
+            
+            profile.enable()
+            try:
+                return func(*args)
+            finally:
+                profile.disable()
+                seconds = time.perf_counter() - start
+                current, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot().filter_traces(self._filters)
+                
+                self.stages[name] = {
+                    'seconds': seconds,
+                    'profile': profile,
+                    'peak': peak - base,
+                    'net': current - base,
+                    'allocations': after.compare_to(before, 'lineno')[:self.top]
+                }
+        
+        return profiled
+    
+    def hot_functions(self, name):
+        """
+        ステージ内で自身の処理時間（tottime）が長い関数
+        
+        Returns:
+            list: (呼び出し回数, tottime, cumtime, 関数の位置) のリスト
+        """
+        stats = pstats.Stats(self.stages[name]['profile'])
+        rows = []
+        for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            location = f"{os.path.basename(filename)}:{line}({function})" if line else function
+            rows.append((calls, tottime, cumtime, location))
+        
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows[:self.top]
+    
+    def format_report(self):
+        """全ステージのレポート（処理時間の長い順）"""
+        lines = []
+        for name, stage in sorted(self.stages.items(), key=lambda item: item[1]['seconds'], reverse=True):
+            lines.append("=" * 78)
+            lines.append(
+                f"■ {name}: {stage['seconds']:.3f}秒 / "
+                f"メモリ ピーク {_format_bytes(stage['peak'])}・増加 {_format_bytes(stage['net'])}"
+            )
+            lines.append("-" * 78)
+            lines.append(f"{'呼出回数':>8} {'自身(秒)':>10} {'累積(秒)':>10}  関数")
+            for calls, tottime, cumtime, location in self.hot_functions(name):
+                lines.append(f"{calls:>10} {tottime:>10.4f} {cumtime:>10.4f}  {location}")
+            
+            allocations = [stat for stat in stage['allocations'] if stat.size_diff]
+            if allocations:
+                lines.append("")
+                lines.append(f"{'増加':>10} {'件数':>8}  割り当て箇所")
+                for stat in allocations:
+                    frame = stat.traceback[0]
+                    lines.append(
+                        f"{_format_bytes(stat.size_diff):>10} {stat.count_diff:>+8}  "
+                        f"{os.path.basename(frame.filename)}:{frame.lineno}"
+                    )
+            lines.append("")
+        
+        return '\n'.join(lines)
+    
+    def dump(self, output_dir):
+        """
+        レポート（report.txt）とステージごとの pstats（<ステージ>.prof）を保存
+        
+        .prof は `python -m pstats` や snakeviz で詳しく確認できる
+        
+        Args:
+            output_dir: 出力先ディレクトリ
+        
+        Returns:
+            str: report.txt のパス
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        for name, stage in self.stages.items():
+            stage['profile'].dump_stats(os.path.join(output_dir, f"{name}.prof"))
+        
+        report_path = os.path.join(output_dir, 'report.txt')
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(self.format_report())
+        
+        return report_path
+
+
+# テスト用
+if __name__ == "__main__":
+    from pipeline import Pipeline
+    
+    def build(n):
+        return [{'value': i, 'label': str(i)} for i in range(n)]
+    
+    with StageProfiler(top=5) as profiler:
+        pipeline = Pipeline(max_workers=1, stage_wrapper=profiler.wrap)
+        pipeline.add('build', lambda: build(50000))
+        pipeline.add('sum', lambda rows: sum(row['value'] for row in rows), deps=['build'])
+        pipeline.run()
+    
+    print("\n=== プロファイル ===")
+    print(profiler.format_report())
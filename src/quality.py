@@ -0,0 +1,346 @@
+"""
+データ品質チェックモジュール
+スコアリング前に各指標を直近の履歴と比較し、異常値を隔離して前回値で代替・停滞値や国債利回りの整合性をフラグ付け
+"""
+
+import json
+import math
+import os
+from statistics import median
+
+# チェック対象の指標
+# value: 辞書の指標から数値を取り出すキー、change: 変化の測り方（diff: 差、log: 対数変化率）、
+# range: 有効な値の範囲、min_scale: 変化のばらつきの下限（変化がほぼない期間の過敏な判定を防ぐ）、
+# series: 観測日を DataFetcher.observations から引くシリーズID
+CHECKS = {
+    'treasury_10y': {'value': None, 'change': 'diff', 'range': (0.01, 25.0), 'min_scale': 0.02, 'series': 'DGS10'},
+    'treasury_30y': {'value': None, 'change': 'diff', 'range': (0.01, 25.0), 'min_scale': 0.02, 'series': 'DGS30'},
+    'vix': {'value': None, 'change': 'log', 'range': (5.0, 150.0), 'min_scale': 0.02, 'series': 'VIXCLS'},
+    'sp500': {'value': 'price', 'change': 'log', 'range': (1.0, 1e6), 'min_scale': 0.002, 'series': 'SP500'}
+}
+
+# 代替した指標から算出している指標（一緒に前回値へ戻す）
+DEPENDENTS = {
+    'treasury_10y': ('treasury_10y_change',)
+}
+
+# 表示名
+LABELS = {
+    'invalid': '無効値',
+    'spike': 'スパイク',
+    'stale': '停滞',
+    'spread': '30年-10年スプレッド異常'
+}
+
+
+def _scalar(indicator, key):
+    """指標から数値を取り出し（取り出せない場合は None）"""
+    if isinstance(indicator, dict):
+        indicator = indicator.get(key)
+    if isinstance(indicator, (int, float)) and not isinstance(indicator, bool):
+        return float(indicator)
+    return None
+
+
+def _change(kind, value, previous):
+    """前回値からの変化"""
+    if kind == 'log':
+        return math.log(value / previous)
+    return value - previous
+
+
+class QualityGate:
+    """
+    スコアリング前のデータ品質チェック
+    
+    指標ごとに1日1件の採用値を WINDOW 日分、列ごとの配列で保持し、全指標をまとめて判定する
+    
+    - 無効値: 範囲外・0・NaN → 前回の採用値で代替
+    - スパイク: 前日からの変化のロバストzスコア（中央値・MAD）が SPIKE_Z を超える → 前回の採用値で代替。
+      より新しい観測日の値も同じ水準なら実際の変動とみなして採用する（同じ観測日の再取得では採用しない）
+    - 停滞: 直近 STALE_DAYS 日の値がすべて同じ → フラグのみ
+    - 整合性: 30年債 - 10年債が SPREAD_RANGE の範囲外 → zスコアの大きい方を代替
+    """
+    
+    # 保持する日数・判定に必要な日数
+    WINDOW = 60
+    MIN_HISTORY = 10
+    
+    # ロバストzスコアの閾値（MAD を標準偏差相当にする係数）
+    SPIKE_Z = 12.0
+    MAD_SCALE = 1.4826
+    
+    # 同じ値がこの日数続いたら停滞（週末・祝日の実行も含むため長め）
+    STALE_DAYS = 6
+    
+    # 30年債 - 10年債（%ポイント）の妥当な範囲
+    SPREAD_RANGE = (-1.0, 2.5)
+    
+    def __init__(self, path=None):
+        """
+        Args:
+            path: 採用値の保存先（JSON、省略時は保存しない）
+        """
+        self.path = path
+        self.dates = []
+        self.values = {name: [] for name in CHECKS}
+        # 最後に採用した指標（代替に使う、取得時と同じ形式）・確認待ちの異常値 {指標: [観測日, 値]}
+        self.last = {}
+        self.pending = {}
+        self._statistics = {}
+        
+        if path:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = None
+            if state:
+                self.load_state(state)
+    
+    def export_state(self):
+        """採用値を保存用の辞書で取得"""
+        return {
+            'dates': self.dates,
+            'values': self.values,
+            'last': self.last,
+            'pending': self.pending
+        }
+    
+    def load_state(self, state):
+        """export_state で保存した採用値を復元（列の長さが揃っていなければ何もしない）"""
+        dates = state.get('dates', [])
+        values = state.get('values', {})
+        if any(len(values.get(name, dates)) != len(dates) for name in CHECKS):
+            return
+        self.dates = list(dates)
+        self.values = {name: list(values.get(name, [None] * len(dates))) for name in CHECKS}
+        self.last = dict(state.get('last', {}))
+        # 観測日を持たない古い形式の確認待ちは捨てる（次の観測で改めて判定）
+        self.pending = {
+            name: list(entry) for name, entry in state.get('pending', {}).items()
+            if isinstance(entry, (list, tuple)) and len(entry) == 2
+        }
+        self._statistics = {}
+    
+    def seed(self, snapshots):
+        """
+        採用値がない場合に日次データ（data.json 形式、古い順）から初期化
+        
+        Args:
+            snapshots: HistoryStore.recent などの戻り値
+        """
+        if self.dates:
+            return
+        for snapshot in snapshots:
+            indicators = snapshot.get('raw_data') or {}
+            self._record(snapshot['date'], {
+                name: _scalar(indicators.get(name), spec['value']) for name, spec in CHECKS.items()
+            })
+            self.last.update({name: value for name, value in indicators.items() if value is not None})
+    
+    def save(self):
+        """採用値を保存（一時ファイル経由で置き換え）"""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.export_state(), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+    
+    def _record(self, day, scalars):
+        """その日の採用値を追加（同じ日付は置き換え）"""
+        # 同じ日付の置き換えは statistics（その日より前の採用値から算出）に影響しない
+        if self.dates and self.dates[-1] == day:
+            for name in CHECKS:
+                self.values[name][-1] = scalars.get(name)
+            return
+        
+        self.dates.append(day)
+        for name in CHECKS:
+            self.values[name].append(scalars.get(name))
+        if len(self.dates) > self.WINDOW:
+            del self.dates[:-self.WINDOW]
+            for column in self.values.values():
+                del column[:-self.WINDOW]
+        self._statistics = {}
+    
+    def statistics(self, day):
+        """
+        day より前の採用値から、指標ごとの前回値と変化の中心・ばらつきを算出（結果は日付が変わるまで保持）
+        
+        Returns:
+            dict: {指標: (前回値, 変化の中央値, ばらつき)}（履歴が足りない指標は含まない）
+        """
+        if day in self._statistics:
+            return self._statistics[day]
+        
+        end = len(self.dates) - 1 if self.dates and self.dates[-1] == day else len(self.dates)
+        statistics = {}
+        for name, spec in CHECKS.items():
+            column = [value for value in self.values[name][:end] if value is not None]
+            if len(column) <= self.MIN_HISTORY:
+                continue
+            changes = [_change(spec['change'], b, a) for a, b in zip(column, column[1:])]
+            center = median(changes)
+            mad = median(abs(change - center) for change in changes)
+            statistics[name] = (column[-1], center, max(self.MAD_SCALE * mad, spec['min_scale']))
+        
+        self._statistics = {day: statistics}
+        return statistics
+    
+    def check(self, data, observed=None):
+        """
+        指標をチェックし、異常値を代替したデータと結果を返す（採用値を更新）
+        
+        Args:
+            data: DataFetcher.fetch_all_data の戻り値
+            observed: {シリーズID: (観測日, ...)}（DataFetcher.observations、ない指標は data の日付を観測日とする）
+        
+        Returns:
+            tuple: (代替後のデータ（'quality' に結果を追加）, 結果
+                   {'checked': [指標], 'flags': [{'indicator', 'check', 'value', 'action', ...}], 'substituted': [指標]})
+        """
+        day = data.get('date')
+        indicators = dict(data['indicators'])
+        statistics = self.statistics(day)
+        scalars = {name: _scalar(indicators.get(name), spec['value']) for name, spec in CHECKS.items()}
+        
+        flags = []
+        quarantined = set()
+        scores = {}
+        
+        for name, value in scalars.items():
+            if value is None:
+                continue
+            spec = CHECKS[name]
+            low, high = spec['range']
+            if not math.isfinite(value) or not low <= value <= high:
+                flags.append({'indicator': name, 'check': 'invalid', 'value': value if math.isfinite(value) else None})
+                quarantined.add(name)
+                continue
+            
+            if name in statistics:
+                previous, center, scale = statistics[name]
+                score = (_change(spec['change'], value, previous) - center) / scale
+                scores[name] = score
+                if abs(score) > self.SPIKE_Z:
+                    observation = (observed or {}).get(spec['series'], (day,))[0]
+                    pending = self.pending.get(name)
+                    confirmed = (
+                        pending is not None and pending[0] is not None and observation is not None
+                        and observation > pending[0]
+                        and abs(_change(spec['change'], value, pending[1]) - center) / scale <= self.SPIKE_Z
+                    )
+                    if not confirmed:
+                        # 同じ観測日の再取得では最初に見た観測日を保つ
+                        if pending is None or pending[0] != observation:
+                            self.pending[name] = [observation, value]
+                        flags.append({'indicator': name, 'check': 'spike', 'value': value, 'z': round(score, 1)})
+                        quarantined.add(name)
+                        continue
+            self.pending.pop(name, None)
+            
+            end = len(self.dates) - 1 if self.dates and self.dates[-1] == day else len(self.dates)
+            recent = self.values[name][max(0, end - self.STALE_DAYS + 1):end]
+            if len(recent) == self.STALE_DAYS - 1 and all(other == value for other in recent):
+                flags.append({'indicator': name, 'check': 'stale', 'value': value, 'days': self.STALE_DAYS})
+        
+        # 国債利回りの整合性（代替後の値で確認し、外れていればzスコアの大きい方を代替）
+        yields = {
+            name: _scalar(self.last.get(name), None) if name in quarantined else scalars[name]
+            for name in ('treasury_10y', 'treasury_30y')
+        }
+        if None not in yields.values():
+            spread = yields['treasury_30y'] - yields['treasury_10y']
+            low, high = self.SPREAD_RANGE
+            if not low <= spread <= high:
+                candidates = [name for name in yields if name not in quarantined and name in scores]
+                suspect = max(candidates, key=lambda name: abs(scores[name]), default=None)
+                flags.append({
+                    'indicator': suspect or 'treasury_30y',
+                    'check': 'spread',
+                    'value': round(spread, 3),
+                    'range': list(self.SPREAD_RANGE)
+                })
+                if suspect:
+                    quarantined.add(suspect)
+        
+        # 代替（前回の採用値がなければ欠損として扱う）
+        for name in sorted(quarantined):
+            for target in (name,) + DEPENDENTS.get(name, ()):
+                indicators[target] = self.last.get(target)
+        for flag in flags:
+            if flag['indicator'] in quarantined and flag['check'] != 'stale':
+                flag['action'] = 'substituted' if self.last.get(flag['indicator']) is not None else 'removed'
+                flag['replacement'] = _scalar(self.last.get(flag['indicator']), CHECKS[flag['indicator']]['value'])
+            else:
+                flag['action'] = 'flagged'
+        
+        # 採用値を更新
+        accepted = {name: value for name, value in indicators.items() if name not in quarantined and value is not None}
+        for name in quarantined:
+            accepted.pop(name, None)
+            for target in DEPENDENTS.get(name, ()):
+                accepted.pop(target, None)
+        self.last.update(accepted)
+        self._record(day, {name: None if name in quarantined else scalars[name] for name in CHECKS})
+        
+        report = {
+            'checked': [name for name, value in scalars.items() if value is not None],
+            'flags': flags,
+            'substituted': sorted(name for name in quarantined if self.last.get(name) is not None)
+        }
+        return dict(data, indicators=indicators, quality=report), report
+
+
+def describe(flag):
+    """フラグの表示用の文字列"""
+    text = f"{flag['indicator']} {LABELS.get(flag['check'], flag['check'])}"
+    if 'z' in flag:
+        text += f"（z={flag['z']}）"
+    if flag['action'] == 'substituted':
+        text += f" → 前回値 {flag['replacement']} で代替"
+    elif flag['action'] == 'removed':
+        text += " → 欠損として扱う"
+    return text
+
+
+# テスト用
+if __name__ == "__main__":
+    import random
+    
+    rng = random.Random(1)
+    gate = QualityGate()
+    ten, thirty, vix, price = 4.2, 4.6, 18.0, 5000.0
+    for day in range(1, 31):
+        ten += rng.gauss(0, 0.04)
+        thirty += rng.gauss(0, 0.04)
+        vix *= math.exp(rng.gauss(0, 0.05))
+        price *= math.exp(rng.gauss(0, 0.01))
+        gate.check({'date': f"2025-01-{day:02d}", 'indicators': {
+            'treasury_10y': round(ten, 2), 'treasury_30y': round(thirty, 2), 'vix': round(vix, 2),
+            'sp500': {'price': round(price, 2), 'ma_200': 4900.0, 'deviation_pct': 2.0}
+        }})
+    
+    checked, report = gate.check({'date': '2025-02-01', 'indicators': {
+        'treasury_10y': round(ten, 2), 'treasury_30y': 0.0, 'vix': round(vix * 8, 2),
+        'sp500': {'price': round(price, 2), 'ma_200': 4900.0, 'deviation_pct': 2.0}
+    }})
+    
+    print("\n=== データ品質 ===")
+    for flag in report['flags']:
+        print(describe(flag))
+    print(f"代替後: 30年債 {checked['indicators']['treasury_30y']} / VIX {checked['indicators']['vix']}")
+    
+    # スパイクの確認: 同じ観測日の再取得（常駐モードのキャッシュ・304）では代替したまま、
+    # 次の観測日も同じ水準なら採用
+    spike = {'date': '2025-02-02', 'indicators': dict(checked['indicators'], treasury_10y=round(ten + 0.9, 2))}
+    results = [
+        gate.check(spike, {'DGS10': (observation, None)})[0]['indicators']['treasury_10y']
+        for observation in ('2025-01-31', '2025-01-31', '2025-02-03')
+    ]
+    print(f"\nスパイク {spike['indicators']['treasury_10y']}: 同じ観測日 {results[0]} → {results[1]}、次の観測日 {results[2]}")
+    assert results[0] == results[1] != spike['indicators']['treasury_10y']
+    assert results[2] == spike['indicators']['treasury_10y']
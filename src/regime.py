@@ -0,0 +1,440 @@
+"""
+株債相関レジームモジュール
+S&P500のリターンと米国債利回りの変化の相関を複数の期間で追跡し、TMFが株のヘッジとして効く局面かを判定
+
+相関が正（株安と金利低下が同時に起きる）ならTMFは株のヘッジになり（hedge）、
+負（2022年のように株安と金利上昇が同時に起きる）なら株と一緒に下落する（co_move）
+"""
+
+import json
+import math
+import os
+from collections import deque
+from itertools import accumulate
+
+# S&P500と相関を見る利回り
+YIELDS = ('treasury_10y', 'treasury_30y')
+
+# 日足の系列
+SERIES = ('sp500',) + YIELDS
+
+# 系列 → DataFetcher.observations のシリーズID（値の観測日で日付を揃える）
+OBSERVATION_IDS = {
+    'sp500': 'SP500',
+    'treasury_10y': 'DGS10',
+    'treasury_30y': 'DGS30'
+}
+
+# 表示名
+LABELS = {
+    'hedge': '株債逆相関（ヘッジ局面）',
+    'neutral': '中立',
+    'co_move': '株債同方向（TMF不利）'
+}
+
+
+def _correlation(n, sx, sy, sxx, syy, sxy):
+    """合計値から相関係数を算出（どちらかの分散が0なら None）"""
+    vx = n * sxx - sx * sx
+    vy = n * syy - sy * sy
+    if vx <= 0 or vy <= 0:
+        return None
+    return max(-1.0, min(1.0, (n * sxy - sx * sy) / math.sqrt(vx * vy)))
+
+
+class RollingCorrelation:
+    """
+    直近 window 本の相関係数
+    
+    合計値（Σx・Σy・Σx²・Σy²・Σxy）を足し引きして1本ごとに O(1) で更新する。
+    浮動小数点の誤差がたまらないよう、window 本ごとに合計値を計算し直す
+    """
+    
+    def __init__(self, window):
+        """
+        Args:
+            window: 本数
+        """
+        self.window = window
+        self.pairs = deque()
+        self._resync()
+    
+    def clear(self):
+        """すべての組を除く"""
+        self.pairs.clear()
+        self._resync()
+    
+    def _resync(self):
+        """保持している組から合計値を計算し直す"""
+        self.sx = self.sy = self.sxx = self.syy = self.sxy = 0.0
+        for x, y in self.pairs:
+            self._add(x, y, 1)
+        self._updates = 0
+    
+    def _add(self, x, y, sign):
+        """合計値に1組を足す（sign=-1 で引く）"""
+        self.sx += sign * x
+        self.sy += sign * y
+        self.sxx += sign * x * x
+        self.syy += sign * y * y
+        self.sxy += sign * x * y
+    
+    def update(self, x, y):
+        """1本追加（window 本を超えたら最も古い1本を除く）"""
+        self.pairs.append((x, y))
+        self._add(x, y, 1)
+        if len(self.pairs) > self.window:
+            self._add(*self.pairs.popleft(), -1)
+        
+        self._updates += 1
+        if self._updates >= self.window:
+            self._resync()
+    
+    def value(self):
+        """相関係数（window 本に満たない場合は None）"""
+        if len(self.pairs) < self.window:
+            return None
+        return _correlation(self.window, self.sx, self.sy, self.sxx, self.syy, self.sxy)
+
+
+def rolling_correlation(xs, ys, window):
+    """
+    全期間の移動相関を累積和からまとめて算出（1本あたり O(1)）
+    
+    Args:
+        xs, ys: 同じ長さの数値のリスト
+        window: 本数
+    
+    Returns:
+        list: 相関係数のリスト（xs と同じ長さ、先頭の window - 1 本は None）
+    """
+    sums = [
+        [0.0, *accumulate(column)]
+        for column in (xs, ys, [x * x for x in xs], [y * y for y in ys], [x * y for x, y in zip(xs, ys)])
+    ]
+    sx, sy, sxx, syy, sxy = sums
+    return [None] * min(window - 1, len(xs)) + [
+        _correlation(
+            window,
+            sx[end] - sx[end - window],
+            sy[end] - sy[end - window],
+            sxx[end] - sxx[end - window],
+            syy[end] - syy[end - window],
+            sxy[end] - sxy[end - window]
+        )
+        for end in range(window, len(xs) + 1)
+    ]
+
+
+def align_bars(series):
+    """
+    系列の日足を、すべての系列に値がある日付で揃える
+    
+    Args:
+        series: {系列: (日付, 値) のリスト}
+    
+    Returns:
+        tuple: (日付のリスト, {系列: 値のリスト})（古い順）
+    """
+    tables = {name: dict(bars) for name, bars in series.items()}
+    dates = sorted(set.intersection(*(set(table) for table in tables.values())))
+    return dates, {name: [table[day] for day in dates] for name, table in tables.items()}
+
+
+def classify(correlation, threshold):
+    """相関係数からレジームを判定"""
+    if correlation is None:
+        return None
+    if correlation >= threshold:
+        return 'hedge'
+    if correlation <= -threshold:
+        return 'co_move'
+    return 'neutral'
+
+
+class RegimeEngine:
+    """
+    株債相関レジームの判定
+    
+    S&P500・10年債・30年債の値を観測日ごとに集め、3系列が揃った日を1本として確定し、
+    S&P500の対数リターンと利回りの変化の移動相関を WINDOWS の各期間で更新する。
+    レジームは PRIMARY_WINDOW の相関（10年・30年の平均）で判定する
+    """
+    
+    # 相関を見る期間（営業日）と判定に使う期間
+    WINDOWS = (20, 60, 120)
+    PRIMARY_WINDOW = 60
+    
+    # この絶対値以上の相関でヘッジ局面 / 株債同方向と判定
+    THRESHOLD = 0.2
+    
+    # 状態がない場合に取得する日数（最長の期間を十分に含む）
+    SEED_DAYS = 400
+    
+    # 系列が揃わない日付を保持する件数
+    PENDING_DAYS = 10
+    
+    def __init__(self, path=None):
+        """
+        Args:
+            path: 状態の保存先（JSON、省略時は保存しない）
+        """
+        self.path = path
+        # 最後に確定した日足 {'date', 'sp500', 'treasury_10y', 'treasury_30y'}
+        self.last = None
+        # 系列が揃っていない日付 {日付: {系列: 値}}
+        self.pending = {}
+        # 確定した変化（最長の期間分） [日付, S&P500リターン, 10年債変化, 30年債変化]
+        self.changes = deque(maxlen=max(self.WINDOWS))
+        self.correlations = {
+            (name, window): RollingCorrelation(window) for name in YIELDS for window in self.WINDOWS
+        }
+        
+        if path:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = None
+            if state:
+                self.load_state(state)
+    
+    @property
+    def empty(self):
+        """確定した日足がないか"""
+        return self.last is None
+    
+    def export_state(self):
+        """状態を保存用の辞書で取得"""
+        return {
+            'last': self.last,
+            'pending': self.pending,
+            'changes': list(self.changes)
+        }
+    
+    def load_state(self, state):
+        """export_state で保存した状態を復元（移動相関は保存した変化から計算し直す）"""
+        self.last = state.get('last')
+        self.pending = dict(state.get('pending', {}))
+        self.changes.clear()
+        for correlation in self.correlations.values():
+            correlation.clear()
+        for row in state.get('changes', []):
+            self._push(row)
+    
+    def save(self):
+        """状態を保存（一時ファイル経由で置き換え）"""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.export_state(), f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+    
+    def _push(self, row):
+        """確定した変化を各期間の相関に追加"""
+        self.changes.append(row)
+        _, sp_return, *diffs = row
+        for index, name in enumerate(YIELDS):
+            for window in self.WINDOWS:
+                self.correlations[(name, window)].update(sp_return, diffs[index])
+    
+    def add_bar(self, day, values):
+        """
+        1日分の日足を確定（確定済みの日付以前は無視）
+        
+        Args:
+            day: 日付（'YYYY-MM-DD'）
+            values: {系列: 値}（SERIES のすべて）
+        
+        Returns:
+            bool: 確定したか
+        """
+        if self.last is not None:
+            if day <= self.last['date']:
+                return False
+            self._push([
+                day,
+                math.log(values['sp500'] / self.last['sp500'])
+            ] + [values[name] - self.last[name] for name in YIELDS])
+        self.last = {'date': day, **{name: values[name] for name in SERIES}}
+        return True
+    
+    def seed(self, series):
+        """
+        過去の日足から初期化（最長の期間分のみ使う）
+        
+        Args:
+            series: {系列: (日付, 値) のリスト}
+        
+        Returns:
+            int: 確定した本数
+        """
+        dates, columns = align_bars(series)
+        start = max(0, len(dates) - max(self.WINDOWS) - 1)
+        return sum(
+            self.add_bar(dates[i], {name: columns[name][i] for name in SERIES})
+            for i in range(start, len(dates))
+        )
+    
+    def observe(self, observations):
+        """
+        観測した値を追加し、3系列が揃った日付を確定
+        
+        同じ日付の値は後から観測したもので置き換える（取引時間中のS&P500は終値で上書きされる）
+        
+        Args:
+            observations: {系列: (観測日, 値)}
+        
+        Returns:
+            int: 確定した本数
+        """
+        for name, (day, value) in observations.items():
+            if value is not None and (self.last is None or day > self.last['date']):
+                self.pending.setdefault(day, {})[name] = value
+        
+        committed = 0
+        for day in sorted(self.pending):
+            if len(self.pending[day]) == len(SERIES):
+                committed += self.add_bar(day, self.pending.pop(day))
+        
+        # 確定済みの日付以前・揃わないまま古くなった日付は捨てる
+        for day in sorted(self.pending)[:-self.PENDING_DAYS]:
+            del self.pending[day]
+        if self.last is not None:
+            self.pending = {day: values for day, values in self.pending.items() if day > self.last['date']}
+        return committed
+    
+    def regime(self):
+        """
+        現在のレジーム
+        
+        Returns:
+            dict: {'regime', 'label', 'correlation', 'window', 'date', 'correlations': {利回り: {期間: 相関}}}
+                  （判定に必要な本数に満たない場合は None）
+        """
+        primary = [self.correlations[(name, self.PRIMARY_WINDOW)].value() for name in YIELDS]
+        primary = [value for value in primary if value is not None]
+        if not primary:
+            return None
+        
+        correlation = sum(primary) / len(primary)
+        regime = classify(correlation, self.THRESHOLD)
+        return {
+            'regime': regime,
+            'label': LABELS[regime],
+            'correlation': round(correlation, 3),
+            'window': self.PRIMARY_WINDOW,
+            'date': self.last['date'],
+            'correlations': {
+                name: {
+                    str(window): None if value is None else round(value, 3)
+                    for window in self.WINDOWS
+                    for value in [self.correlations[(name, window)].value()]
+                }
+                for name in YIELDS
+            }
+        }
+
+
+def regime_history(series, windows=RegimeEngine.WINDOWS, primary_window=RegimeEngine.PRIMARY_WINDOW,
+                   threshold=RegimeEngine.THRESHOLD):
+    """
+    全期間のレジームをまとめて算出
+    
+    Args:
+        series: {系列: (日付, 値) のリスト}（backfill の state/bars など）
+    
+    Returns:
+        dict: {'dates', 'correlations': {(利回り, 期間): 相関のリスト}, 'regimes': レジームのリスト}
+              （dates は変化を算出できる2本目以降の日付）
+    """
+    dates, columns = align_bars(series)
+    prices = columns['sp500']
+    sp_returns = [math.log(current / previous) for previous, current in zip(prices, prices[1:])]
+    correlations = {}
+    for name in YIELDS:
+        values = columns[name]
+        diffs = [current - previous for previous, current in zip(values, values[1:])]
+        for window in windows:
+            correlations[(name, window)] = rolling_correlation(sp_returns, diffs, window)
+    
+    regimes = []
+    for primary in zip(*(correlations[(name, primary_window)] for name in YIELDS)):
+        primary = [value for value in primary if value is not None]
+        regimes.append(classify(sum(primary) / len(primary), threshold) if primary else None)
+    
+    return {'dates': dates[1:], 'correlations': correlations, 'regimes': regimes}
+
+
+def load_series(bars_dir):
+    """
+    backfill --bars で保存した日足を読み込み
+    
+    Returns:
+        dict: {系列: (日付, 値) のリスト}
+    
+    Raises:
+        OSError: 系列のファイルがない場合
+    """
+    from backfill import load_bars
+    
+    return {name: load_bars(os.path.join(bars_dir, f"{name}.csv")) for name in SERIES}
+
+
+def fetch_series(fetcher, start, end):
+    """
+    期間を指定して日足を取得（状態がない場合の初期化用）
+    
+    Args:
+        fetcher: DataFetcher
+        start: 開始日（date）
+        end: 終了日（date）
+    
+    Returns:
+        dict: {系列: (日付, 値) のリスト}
+    """
+    from backfill import SOURCES
+    
+    series = {}
+    for name in SERIES:
+        source, symbol, _ = SOURCES[name]
+        if source == 'yahoo':
+            series[name] = fetcher.fetch_yahoo_bars(symbol, start, end)
+        else:
+            series[name] = fetcher.fetch_fred_range(symbol, start, end)
+    return series
+
+
+# テスト用
+if __name__ == "__main__":
+    import random
+    import time
+    
+    rng = random.Random(7)
+    xs = [rng.gauss(0, 1) for _ in range(5000)]
+    ys = [0.5 * x + rng.gauss(0, 1) for x in xs]
+    
+    print("\n=== 移動相関（逐次 O(1) と累積和の一致） ===")
+    rolling = RollingCorrelation(60)
+    for x, y in zip(xs, ys):
+        rolling.update(x, y)
+    batch = rolling_correlation(xs, ys, 60)
+    print(f"逐次: {rolling.value():.6f} / 累積和: {batch[-1]:.6f}")
+    
+    started = time.perf_counter()
+    rolling_correlation(xs * 4, ys * 4, 60)
+    print(f"累積和 20,000本: {(time.perf_counter() - started) * 1000:.1f}ms")
+    
+    print("\n=== レジーム ===")
+    engine = RegimeEngine()
+    price, ten, thirty = 5000.0, 4.0, 4.4
+    for i in range(150):
+        shock = rng.gauss(0, 0.01)
+        price *= math.exp(shock)
+        ten += 3 * shock + rng.gauss(0, 0.03)
+        thirty += 3 * shock + rng.gauss(0, 0.03)
+        engine.add_bar(f"2025-{1 + i // 28:02d}-{1 + i % 28:02d}", {'sp500': price, 'treasury_10y': ten, 'treasury_30y': thirty})
+    current = engine.regime()
+    print(f"{current['label']}（相関 {current['correlation']}）: {current['correlations']}")
@@ -0,0 +1,359 @@
+"""
+公表カレンダーモジュール
+祝日表と各シリーズの公表時刻の実績から、新しいデータが公表済みか・次の公表はいつかを判定
+"""
+
+import json
+import os
+from collections import Counter
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# 公表時刻・取引時間の基準（ニューヨーク時間）
+MARKET_TIMEZONE = 'America/New_York'
+
+# 米国市場の通常取引時間
+MARKET_OPEN = (9, 30)
+MARKET_CLOSE = (16, 0)
+
+# 祝日表: (名前, 規則, 対象カレンダー, 開始年)
+# 規則は (月, 日) の固定日、(月, 曜日, n) の第n曜日（n=-1 は最終、曜日は月曜=0）、'good_friday'
+# カレンダーは 'nyse'（株式市場: S&P500・VIX）と 'fed'（連邦準備制度: H.15 の国債利回り）
+HOLIDAY_RULES = [
+    ('元日', (1, 1), ('nyse', 'fed'), None),
+    ('キング牧師記念日', (1, 0, 3), ('nyse', 'fed'), None),
+    ('大統領の日', (2, 0, 3), ('nyse', 'fed'), None),
+    ('聖金曜日', 'good_friday', ('nyse',), None),
+    ('戦没将兵追悼記念日', (5, 0, -1), ('nyse', 'fed'), None),
+    ('ジューンティーンス', (6, 19), ('fed',), 2021),
+    ('ジューンティーンス', (6, 19), ('nyse',), 2022),
+    ('独立記念日', (7, 4), ('nyse', 'fed'), None),
+    ('労働者の日', (9, 0, 1), ('nyse', 'fed'), None),
+    ('コロンブス・デー', (10, 0, 2), ('fed',), None),
+    ('退役軍人の日', (11, 11), ('fed',), None),
+    ('感謝祭', (11, 3, 4), ('nyse', 'fed'), None),
+    ('クリスマス', (12, 25), ('nyse', 'fed'), None)
+]
+
+# シリーズごとの公表の既定値（実績が少ない間に使用）
+# calendar: 営業日のカレンダー、lag_days: 観測日から何営業日後に公表されるか、time: 公表時刻
+SERIES = {
+    'DGS10': {'calendar': 'fed', 'lag_days': 1, 'time': (16, 30)},
+    'DGS30': {'calendar': 'fed', 'lag_days': 1, 'time': (16, 30)},
+    'VIXCLS': {'calendar': 'nyse', 'lag_days': 1, 'time': (9, 0)},
+    'SP500': {'calendar': 'nyse', 'lag_days': 0, 'time': (16, 30)}
+}
+
+
+@lru_cache(maxsize=None)
+def market_zone():
+    """ニューヨーク時間のタイムゾーン（タイムゾーンDBがない環境では標準時 UTC-5 で近似）"""
+    try:
+        return ZoneInfo(MARKET_TIMEZONE)
+    except ZoneInfoNotFoundError:
+        return timezone(timedelta(hours=-5))
+
+
+def to_market_time(moment):
+    """ニューヨーク時間に変換"""
+    return moment.astimezone(market_zone())
+
+
+def _good_friday(year):
+    """聖金曜日（復活祭の2日前、グレゴリオ暦の復活祭は匿名のアルゴリズムで算出）"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1) - timedelta(days=2)
+
+
+def _rule_date(year, rule):
+    """祝日の規則から日付を算出（振替前）"""
+    if rule == 'good_friday':
+        return _good_friday(year)
+    if len(rule) == 2:
+        return date(year, *rule)
+    
+    month, weekday, n = rule
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+@lru_cache(maxsize=64)
+def holidays(year, calendar):
+    """
+    休場日・休業日
+    
+    日曜の祝日は翌月曜に振り替える。土曜の祝日は株式市場は前日の金曜に振り替え
+    （元日は前年の大晦日に振り替えない）、連邦準備制度は振り替えない
+    
+    Args:
+        year: 年
+        calendar: 'nyse' または 'fed'
+    
+    Returns:
+        dict: {日付: 祝日名}
+    """
+    result = {}
+    for name, rule, calendars, since in HOLIDAY_RULES:
+        if calendar not in calendars or (since and year < since):
+            continue
+        
+        day = _rule_date(year, rule)
+        if day.weekday() == 6:
+            day += timedelta(days=1)
+        elif day.weekday() == 5:
+            if calendar != 'nyse' or rule == (1, 1):
+                continue
+            day -= timedelta(days=1)
+        result[day] = name
+    
+    return result
+
+
+def is_business_day(day, calendar):
+    """営業日か（土日・祝日以外）"""
+    return day.weekday() < 5 and day not in holidays(day.year, calendar)
+
+
+def add_business_days(day, n, calendar):
+    """n 営業日後の日付"""
+    while n > 0:
+        day += timedelta(days=1)
+        if is_business_day(day, calendar):
+            n -= 1
+    return day
+
+
+def is_us_market_open(now=None):
+    """
+    米国市場の通常取引時間内か（営業日の 9:30〜16:00 ニューヨーク時間、短縮取引は考慮しない）
+    
+    Args:
+        now: 基準時刻（タイムゾーン付き、省略時は現在時刻）
+    """
+    local = to_market_time(now or datetime.now(timezone.utc))
+    if not is_business_day(local.date(), 'nyse'):
+        return False
+    return MARKET_OPEN <= (local.hour, local.minute) < MARKET_CLOSE
+
+
+class ReleaseCalendar:
+    """
+    シリーズごとの公表カレンダー
+    
+    観測日 D の値は「D の lag_days 営業日後の time」に公表されるとみなす。
+    FREDの Last-Modified から公表時刻の実績を記録し、MIN_SAMPLES 件以上たまれば
+    最も多い遅れ（営業日）と、その遅れの公表時刻の90パーセンタイルを既定値の代わりに使う
+    """
+    
+    # 実績から推定するのに必要な件数・保持する件数
+    MIN_SAMPLES = 5
+    MAX_SAMPLES = 60
+    
+    # これより遅れた公表（改訂など）は実績に含めない（営業日）
+    MAX_LAG_DAYS = 5
+    
+    def __init__(self, path=None):
+        """
+        Args:
+            path: 実績の保存先（JSON、省略時は保存しない）
+        """
+        self.path = path
+        self.series = {}
+        self._schedules = {}
+        
+        if path:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.load_state(json.load(f))
+            except (OSError, ValueError):
+                pass
+    
+    def export_state(self):
+        """実績を保存用の辞書で取得"""
+        return {'series': self.series}
+    
+    def load_state(self, state):
+        """export_state で保存した実績を復元"""
+        self.series = dict(state.get('series', {}))
+        self._schedules = {}
+    
+    def save(self):
+        """実績を保存（一時ファイル経由で置き換え）"""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.export_state(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+    
+    def latest(self, series_id):
+        """記録済みの最新の観測日（'YYYY-MM-DD'、なければ None）"""
+        return self.series.get(series_id, {}).get('latest')
+    
+    def schedule(self, series_id):
+        """
+        公表の遅れと時刻
+        
+        Returns:
+            tuple: (観測日から何営業日後か, (時, 分))
+        """
+        if series_id in self._schedules:
+            return self._schedules[series_id]
+        
+        defaults = SERIES[series_id]
+        samples = self.series.get(series_id, {}).get('samples', [])
+        schedule = (defaults['lag_days'], tuple(defaults['time']))
+        
+        observed = []
+        for observation, published in samples:
+            day = date.fromisoformat(observation)
+            local = to_market_time(datetime.fromisoformat(published))
+            lag = 0
+            while day < local.date() and lag <= self.MAX_LAG_DAYS:
+                day = add_business_days(day, 1, defaults['calendar'])
+                lag += 1
+            if lag <= self.MAX_LAG_DAYS:
+                observed.append((lag, local.hour * 60 + local.minute))
+        
+        if len(observed) >= self.MIN_SAMPLES:
+            # 同数なら遅い方を採用
+            lag = max(Counter(lag for lag, _ in observed).most_common(), key=lambda item: (item[1], item[0]))[0]
+            minutes = sorted(minute for sample_lag, minute in observed if sample_lag == lag)
+            minute = minutes[min(len(minutes) - 1, len(minutes) * 9 // 10)]
+            schedule = (lag, divmod(minute, 60))
+        
+        self._schedules[series_id] = schedule
+        return schedule
+    
+    def release_time(self, series_id, observation_date):
+        """観測日の値が公表される時刻（タイムゾーン付き）"""
+        lag, (hour, minute) = self.schedule(series_id)
+        day = add_business_days(observation_date, lag, SERIES[series_id]['calendar'])
+        return datetime.combine(day, time(hour, minute), tzinfo=market_zone())
+    
+    def expected_latest(self, series_id, now):
+        """
+        now の時点で公表済みのはずの最新の観測日
+        
+        Args:
+            series_id: シリーズID
+            now: 基準時刻（タイムゾーン付き）
+        
+        Returns:
+            date: 観測日
+        """
+        calendar = SERIES[series_id]['calendar']
+        day = to_market_time(now).date()
+        while not (is_business_day(day, calendar) and self.release_time(series_id, day) <= now):
+            day -= timedelta(days=1)
+        return day
+    
+    def previous_release(self, series_id, now):
+        """now 以前の直近の公表時刻"""
+        return self.release_time(series_id, self.expected_latest(series_id, now))
+    
+    def next_release(self, series_id, now):
+        """now より後の最初の公表時刻"""
+        day = add_business_days(self.expected_latest(series_id, now), 1, SERIES[series_id]['calendar'])
+        return self.release_time(series_id, day)
+    
+    def pending(self, now):
+        """公表済みのはずなのに、まだ記録していない観測日があるシリーズ"""
+        return [
+            series_id for series_id in SERIES
+            if self.latest(series_id) is None
+            or self.latest(series_id) < self.expected_latest(series_id, now).isoformat()
+        ]
+    
+    def late(self, observations, now):
+        """
+        取得した値のうち、公表済みのはずの観測日より古いシリーズ（公表の遅れ）
+        
+        Args:
+            observations: {シリーズID: (観測日 'YYYY-MM-DD', Last-Modified)}
+            now: 基準時刻
+        """
+        return [
+            series_id for series_id, (observation, _) in observations.items()
+            if series_id in SERIES and observation < self.expected_latest(series_id, now).isoformat()
+        ]
+    
+    def upcoming(self, now, within):
+        """
+        within 秒以内に公表されるシリーズ
+        
+        Returns:
+            list: (シリーズID, 公表時刻) のリスト（早い順）
+        """
+        releases = [(series_id, self.next_release(series_id, now)) for series_id in SERIES]
+        return sorted(
+            ((series_id, release) for series_id, release in releases if (release - now).total_seconds() <= within),
+            key=lambda item: item[1]
+        )
+    
+    def observe(self, observations, now):
+        """
+        取得した値の観測日と公表時刻（Last-Modified）を記録
+        
+        取引中の未確定の日足のように、まだ公表時刻を迎えていない観測日は記録しない
+        
+        Args:
+            observations: {シリーズID: (観測日 'YYYY-MM-DD', Last-Modified またはNone)}
+            now: 基準時刻
+        
+        Returns:
+            bool: 記録が変わったか
+        """
+        from email.utils import parsedate_to_datetime
+        
+        changed = False
+        for series_id, (observation, last_modified) in observations.items():
+            if series_id not in SERIES or observation > self.expected_latest(series_id, now).isoformat():
+                continue
+            
+            entry = self.series.setdefault(series_id, {'latest': None, 'samples': []})
+            if entry['latest'] is not None and observation <= entry['latest']:
+                continue
+            
+            entry['latest'] = observation
+            changed = True
+            
+            try:
+                published = parsedate_to_datetime(last_modified) if last_modified else None
+            except (TypeError, ValueError):
+                published = None
+            if published is not None and published.tzinfo is not None:
+                entry['samples'] = (entry['samples'] + [[observation, published.isoformat()]])[-self.MAX_SAMPLES:]
+                self._schedules.pop(series_id, None)
+        
+        return changed
+
+
+# テスト用
+if __name__ == "__main__":
+    now = datetime.now(timezone.utc)
+    calendar = ReleaseCalendar()
+    
+    print("\n=== 祝日 ===")
+    for name in ('nyse', 'fed'):
+        print(f"{name}: " + ", ".join(f"{day:%m/%d} {label}" for day, label in sorted(holidays(now.year, name).items())))
+    
+    print("\n=== 公表カレンダー ===")
+    for series_id in SERIES:
+        print(
+            f"{series_id}: 公表済みの最新観測日 {calendar.expected_latest(series_id, now)} / "
+            f"次回の公表 {calendar.next_release(series_id, now):%Y-%m-%d %H:%M %Z}"
+        )
+    print(f"取引時間中: {is_us_market_open(now)}")
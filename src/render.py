@@ -3,288 +3,533 @@ HTML生成モジュール
 ダッシュボード用のHTMLとJSONを生成
 """
 
+import gzip
+import hashlib
 import json
-from datetime import datetime
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from html import escape
 
+from metrics import Metrics
+from models import TMFResult, dumps, to_data_json
 
-class DashboardRenderer:
-    """ダッシュボードを生成するクラス"""
+try:
+    import brotli  # オプション依存（未インストール時は .br を出力しない）
+except ImportError:
+    brotli = None
+
+
+# ダッシュボード用スタイルシート（ビルド時に最小化してハッシュ付きファイルへ分離）
+DASHBOARD_CSS = """* {
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Hiragino Sans', 'Hiragino Kaku Gothic ProN', Meiryo, sans-serif;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    min-height: 100vh;
+    padding: 20px;
+}
+
+.container {
+    max-width: 1200px;
+    margin: 0 auto;
+}
+
+.header {
+    text-align: center;
+    color: white;
+    margin-bottom: 30px;
+}
+
+.header h1 {
+    font-size: 2.5em;
+    margin-bottom: 10px;
+    text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
+}
+
+.header p {
+    font-size: 1.1em;
+    opacity: 0.9;
+}
+
+.main-card {
+    background: white;
+    border-radius: 20px;
+    box-shadow: 0 10px 40px rgba(0,0,0,0.2);
+    padding: 40px;
+    margin-bottom: 20px;
+}
+
+.score-display {
+    text-align: center;
+    margin-bottom: 30px;
+}
+
+.score-value {
+    font-size: 5em;
+    font-weight: bold;
+    margin: 20px 0;
+    line-height: 1;
+}
+
+.status-badge {
+    display: inline-block;
+    padding: 15px 30px;
+    border-radius: 50px;
+    font-size: 1.5em;
+    font-weight: bold;
+    color: white;
+    margin: 20px 0;
+}
+
+.last-updated {
+    color: #666;
+    font-size: 0.9em;
+    margin-top: 10px;
+}
+
+.category-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
+    gap: 20px;
+    margin: 30px 0;
+}
+
+.category-card {
+    background: #f8f9fa;
+    border-radius: 15px;
+    padding: 25px;
+    border-left: 5px solid #667eea;
+}
+
+.category-card h3 {
+    font-size: 1.2em;
+    color: #333;
+    margin-bottom: 15px;
+}
+
+.category-score {
+    font-size: 2.5em;
+    font-weight: bold;
+    color: #667eea;
+    margin: 10px 0;
+}
+
+.detail-item {
+    display: flex;
+    justify-content: space-between;
+    padding: 8px 0;
+    border-bottom: 1px solid #e0e0e0;
+}
+
+.detail-item:last-child {
+    border-bottom: none;
+}
+
+.detail-label {
+    color: #666;
+    font-size: 0.9em;
+}
+
+.detail-value {
+    font-weight: bold;
+    color: #333;
+}
+
+.signals-section {
+    background: #fff8e1;
+    border-radius: 15px;
+    padding: 25px;
+    margin: 20px 0;
+    border-left: 5px solid #ffa726;
+}
+
+.signals-section h3 {
+    color: #e65100;
+    margin-bottom: 15px;
+    font-size: 1.2em;
+}
+
+.signal-item {
+    padding: 10px 0;
+    color: #333;
+    font-size: 1em;
+}
+
+.signal-item::before {
+    content: "📍 ";
+}
+
+.boost-alert {
+    background: #ffebee;
+    border-radius: 15px;
+    padding: 20px;
+    margin: 20px 0;
+    border-left: 5px solid #ef5350;
+}
+
+.boost-alert h3 {
+    color: #c62828;
+    margin-bottom: 10px;
+}
+
+.boost-item {
+    color: #d32f2f;
+    font-weight: bold;
+    padding: 5px 0;
+}
+
+.boost-item::before {
+    content: "⚡ ";
+}
+
+.regime-note {
+    border-radius: 15px;
+    padding: 15px 20px;
+    margin: 20px 0;
+    font-weight: bold;
+    background: #e8f5e9;
+    border-left: 5px solid #43a047;
+    color: #2e7d32;
+}
+
+.regime-note.penalty {
+    background: #eceff1;
+    border-left-color: #78909c;
+    color: #455a64;
+}
+
+.charts-section {
+    margin: 20px 0;
+}
+
+.charts-section h3 {
+    color: #333;
+    margin-bottom: 15px;
+    font-size: 1.2em;
+}
+
+.charts-list {
+    display: grid;
+    grid-template-columns: repeat(auto-fill, minmax(200px, 1fr));
+    gap: 15px;
+}
+
+.chart-item img {
+    display: block;
+    margin-top: 5px;
+}
+
+.legend {
+    display: flex;
+    justify-content: center;
+    gap: 20px;
+    flex-wrap: wrap;
+    margin: 30px 0;
+}
+
+.legend-item {
+    display: flex;
+    align-items: center;
+    gap: 8px;
+    padding: 10px 15px;
+    background: #f5f5f5;
+    border-radius: 10px;
+    font-size: 0.9em;
+}
+
+.legend-emoji {
+    font-size: 1.5em;
+}
+
+.footer {
+    text-align: center;
+    color: white;
+    margin-top: 30px;
+    opacity: 0.8;
+    font-size: 0.9em;
+}
+
+.loading {
+    text-align: center;
+    padding: 40px;
+    color: #666;
+}
+
+@media (max-width: 768px) {
+    .header h1 {
+        font-size: 1.8em;
+    }
     
-    def __init__(self):
-        pass
+    .score-value {
+        font-size: 3.5em;
+    }
     
-    def save_data_json(self, result, output_path):
-        """
-        スコアリング結果をJSON形式で保存
+    .status-badge {
+        font-size: 1.2em;
+        padding: 12px 24px;
+    }
+    
+    .main-card {
+        padding: 20px;
+    }
+    
+    .category-grid {
+        grid-template-columns: 1fr;
+    }
+}
+
+.error {
+    background: #ffebee;
+    color: #c62828;
+    padding: 20px;
+    border-radius: 10px;
+    margin: 20px 0;
+    text-align: center;
+}
+"""
+
+# ダッシュボード用スクリプト（ビルド時に最小化してハッシュ付きファイルへ分離）
+DASHBOARD_JS = """// バージョン確認の間隔（ミリ秒）
+// 更新予定時刻を過ぎた後は POLL_MIN_MS から POLL_OVERDUE_MAX_MS まで倍々に延ばし、
+// 次回更新まで待つ場合も POLL_IDLE_MAX_MS ごとには確認する
+const POLL_MIN_MS = 60 * 1000;
+const POLL_OVERDUE_MAX_MS = 15 * 60 * 1000;
+const POLL_IDLE_MAX_MS = 6 * 60 * 60 * 1000;
+
+let currentVersion = null;
+let overdueAttempts = 0;
+let pollTimer = null;
+
+// データ読み込み
+async function loadData(version) {
+    try {
+        const url = version ? `data.json?v=${version}` : 'data.json';
+        const response = await fetch(url);
+        if (!response.ok) throw new Error('データ取得失敗');
         
-        Args:
-            result: スコアリング結果
-            output_path: 出力先パス
-        """
-        data = {
-            'last_updated': datetime.now().isoformat(),
-            'date': datetime.now().strftime('%Y-%m-%d'),
-            'score': result['total_score'],
-            'status': result['status'],
-            'category_scores': result['category_scores'],
-            'boost_conditions': result['boost_conditions'],
-            'signals': result['signals'],
-            'raw_data': result['raw_data']
-        }
+        const data = await response.json();
+        renderDashboard(data);
+        currentVersion = version || null;
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        document.getElementById('loading').style.display = 'none';
+        document.getElementById('error').style.display = 'none';
+        document.getElementById('dashboard').style.display = 'block';
+    } catch (error) {
+        console.error('データ読み込みエラー:', error);
+        document.getElementById('loading').style.display = 'none';
+        document.getElementById('error').style.display = 'block';
+    }
+}
+
+// 次回の確認までの待ち時間を計算
+function nextPollDelay(nextUpdate) {
+    const untilUpdate = nextUpdate ? new Date(nextUpdate).getTime() - Date.now() : 0;
+    if (untilUpdate > 0) {
+        // 更新予定時刻までは待機
+        overdueAttempts = 0;
+        return Math.min(Math.max(untilUpdate, POLL_MIN_MS), POLL_IDLE_MAX_MS);
+    }
+    // 予定時刻を過ぎても更新がない場合は指数バックオフ
+    const delay = Math.min(POLL_MIN_MS * 2 ** overdueAttempts, POLL_OVERDUE_MAX_MS);
+    overdueAttempts += 1;
+    return delay;
+}
+
+// version.json のみを確認し、ハッシュが変わった時だけ data.json を再取得
+async function checkVersion() {
+    let delay;
+    try {
+        const response = await fetch('version.json', { cache: 'no-cache' });
+        if (!response.ok) throw new Error('バージョン取得失敗');
         
-        print(f"✅ データJSON保存: {output_path}")
+        const version = await response.json();
+        if (version.hash !== currentVersion) {
+            overdueAttempts = 0;
+            await loadData(version.hash);
+        }
+        delay = nextPollDelay(version.next_update);
+    } catch (error) {
+        console.error('バージョン確認エラー:', error);
+        if (currentVersion === null) await loadData();
+        delay = nextPollDelay(null);
+    }
+    schedulePoll(delay);
+}
+
+function schedulePoll(delay) {
+    clearTimeout(pollTimer);
+    pollTimer = setTimeout(checkVersion, delay);
+}
+
+// ダッシュボード描画
+function renderDashboard(data) {
+    // スコアとステータス
+    document.getElementById('score-value').textContent = data.score.toFixed(1);
+    document.getElementById('score-value').style.color = data.status.color;
     
-    def generate_dashboard_html(self, output_path):
-        """
-        ダッシュボードHTMLを生成
-        
-        Args:
-            output_path: 出力先パス
-        """
-        html_content = """<!DOCTYPE html>
+    const statusBadge = document.getElementById('status-badge');
+    statusBadge.textContent = `${data.status.emoji} ${data.status.label}`;
+    statusBadge.style.backgroundColor = data.status.color;
+    
+    // 最終更新
+    const updated = new Date(data.last_updated);
+    document.getElementById('last-updated').textContent = 
+        `最終更新: ${updated.toLocaleString('ja-JP')}`;
+    
+    // ブースト条件
+    if (data.boost_conditions.boost_applied) {
+        const boostHtml = `
+            <div class="boost-alert">
+                <h3>⚡ 補助条件発動中</h3>
+                ${data.boost_conditions.conditions.map(c => 
+                    `<div class="boost-item">${c}</div>`
+                ).join('')}
+            </div>
+        `;
+        document.getElementById('boost-section').innerHTML = boostHtml;
+    } else {
+        document.getElementById('boost-section').innerHTML = '';
+    }
+    
+    // 株債相関レジーム補正（ブーストとは別に表示。引き下げは penalty）
+    const regime = data.regime_adjustment;
+    if (regime) {
+        const raised = regime.multiplier > 1;
+        document.getElementById('regime-section').innerHTML = `
+            <div class="regime-note${raised ? '' : ' penalty'}">
+                ${raised ? '📈' : '📉'} ${regime.label}（${raised ? 'スコア引き上げ' : 'スコア引き下げ'} ×${regime.multiplier}）
+            </div>
+        `;
+    } else {
+        document.getElementById('regime-section').innerHTML = '';
+    }
+    
+    // シグナル
+    const signalsHtml = data.signals.map(s => 
+        `<div class="signal-item">${s}</div>`
+    ).join('');
+    document.getElementById('signals-list').innerHTML = signalsHtml;
+    
+    // カテゴリスコア
+    const interest = data.category_scores.interest_rate;
+    const risk = data.category_scores.risk_off;
+    
+    document.getElementById('interest-score').textContent = 
+        interest.total.toFixed(1);
+    
+    document.getElementById('risk-score').textContent = 
+        risk.total.toFixed(1);
+    
+    // 詳細情報
+    renderInterestDetails(interest.details);
+    renderRiskDetails(risk.details);
+    
+    // 推移チャート
+    renderCharts(data.charts || {});
+}
+
+// 推移チャート（サーバー側で生成したSVGを表示）
+function renderCharts(charts) {
+    const html = Object.values(charts).map(c => `
+        <div class="chart-item">
+            <div class="detail-label">${c.label}</div>
+            <img src="${c.path}?v=${c.hash}" alt="${c.label}" width="${c.width}" height="${c.height}">
+        </div>
+    `).join('');
+    document.getElementById('charts-section').style.display = html ? 'block' : 'none';
+    document.getElementById('charts-list').innerHTML = html;
+}
+
+// 金利系詳細
+function renderInterestDetails(details) {
+    let html = '';
+    
+    if (details.treasury_10y && details.treasury_10y.value !== null) {
+        html += `
+            <div class="detail-item">
+                <span class="detail-label">10年債利回り</span>
+                <span class="detail-value">${details.treasury_10y.value}%</span>
+            </div>
+        `;
+    }
+    
+    if (details.treasury_30y && details.treasury_30y.value !== null) {
+        html += `
+            <div class="detail-item">
+                <span class="detail-label">30年債利回り</span>
+                <span class="detail-value">${details.treasury_30y.value}%</span>
+            </div>
+        `;
+    }
+    
+    if (details.rate_decline && details.rate_decline.value !== null) {
+        const change = details.rate_decline.value;
+        const arrow = change > 0 ? '📈' : '📉';
+        html += `
+            <div class="detail-item">
+                <span class="detail-label">2週間変化率</span>
+                <span class="detail-value">${arrow} ${change.toFixed(2)}%</span>
+            </div>
+        `;
+    }
+    
+    document.getElementById('interest-details').innerHTML = html;
+}
+
+// リスクオフ詳細
+function renderRiskDetails(details) {
+    let html = '';
+    
+    if (details.vix && details.vix.value !== null) {
+        html += `
+            <div class="detail-item">
+                <span class="detail-label">VIX指数</span>
+                <span class="detail-value">${details.vix.value.toFixed(2)}</span>
+            </div>
+        `;
+    }
+    
+    if (details.sp500_deviation && details.sp500_deviation.value !== null) {
+        const dev = details.sp500_deviation.value;
+        const arrow = dev > 0 ? '📈' : '📉';
+        html += `
+            <div class="detail-item">
+                <span class="detail-label">S&P500</span>
+                <span class="detail-value">${details.sp500_deviation.price}</span>
+            </div>
+            <div class="detail-item">
+                <span class="detail-label">200日MA乖離</span>
+                <span class="detail-value">${arrow} ${dev.toFixed(2)}%</span>
+            </div>
+        `;
+    }
+    
+    document.getElementById('risk-details').innerHTML = html;
+}
+
+// ページ読み込み時に実行
+checkVersion();
+
+// タブが再表示された時は即座に確認
+document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'visible') checkVersion();
+});
+"""
+
+# ダッシュボードHTML（__CSS_HREF__ / __JS_SRC__ はビルド時に置換）
+DASHBOARD_HTML = """<!DOCTYPE html>
 <html lang="ja">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>TMF爆発察知ツール</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Hiragino Sans', 'Hiragino Kaku Gothic ProN', Meiryo, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-        
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-        
-        .header {
-            text-align: center;
-            color: white;
-            margin-bottom: 30px;
-        }
-        
-        .header h1 {
-            font-size: 2.5em;
-            margin-bottom: 10px;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }
-        
-        .header p {
-            font-size: 1.1em;
-            opacity: 0.9;
-        }
-        
-        .main-card {
-            background: white;
-            border-radius: 20px;
-            box-shadow: 0 10px 40px rgba(0,0,0,0.2);
-            padding: 40px;
-            margin-bottom: 20px;
-        }
-        
-        .score-display {
-            text-align: center;
-            margin-bottom: 30px;
-        }
-        
-        .score-value {
-            font-size: 5em;
-            font-weight: bold;
-            margin: 20px 0;
-            line-height: 1;
-        }
-        
-        .status-badge {
-            display: inline-block;
-            padding: 15px 30px;
-            border-radius: 50px;
-            font-size: 1.5em;
-            font-weight: bold;
-            color: white;
-            margin: 20px 0;
-        }
-        
-        .last-updated {
-            color: #666;
-            font-size: 0.9em;
-            margin-top: 10px;
-        }
-        
-        .category-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-            gap: 20px;
-            margin: 30px 0;
-        }
-        
-        .category-card {
-            background: #f8f9fa;
-            border-radius: 15px;
-            padding: 25px;
-            border-left: 5px solid #667eea;
-        }
-        
-        .category-card h3 {
-            font-size: 1.2em;
-            color: #333;
-            margin-bottom: 15px;
-        }
-        
-        .category-score {
-            font-size: 2.5em;
-            font-weight: bold;
-            color: #667eea;
-            margin: 10px 0;
-        }
-        
-        .detail-item {
-            display: flex;
-            justify-content: space-between;
-            padding: 8px 0;
-            border-bottom: 1px solid #e0e0e0;
-        }
-        
-        .detail-item:last-child {
-            border-bottom: none;
-        }
-        
-        .detail-label {
-            color: #666;
-            font-size: 0.9em;
-        }
-        
-        .detail-value {
-            font-weight: bold;
-            color: #333;
-        }
-        
-        .signals-section {
-            background: #fff8e1;
-            border-radius: 15px;
-            padding: 25px;
-            margin: 20px 0;
-            border-left: 5px solid #ffa726;
-        }
-        
-        .signals-section h3 {
-            color: #e65100;
-            margin-bottom: 15px;
-            font-size: 1.2em;
-        }
-        
-        .signal-item {
-            padding: 10px 0;
-            color: #333;
-            font-size: 1em;
-        }
-        
-        .signal-item::before {
-            content: "📍 ";
-        }
-        
-        .boost-alert {
-            background: #ffebee;
-            border-radius: 15px;
-            padding: 20px;
-            margin: 20px 0;
-            border-left: 5px solid #ef5350;
-        }
-        
-        .boost-alert h3 {
-            color: #c62828;
-            margin-bottom: 10px;
-        }
-        
-        .boost-item {
-            color: #d32f2f;
-            font-weight: bold;
-            padding: 5px 0;
-        }
-        
-        .boost-item::before {
-            content: "⚡ ";
-        }
-        
-        .legend {
-            display: flex;
-            justify-content: center;
-            gap: 20px;
-            flex-wrap: wrap;
-            margin: 30px 0;
-        }
-        
-        .legend-item {
-            display: flex;
-            align-items: center;
-            gap: 8px;
-            padding: 10px 15px;
-            background: #f5f5f5;
-            border-radius: 10px;
-            font-size: 0.9em;
-        }
-        
-        .legend-emoji {
-            font-size: 1.5em;
-        }
-        
-        .footer {
-            text-align: center;
-            color: white;
-            margin-top: 30px;
-            opacity: 0.8;
-            font-size: 0.9em;
-        }
-        
-        .loading {
-            text-align: center;
-            padding: 40px;
-            color: #666;
-        }
-        
-        @media (max-width: 768px) {
-            .header h1 {
-                font-size: 1.8em;
-            }
-            
-            .score-value {
-                font-size: 3.5em;
-            }
-            
-            .status-badge {
-                font-size: 1.2em;
-                padding: 12px 24px;
-            }
-            
-            .main-card {
-                padding: 20px;
-            }
-            
-            .category-grid {
-                grid-template-columns: 1fr;
-            }
-        }
-        
-        .error {
-            background: #ffebee;
-            color: #c62828;
-            padding: 20px;
-            border-radius: 10px;
-            margin: 20px 0;
-            text-align: center;
-        }
-    </style>
+    <link rel="stylesheet" href="__CSS_HREF__">
 </head>
 <body>
     <div class="container">
@@ -330,12 +575,18 @@ class DashboardRenderer:
                 </div>
                 
                 <div id="boost-section"></div>
+                <div id="regime-section"></div>
                 
                 <div class="signals-section">
                     <h3>📊 主なシグナル要因</h3>
                     <div id="signals-list"></div>
                 </div>
                 
+                <div id="charts-section" class="charts-section" style="display: none;">
+                    <h3>📉 推移</h3>
+                    <div id="charts-list" class="charts-list"></div>
+                </div>
+                
                 <div class="category-grid">
                     <div class="category-card">
                         <h3>📈 金利系スコア</h3>
@@ -355,157 +606,819 @@ class DashboardRenderer:
         <div class="footer">
             <p>このツールは環境認識専用です。売買判断は行いません。</p>
             <p>データ更新: 毎日JST 7:00頃（GitHub Actions経由）</p>
+            <p><a href="archive/index.html" style="color: white;">📅 過去の記録</a></p>
         </div>
     </div>
     
-    <script>
-        // データ読み込み
-        async function loadData() {
-            try {
-                const response = await fetch('data.json');
-                if (!response.ok) throw new Error('データ取得失敗');
-                
-                const data = await response.json();
-                renderDashboard(data);
-                
-                document.getElementById('loading').style.display = 'none';
-                document.getElementById('dashboard').style.display = 'block';
-            } catch (error) {
-                console.error('データ読み込みエラー:', error);
-                document.getElementById('loading').style.display = 'none';
-                document.getElementById('error').style.display = 'block';
-            }
+    <script src="__JS_SRC__" defer></script>
+</body>
+</html>"""
+
+
+def minify_css(css):
+    """CSSを最小化（コメント・余分な空白を除去、文字列リテラルは保持）"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    parts = re.split(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', css)
+    for i in range(0, len(parts), 2):
+        chunk = re.sub(r'\s+', ' ', parts[i])
+        chunk = re.sub(r'\s*([{};:,>])\s*', r'\1', chunk)
+        parts[i] = chunk.replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+def minify_js(js):
+    """
+    JavaScriptを最小化
+    
+    行単位の保守的な最小化（インデント・空行・行コメントの除去）のみ行い、
+    改行は残すため自動セミコロン挿入の挙動は変わらない
+    """
+    lines = []
+    for line in js.splitlines():
+        line = line.strip()
+        if not line or line.startswith('//'):
+            continue
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def minify_html(html):
+    """HTMLを最小化（コメント除去、タグ間の空白を除去）"""
+    html = re.sub(r'<!--.*?-->', '', html, flags=re.S)
+    html = re.sub(r'>\s+<', '><', html)
+    html = re.sub(r'\s+', ' ', html)
+    return html.strip()
+
+
+def minify_json(data):
+    """JSONを最小化した文字列にシリアライズ"""
+    return dumps(data).decode('utf-8')
+
+
+def content_hash(content):
+    """コンテンツのSHA-256ハッシュ（16進）"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def _read_hash(path):
+    """既存ファイルのコンテンツハッシュ（存在しない場合はNone）"""
+    try:
+        with open(path, 'rb') as f:
+            return content_hash(f.read())
+    except OSError:
+        return None
+
+
+def atomic_write(path, content):
+    """一時ファイル経由でアトミックに書き込み"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def write_static(path, content, compress=True):
+    """
+    静的ファイルを書き出し、.gz / .br の事前圧縮版も出力
+    
+    既存ファイルとコンテンツハッシュが一致する場合は書き込みをスキップする
+    （圧縮版が欠けている場合のみ補完する）
+    
+    Args:
+        path: 出力先パス
+        content: ファイル内容（bytes）
+        compress: 事前圧縮版を出力するか
+    
+    Returns:
+        bool: 書き込みを行った場合はTrue
+    """
+    changed = _read_hash(path) != content_hash(content)
+    
+    if changed:
+        atomic_write(path, content)
+    
+    if not compress:
+        return changed
+    
+    gz_path = path + '.gz'
+    if changed or not os.path.exists(gz_path):
+        # mtime=0 で出力を決定的にし、内容が同じなら差分を出さない
+        atomic_write(gz_path, gzip.compress(content, compresslevel=9, mtime=0))
+    
+    br_path = path + '.br'
+    if brotli is not None and (changed or not os.path.exists(br_path)):
+        atomic_write(br_path, brotli.compress(content, quality=11))
+    
+    return changed
+
+
+class DashboardRenderer:
+    """ダッシュボードを生成するクラス"""
+    
+    # ハッシュ付きアセットの出力先（出力ディレクトリからの相対パス）
+    ASSET_DIR = 'assets'
+    
+    # ファイル名に使うハッシュの桁数
+    HASH_LENGTH = 12
+    
+    # 定期実行の時刻（UTC）。GitHub Actions の cron と合わせる
+    UPDATE_TIME_UTC = (22, 0)
+    
+    # 実行開始からデータ反映までの猶予（分）
+    UPDATE_GRACE_MINUTES = 15
+    
+    def __init__(self, metrics=None):
+        """
+        Args:
+            metrics: Metrics（生成時間と書き込み量を記録）
+        """
+        self.metrics = metrics or Metrics()
+    
+    def save_data_json(self, result, output_path, next_update=None):
+        """
+        スコアリング結果をJSON形式で保存
+        
+        同じディレクトリに version.json も出力する
+        
+        Args:
+            result: スコアリング結果
+            output_path: 出力先パス
+            next_update: 次回更新予定時刻（datetime、省略時は定期実行時刻から算出）
+        
+        Returns:
+            dict: 保存したデータ（履歴スナップショットにも使用）
+        """
+        data = self.build_data(result)
+        self.write_data_json(data, output_path, next_update)
+        return data
+    
+    def build_data(self, result, last_updated=None, date=None):
+        """
+        スコアリング結果から data.json の内容を組み立て
+        
+        Args:
+            result: スコアリング結果（calculate_score の辞書または TMFResult）
+            last_updated: 更新日時（ISO8601、省略時は現在時刻。保存済みデータの再実行ではその時刻）
+            date: 日付（YYYY-MM-DD、省略時は今日）
+        
+        Returns:
+            dict: data.json と同じ形式のデータ
+        """
+        last_updated = last_updated or datetime.now().isoformat()
+        date = date or datetime.now().strftime('%Y-%m-%d')
+        if isinstance(result, TMFResult):
+            return to_data_json(result, last_updated, date)
+        
+        return {
+            'last_updated': last_updated,
+            'date': date,
+            'score': result['total_score'],
+            'status': result['status'],
+            'category_scores': result['category_scores'],
+            'boost_conditions': result['boost_conditions'],
+            'regime_adjustment': result.get('regime_adjustment'),
+            'signals': result['signals'],
+            'raw_data': result['raw_data']
         }
+    
+    def write_data_json(self, data, output_path, next_update=None):
+        """
+        組み立て済みのデータを data.json として保存し、version.json を更新
         
-        // ダッシュボード描画
-        function renderDashboard(data) {
-            // スコアとステータス
-            document.getElementById('score-value').textContent = data.score.toFixed(1);
-            document.getElementById('score-value').style.color = data.status.color;
-            
-            const statusBadge = document.getElementById('status-badge');
-            statusBadge.textContent = `${data.status.emoji} ${data.status.label}`;
-            statusBadge.style.backgroundColor = data.status.color;
-            
-            // 最終更新
-            const updated = new Date(data.last_updated);
-            document.getElementById('last-updated').textContent = 
-                `最終更新: ${updated.toLocaleString('ja-JP')}`;
-            
-            // ブースト条件
-            if (data.boost_conditions.boost_applied) {
-                const boostHtml = `
-                    <div class="boost-alert">
-                        <h3>⚡ 補助条件発動中</h3>
-                        ${data.boost_conditions.conditions.map(c => 
-                            `<div class="boost-item">${c}</div>`
-                        ).join('')}
-                    </div>
-                `;
-                document.getElementById('boost-section').innerHTML = boostHtml;
-            }
-            
-            // シグナル
-            const signalsHtml = data.signals.map(s => 
-                `<div class="signal-item">${s}</div>`
-            ).join('');
-            document.getElementById('signals-list').innerHTML = signalsHtml;
-            
-            // カテゴリスコア
-            const interest = data.category_scores.interest_rate;
-            const risk = data.category_scores.risk_off;
-            
-            document.getElementById('interest-score').textContent = 
-                interest.total.toFixed(1);
-            
-            document.getElementById('risk-score').textContent = 
-                risk.total.toFixed(1);
-            
-            // 詳細情報
-            renderInterestDetails(interest.details);
-            renderRiskDetails(risk.details);
+        Args:
+            data: build_data で組み立てたデータ
+            output_path: 出力先パス
+            next_update: 次回更新予定時刻（datetime、省略時は定期実行時刻から算出）
+        """
+        with self.metrics.span('render', target='data_json'):
+            payload = dumps(data)
+            self.write_static(output_path, payload)
+        
+        print(f"✅ データJSON保存: {output_path}")
+        
+        version_path = os.path.join(os.path.dirname(output_path), 'version.json')
+        self.save_version_json(content_hash(payload)[:self.HASH_LENGTH], version_path, next_update)
+    
+    def save_version_json(self, data_hash, output_path, next_update=None):
+        """
+        ダッシュボードのポーリング用 version.json を保存
+        
+        クライアントはこのファイルだけを確認し、ハッシュが変わった時にのみ
+        data.json を再取得する
+        
+        Args:
+            data_hash: data.json のコンテンツハッシュ
+            output_path: 出力先パス
+            next_update: 次回更新予定時刻（datetime、省略時は定期実行時刻から算出）
+        """
+        if next_update is None:
+            next_update = self.next_update_time()
+        
+        version = {
+            'hash': data_hash,
+            'next_update': next_update.astimezone(timezone.utc).isoformat(timespec='seconds')
         }
         
-        // 金利系詳細
-        function renderInterestDetails(details) {
-            let html = '';
-            
-            if (details.treasury_10y && details.treasury_10y.value !== null) {
-                html += `
-                    <div class="detail-item">
-                        <span class="detail-label">10年債利回り</span>
-                        <span class="detail-value">${details.treasury_10y.value}%</span>
-                    </div>
-                `;
-            }
-            
-            if (details.treasury_30y && details.treasury_30y.value !== null) {
-                html += `
-                    <div class="detail-item">
-                        <span class="detail-label">30年債利回り</span>
-                        <span class="detail-value">${details.treasury_30y.value}%</span>
-                    </div>
-                `;
-            }
-            
-            if (details.rate_decline && details.rate_decline.value !== null) {
-                const change = details.rate_decline.value;
-                const arrow = change > 0 ? '📈' : '📉';
-                html += `
-                    <div class="detail-item">
-                        <span class="detail-label">2週間変化率</span>
-                        <span class="detail-value">${arrow} ${change.toFixed(2)}%</span>
-                    </div>
-                `;
-            }
+        self.write_static(output_path, minify_json(version).encode('utf-8'), compress=False)
+        
+        print(f"✅ バージョンJSON保存: {output_path}")
+    
+    def next_update_time(self, now=None):
+        """
+        次回の定期実行でデータが反映される予定時刻（UTC）を算出
+        
+        Args:
+            now: 基準時刻（省略時は現在時刻）
+        
+        Returns:
+            datetime: 次回更新予定時刻
+        """
+        now = now or datetime.now(timezone.utc)
+        hour, minute = self.UPDATE_TIME_UTC
+        
+        scheduled = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        scheduled += timedelta(minutes=self.UPDATE_GRACE_MINUTES)
+        if scheduled <= now:
+            scheduled += timedelta(days=1)
+        
+        return scheduled
+    
+    def generate_dashboard_html(self, output_path):
+        """
+        ダッシュボードHTMLを生成
+        
+        CSS/JSは最小化してコンテンツハッシュ付きのファイルに分離し、
+        HTMLからはそのファイル名で参照する
+        
+        Args:
+            output_path: 出力先パス
+        """
+        output_dir = os.path.dirname(output_path)
+        
+        with self.metrics.span('render', target='dashboard_html'):
+            css_href = self._write_asset(output_dir, 'dashboard', '.css', minify_css(DASHBOARD_CSS))
+            js_src = self._write_asset(output_dir, 'dashboard', '.js', minify_js(DASHBOARD_JS))
+            self._prune_assets(output_dir, 'dashboard', keep={css_href, js_src})
             
-            document.getElementById('interest-details').innerHTML = html;
-        }
+            html_content = (
+                DASHBOARD_HTML
+                .replace('__CSS_HREF__', css_href)
+                .replace('__JS_SRC__', js_src)
+            )
+            written = self.write_static(output_path, minify_html(html_content).encode('utf-8'))
+        
+        if written:
+            print(f"✅ ダッシュボードHTML生成: {output_path}")
+        else:
+            print(f"ℹ️  ダッシュボードHTML変更なし（スキップ）: {output_path}")
+    
+    def write_static(self, path, content, compress=True):
+        """静的ファイルを書き出し（詳細はモジュール関数 write_static を参照）"""
+        written = write_static(path, content, compress)
+        
+        self.metrics.count('render_files', result='written' if written else 'unchanged')
+        if written:
+            self.metrics.count('render_bytes', len(content))
+        
+        return written
+    
+    def _write_asset(self, output_dir, name, ext, text):
+        """コンテンツハッシュ付きアセットを書き出し、HTMLからの相対パスを返す"""
+        content = text.encode('utf-8')
+        digest = content_hash(content)[:self.HASH_LENGTH]
+        rel_path = f"{self.ASSET_DIR}/{name}.{digest}{ext}"
+        
+        asset_dir = os.path.join(output_dir, self.ASSET_DIR)
+        os.makedirs(asset_dir, exist_ok=True)
+        self.write_static(os.path.join(output_dir, rel_path), content)
+        
+        return rel_path
+    
+    def _prune_assets(self, output_dir, name, keep):
+        """参照されなくなった古いハッシュ付きアセットを削除"""
+        asset_dir = os.path.join(output_dir, self.ASSET_DIR)
+        if not os.path.isdir(asset_dir):
+            return
+        
+        keep_names = {os.path.basename(p) for p in keep}
+        pattern = re.compile(rf'^{re.escape(name)}\.[0-9a-f]{{{self.HASH_LENGTH}}}\.(css|js)$')
+        
+        for filename in os.listdir(asset_dir):
+            base = re.sub(r'\.(gz|br)$', '', filename)
+            if pattern.match(base) and base not in keep_names:
+                os.remove(os.path.join(asset_dir, filename))
+
+
+# アーカイブページ共通のスタイルシート
+ARCHIVE_CSS = """
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Hiragino Sans', Meiryo, sans-serif;
+    background: #f5f5f7;
+    color: #333;
+    margin: 0;
+    padding: 20px;
+}
+
+.container {
+    max-width: 900px;
+    margin: 0 auto;
+    background: white;
+    border-radius: 15px;
+    padding: 30px;
+}
+
+h1 {
+    font-size: 1.6em;
+    margin: 0 0 20px;
+}
+
+table {
+    width: 100%;
+    border-collapse: collapse;
+}
+
+th, td {
+    text-align: left;
+    padding: 8px;
+    border-bottom: 1px solid #e0e0e0;
+}
+
+.score {
+    font-size: 3em;
+    font-weight: bold;
+}
+
+.badge {
+    display: inline-block;
+    padding: 6px 16px;
+    border-radius: 20px;
+    color: white;
+    font-weight: bold;
+}
+
+.nav {
+    margin-bottom: 20px;
+}
+"""
+
+# アーカイブページの雛形
+ARCHIVE_PAGE = """<!DOCTYPE html>
+<html lang="ja">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title} | TMF爆発察知ツール</title>
+    <style>{css}</style>
+</head>
+<body>
+    <div class="container">
+        <div class="nav"><a href="{up_href}">← {up_label}</a></div>
+        <h1>{title}</h1>
+        {body}
+    </div>
+</body>
+</html>"""
+
+# 雛形が変わった場合は全ページを再生成する
+ARCHIVE_TEMPLATE_HASH = content_hash((ARCHIVE_CSS + ARCHIVE_PAGE).encode('utf-8'))[:12]
+
+
+def _archive_page(title, body, up_href, up_label):
+    """アーカイブページのHTMLを組み立て（最小化済みbytes）"""
+    html_content = ARCHIVE_PAGE.format(
+        title=escape(title),
+        css=minify_css(ARCHIVE_CSS),
+        up_href=up_href,
+        up_label=escape(up_label),
+        body=body
+    )
+    return minify_html(html_content).encode('utf-8')
+
+
+def _format_value(value, suffix=''):
+    """指標値を表示用に整形（欠損は '--'）"""
+    if value is None:
+        return '--'
+    return f"{value}{suffix}"
+
+
+def _render_archive_day(task):
+    """
+    日次ページを1件生成（プロセスプールのワーカーから呼ばれる）
+    
+    Args:
+        task: (日付, スナップショットのbytes, 出力先パス)
+    
+    Returns:
+        str: 生成した日付
+    """
+    date, snapshot, output_path = task
+    data = json.loads(snapshot)
+    status = data['status']
+    interest = data['category_scores']['interest_rate']
+    risk = data['category_scores']['risk_off']
+    
+    rows = [
+        ('10年債利回り', _format_value(interest['details']['treasury_10y']['value'], '%')),
+        ('30年債利回り', _format_value(interest['details']['treasury_30y']['value'], '%')),
+        ('2週間変化率', _format_value(interest['details']['rate_decline']['value'], '%')),
+        ('VIX指数', _format_value(risk['details']['vix']['value'])),
+        ('S&P500', _format_value(risk['details']['sp500_deviation'].get('price'))),
+        ('200日MA乖離', _format_value(risk['details']['sp500_deviation']['value'], '%')),
+        ('金利系スコア', _format_value(interest['total'])),
+        ('リスクオフスコア', _format_value(risk['total'])),
+    ]
+    table = ''.join(
+        f"<tr><th>{escape(label)}</th><td>{escape(value)}</td></tr>"
+        for label, value in rows
+    )
+    
+    signals = ''.join(f"<li>{escape(s)}</li>" for s in data['signals'])
+    boost = ''
+    if data['boost_conditions']['boost_applied']:
+        boost = '<p>⚡ ' + escape('、'.join(data['boost_conditions']['conditions'])) + '</p>'
+    regime = data.get('regime_adjustment')
+    if regime:
+        raised = regime['multiplier'] > 1
+        boost += (
+            f"<p>{'📈' if raised else '📉'} {escape(regime['label'])}"
+            f"（{'スコア引き上げ' if raised else 'スコア引き下げ'} ×{regime['multiplier']}）</p>"
+        )
+    
+    body = (
+        f'<div class="score" style="color: {escape(status["color"])}">{data["score"]}</div>'
+        f'<p><span class="badge" style="background: {escape(status["color"])}">'
+        f'{escape(status["emoji"])} {escape(status["label"])}</span></p>'
+        f'{boost}<h2>主なシグナル</h2><ul>{signals}</ul>'
+        f'<h2>指標</h2><table>{table}</table>'
+    )
+    
+    write_static(output_path, _archive_page(date, body, f"{date[:7]}.html", f"{date[:7]} の一覧"))
+    
+    return date
+
+
+class ArchiveRenderer:
+    """日次スナップショットから静的アーカイブを差分生成するクラス"""
+    
+    # 生成済みページの記録（日付ごとのスナップショットのハッシュ・更新時刻・サイズと要約）
+    MANIFEST_NAME = '.manifest.json'
+    
+    # この件数以上の日次ページを再生成する場合のみプロセスプールを使う
+    PARALLEL_THRESHOLD = 16
+    
+    def __init__(self, archive_dir, max_workers=None):
+        """
+        Args:
+            archive_dir: アーカイブの出力先ディレクトリ
+            max_workers: 並列生成のプロセス数（省略時はCPU数）
+        """
+        self.archive_dir = archive_dir
+        self.manifest_path = os.path.join(archive_dir, self.MANIFEST_NAME)
+        self.max_workers = max_workers
+    
+    def build(self, history, force=False):
+        """
+        新規・変更のあった日だけ日次ページを生成し、影響する月次・年次の一覧を更新
+        
+        スナップショットの更新時刻・サイズが記録と同じ日は読み込まない
+        （異なる場合のみ読み込んでハッシュを比較し、内容が変わった日だけ再生成）
+        
+        Args:
+            history: HistoryStore
+            force: Trueの場合は全ページを再生成
         
-        // リスクオフ詳細
-        function renderRiskDetails(details) {
-            let html = '';
+        Returns:
+            dict: 生成件数（days / months / years）
+        """
+        os.makedirs(self.archive_dir, exist_ok=True)
+        manifest = self._load_manifest()
+        
+        if force or manifest.get('template') != ARCHIVE_TEMPLATE_HASH:
+            known = {}
+        else:
+            known = manifest.get('days', {})
+        
+        days = {}
+        tasks = []
+        for date in history.dates():
+            snapshot_path = history.snapshot_path(date)
+            stat = os.stat(snapshot_path)
+            entry = known.get(date)
+            page_path = os.path.join(self.archive_dir, f"{date}.html")
+            if (entry and entry.get('mtime') == stat.st_mtime_ns and entry.get('size') == stat.st_size
+                    and os.path.exists(page_path)):
+                days[date] = entry
+                continue
             
-            if (details.vix && details.vix.value !== null) {
-                html += `
-                    <div class="detail-item">
-                        <span class="detail-label">VIX指数</span>
-                        <span class="detail-value">${details.vix.value.toFixed(2)}</span>
-                    </div>
-                `;
-            }
+            with open(snapshot_path, 'rb') as f:
+                snapshot = f.read()
+            digest = content_hash(snapshot)[:16]
             
-            if (details.sp500_deviation && details.sp500_deviation.value !== null) {
-                const dev = details.sp500_deviation.value;
-                const arrow = dev > 0 ? '📈' : '📉';
-                html += `
-                    <div class="detail-item">
-                        <span class="detail-label">S&P500</span>
-                        <span class="detail-value">${details.sp500_deviation.price}</span>
-                    </div>
-                    <div class="detail-item">
-                        <span class="detail-label">200日MA乖離</span>
-                        <span class="detail-value">${arrow} ${dev.toFixed(2)}%</span>
-                    </div>
-                `;
-            }
+            # 更新時刻だけが変わった（チェックアウトし直したなど）場合は記録を更新して再生成しない
+            if entry and entry['hash'] == digest and os.path.exists(page_path):
+                days[date] = dict(entry, mtime=stat.st_mtime_ns, size=stat.st_size)
+                continue
             
-            document.getElementById('risk-details').innerHTML = html;
+            data = json.loads(snapshot)
+            days[date] = {
+                'hash': digest,
+                'mtime': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'score': data['score'],
+                'emoji': data['status']['emoji'],
+                'label': data['status']['label'],
+                'color': data['status']['color']
+            }
+            tasks.append((date, snapshot, page_path))
+        
+        removed = [date for date in manifest.get('days', {}) if date not in days]
+        for date in removed:
+            self._remove_page(f"{date}.html")
+        
+        self._render_days(tasks)
+        
+        changed_dates = [task[0] for task in tasks] + removed
+        affected_months = sorted({date[:7] for date in changed_dates})
+        affected_years = sorted({month[:4] for month in affected_months})
+        
+        for month in affected_months:
+            self._render_month(month, days)
+        for year in affected_years:
+            self._render_year(year, days)
+        if affected_years:
+            self._render_index(days)
+        
+        self._save_manifest({'template': ARCHIVE_TEMPLATE_HASH, 'days': days})
+        
+        stats = {
+            'days': len(tasks),
+            'months': len(affected_months),
+            'years': len(affected_years)
         }
+        print(f"✅ アーカイブ更新: 日次 {stats['days']}件 / 月次 {stats['months']}件 / 年次 {stats['years']}件")
         
-        // ページ読み込み時に実行
-        loadData();
+        return stats
+    
+    def _render_days(self, tasks):
+        """日次ページを生成（件数が多い場合はプロセスプールで並列化）"""
+        if len(tasks) < self.PARALLEL_THRESHOLD:
+            for task in tasks:
+                _render_archive_day(task)
+            return
         
-        // 5分ごとに自動更新
-        setInterval(loadData, 5 * 60 * 1000);
-    </script>
-</body>
-</html>"""
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            chunksize = max(1, len(tasks) // ((self.max_workers or os.cpu_count() or 1) * 4))
+            for _ in executor.map(_render_archive_day, tasks, chunksize=chunksize):
+                pass
+    
+    def _render_month(self, month, days):
+        """月次一覧ページを生成（該当日がなくなった場合は削除）"""
+        dates = sorted(date for date in days if date.startswith(month))
+        if not dates:
+            self._remove_page(f"{month}.html")
+            return
+        
+        rows = ''.join(
+            f'<tr><td><a href="{date}.html">{date}</a></td>'
+            f'<td>{days[date]["score"]}</td>'
+            f'<td style="color: {escape(days[date]["color"])}">'
+            f'{escape(days[date]["emoji"])} {escape(days[date]["label"])}</td></tr>'
+            for date in dates
+        )
+        body = f"<table><tr><th>日付</th><th>スコア</th><th>ステータス</th></tr>{rows}</table>"
+        
+        write_static(
+            os.path.join(self.archive_dir, f"{month}.html"),
+            _archive_page(month, body, f"{month[:4]}.html", f"{month[:4]}年の一覧")
+        )
+    
+    def _render_year(self, year, days):
+        """年次一覧ページを生成（月ごとの件数・平均・最大スコア）"""
+        months = {}
+        for date, entry in days.items():
+            if date.startswith(year):
+                months.setdefault(date[:7], []).append(entry['score'])
+        
+        if not months:
+            self._remove_page(f"{year}.html")
+            return
+        
+        rows = ''.join(
+            f'<tr><td><a href="{month}.html">{month}</a></td><td>{len(scores)}</td>'
+            f'<td>{sum(scores) / len(scores):.1f}</td><td>{max(scores)}</td></tr>'
+            for month, scores in sorted(months.items())
+        )
+        body = f"<table><tr><th>月</th><th>日数</th><th>平均スコア</th><th>最大スコア</th></tr>{rows}</table>"
+        
+        write_static(
+            os.path.join(self.archive_dir, f"{year}.html"),
+            _archive_page(f"{year}年", body, "index.html", "年一覧")
+        )
+    
+    def _render_index(self, days):
+        """アーカイブのトップページ（年一覧）を生成"""
+        years = {}
+        for date in days:
+            years[date[:4]] = years.get(date[:4], 0) + 1
+        
+        rows = ''.join(
+            f'<tr><td><a href="{year}.html">{year}年</a></td><td>{count}</td></tr>'
+            for year, count in sorted(years.items(), reverse=True)
+        )
+        body = f"<table><tr><th>年</th><th>日数</th></tr>{rows}</table>"
+        
+        write_static(
+            os.path.join(self.archive_dir, 'index.html'),
+            _archive_page('過去の記録', body, "../index.html", "ダッシュボード")
+        )
+    
+    def _remove_page(self, filename):
+        """ページと圧縮版を削除"""
+        for suffix in ('', '.gz', '.br'):
+            path = os.path.join(self.archive_dir, filename + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def _load_manifest(self):
+        """生成記録を読み込み"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_manifest(self, manifest):
+        """生成記録を保存"""
+        atomic_write(self.manifest_path, minify_json(manifest).encode('utf-8'))
+
+
+def render_sparkline(values, width=160, height=40, color='#667eea', stroke_width=1.5):
+    """
+    数値列からSVGスパークラインを生成（描画ライブラリ不要）
+    
+    None は欠損として扱い、その位置で線を途切れさせる
+    
+    Args:
+        values: 数値のリスト（古い順）
+        width: 幅（px）
+        height: 高さ（px）
+        color: 線の色
+        stroke_width: 線の太さ
+    
+    Returns:
+        str: SVG文字列
+    """
+    valid = [v for v in values if v is not None]
+    pad = stroke_width + 1
+    
+    svg_open = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">'
+    )
+    if not valid:
+        return svg_open + '</svg>'
+    
+    low = min(valid)
+    span = (max(valid) - low) or 1.0
+    step = (width - 2 * pad) / max(1, len(values) - 1)
+    
+    segments = []
+    points = []
+    last_point = None
+    for i, value in enumerate(values):
+        if value is None:
+            if points:
+                segments.append(points)
+                points = []
+            continue
+        x = pad + i * step
+        y = height - pad - (value - low) / span * (height - 2 * pad)
+        last_point = (x, y)
+        points.append(f"{x:.1f},{y:.1f}")
+    if points:
+        segments.append(points)
+    
+    lines = ''.join(
+        f'<polyline fill="none" stroke="{color}" stroke-width="{stroke_width}" '
+        f'stroke-linejoin="round" points="{" ".join(segment)}"/>'
+        for segment in segments
+    )
+    dot = f'<circle cx="{last_point[0]:.1f}" cy="{last_point[1]:.1f}" r="{stroke_width + 0.5}" fill="{color}"/>'
+    
+    return svg_open + lines + dot + '</svg>'
+
+
+def _detail_value(category, key):
+    """data.json の category_scores から指標値を取り出すアクセサを生成"""
+    return lambda data: data['category_scores'][category]['details'][key]['value']
+
+
+class ChartRenderer:
+    """履歴からスパークラインSVGを生成し、入力ハッシュでキャッシュするクラス"""
+    
+    # チャートの出力先（出力ディレクトリからの相対パス）
+    CHART_DIR = 'charts'
+    
+    # 生成済みチャートの記録（キャッシュキー）
+    INDEX_NAME = 'index.json'
+    
+    # 対象系列: (キー, 表示名, 色, 値の取り出し)
+    SERIES = (
+        ('score', 'TMFスコア', '#667eea', lambda data: data['score']),
+        ('treasury_10y', '10年債利回り', '#0ea5e9', _detail_value('interest_rate', 'treasury_10y')),
+        ('treasury_30y', '30年債利回り', '#6366f1', _detail_value('interest_rate', 'treasury_30y')),
+        ('rate_decline', '2週間変化率', '#14b8a6', _detail_value('interest_rate', 'rate_decline')),
+        ('vix', 'VIX指数', '#ef4444', _detail_value('risk_off', 'vix')),
+        ('sp500_deviation', '200日MA乖離', '#f59e0b', _detail_value('risk_off', 'sp500_deviation')),
+    )
+    
+    # 表示期間（日数）
+    WINDOWS = (30, 90)
+    
+    # SVGのサイズ
+    WIDTH = 160
+    HEIGHT = 40
+    
+    def __init__(self, output_dir):
+        """
+        Args:
+            output_dir: ダッシュボードの出力先ディレクトリ（docs）
+        """
+        self.output_dir = output_dir
+        self.chart_dir = os.path.join(output_dir, self.CHART_DIR)
+        self.index_path = os.path.join(self.chart_dir, self.INDEX_NAME)
+    
+    @property
+    def max_window(self):
+        """必要な履歴の最大日数"""
+        return max(self.WINDOWS)
+    
+    def build(self, records, force=False):
+        """
+        全系列・全期間のスパークラインを生成
+        
+        入力データと描画パラメータのハッシュが前回と同じチャートは
+        描画も書き込みも行わない
+        
+        Args:
+            records: data.json 形式の日次データ（古い順）
+            force: キャッシュを使わずにすべて描画
+        
+        Returns:
+            dict: チャート情報（data.json の 'charts' に格納）
+        """
+        os.makedirs(self.chart_dir, exist_ok=True)
+        index = {} if force else self._load_index()
+        charts = {}
+        rendered = 0
+        
+        for key, label, color, getter in self.SERIES:
+            series = [self._safe_get(getter, record) for record in records]
+            
+            for window in self.WINDOWS:
+                values = series[-window:]
+                name = f"{key}-{window}d"
+                params = [values, self.WIDTH, self.HEIGHT, color]
+                digest = content_hash(json.dumps(params).encode('utf-8'))[:16]
+                filename = f"{name}.svg"
+                
+                if index.get(name) != digest or not os.path.exists(os.path.join(self.chart_dir, filename)):
+                    svg = render_sparkline(values, self.WIDTH, self.HEIGHT, color)
+                    write_static(os.path.join(self.chart_dir, filename), svg.encode('utf-8'))
+                    index[name] = digest
+                    rendered += 1
+                
+                charts[name] = {
+                    'label': f"{label}（{window}日）",
+                    'path': f"{self.CHART_DIR}/{filename}",
+                    'hash': digest,
+                    'width': self.WIDTH,
+                    'height': self.HEIGHT
+                }
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        if rendered:
+            atomic_write(self.index_path, minify_json(index).encode('utf-8'))
         
-        print(f"✅ ダッシュボードHTML生成: {output_path}")
+        print(f"✅ チャート生成: {rendered}件（キャッシュ利用 {len(charts) - rendered}件）")
+        
+        return charts
+    
+    @staticmethod
+    def _safe_get(getter, record):
+        """欠損・旧形式のデータは None として扱う"""
+        try:
+            return getter(record)
+        except (KeyError, TypeError):
+            return None
+    
+    def _load_index(self):
+        """キャッシュキーの記録を読み込み"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
 
 
 # テスト用
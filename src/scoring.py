@@ -5,6 +5,16 @@
 
 import math
 
+from metrics import Metrics
+from models import (
+    BoostConditions,
+    CategoryScore,
+    RegimeAdjustment,
+    Status,
+    TMFResult,
+    to_score_dict,
+)
+
 
 class TMFScorer:
     """TMF爆発スコアを計算するクラス"""
@@ -36,6 +46,12 @@ class TMFScorer:
         'imminent': (80, 100)
     }
     
+    # 株債相関レジーム（regime.py）による補正: ヘッジ局面は引き上げ、株債同方向は抑える（補助条件とは別に掛ける）
+    REGIME_MULTIPLIERS = {
+        'hedge': 1.10,
+        'co_move': 0.80
+    }
+    
     # 基準値（中央値的な想定）
     BASELINE = {
         'treasury_10y': 4.0,    # 10年債: 4%を基準
@@ -44,8 +60,52 @@ class TMFScorer:
         'rate_decline_2w': -0.3 # 2週間で-0.3%以上の低下でハイスコア
     }
     
-    def __init__(self):
-        pass
+    def __init__(self, metrics=None, weights=None, interest_weights=None, risk_weights=None,
+                 thresholds=None, labels=None):
+        """
+        Args:
+            metrics: Metrics（スコアリングの所要時間を記録）
+            weights: カテゴリの重み（指定したキーのみ WEIGHTS を上書き）
+            interest_weights: 金利系の内訳の重み（INTEREST_WEIGHTS を上書き）
+            risk_weights: リスクオフ系の内訳の重み（RISK_WEIGHTS を上書き）
+            thresholds: ステータス閾値（THRESHOLDS を上書き）
+            labels: 計測値に付けるラベル（例: {'tenant': 'rates'}）
+        """
+        self.metrics = metrics or Metrics()
+        self.labels = labels or {}
+        
+        # テナントごとの設定（省略時はクラスの既定値をそのまま使う）
+        self.WEIGHTS = self._override(self.WEIGHTS, weights, normalized=True)
+        self.INTEREST_WEIGHTS = self._override(self.INTEREST_WEIGHTS, interest_weights, normalized=True)
+        self.RISK_WEIGHTS = self._override(self.RISK_WEIGHTS, risk_weights, normalized=True)
+        self.THRESHOLDS = self._override(self.THRESHOLDS, thresholds and {
+            level: tuple(bounds) for level, bounds in thresholds.items()
+        })
+    
+    @staticmethod
+    def _override(defaults, overrides, normalized=False):
+        """
+        既定値の一部を上書き
+        
+        Args:
+            defaults: 既定値
+            overrides: 上書きする値（None は上書きなし）
+            normalized: 重みの合計が1であることを確認するか
+        
+        Raises:
+            ValueError: 未知のキー・重みの合計が1でない場合
+        """
+        if not overrides:
+            return defaults
+        
+        unknown = set(overrides) - set(defaults)
+        if unknown:
+            raise ValueError(f"未知のキー: {', '.join(sorted(unknown))}")
+        
+        merged = {**defaults, **overrides}
+        if normalized and not math.isclose(sum(merged.values()), 1.0, abs_tol=1e-6):
+            raise ValueError(f"重みの合計が1ではありません: {merged}")
+        return merged
     
     def calculate_score(self, data):
         """
@@ -55,7 +115,37 @@ class TMFScorer:
             data: DataFetcherから取得したデータ
         
         Returns:
-            dict: スコア詳細
+            dict: スコア詳細（score_result の結果を辞書に変換したもの）
+        """
+        return to_score_dict(self.score_result(data))
+    
+    def score_result(self, data):
+        """
+        TMFスコアを計算し、所要時間とスコアを計測に記録（監視のパイプライン用）
+        
+        Args:
+            data: DataFetcherから取得したデータ
+        
+        Returns:
+            TMFResult: スコア詳細
+        """
+        with self.metrics.span('score', **self.labels):
+            result = self.calculate_result(data)
+        self.metrics.gauge('score', result.total_score, **self.labels)
+        
+        return result
+    
+    def calculate_result(self, data):
+        """
+        TMFスコアを計算（型付きの結果モデルで返す）
+        
+        履歴やバックテストで大量の結果を保持する場合はこちらを使う
+        
+        Args:
+            data: DataFetcherから取得したデータ
+        
+        Returns:
+            TMFResult: スコア詳細
         """
         indicators = data['indicators']
         
@@ -65,16 +155,21 @@ class TMFScorer:
         
         # 総合スコア
         total_score = (
-            interest_score['total'] * self.WEIGHTS['interest_rate'] +
-            risk_score['total'] * self.WEIGHTS['risk_off']
+            interest_score.total * self.WEIGHTS['interest_rate'] +
+            risk_score.total * self.WEIGHTS['risk_off']
         )
         
         # 補助条件チェック
         boost_conditions = self._check_boost_conditions(indicators)
         
         # ブースト適用
-        if boost_conditions['boost_applied']:
-            total_score = min(100, total_score * boost_conditions['boost_multiplier'])
+        if boost_conditions.applied:
+            total_score = min(100, total_score * boost_conditions.multiplier)
+        
+        # 株債相関レジーム補正（株債同方向の局面ではTMFがヘッジにならないため、ブースト後に掛ける）
+        regime = self._regime_adjustment(indicators)
+        if regime is not None:
+            total_score = min(100, total_score * regime.multiplier)
         
         # ステータス判定
         status = self._determine_status(total_score)
@@ -82,50 +177,39 @@ class TMFScorer:
         # シグナル要因を特定
         signals = self._identify_signals(indicators, interest_score, risk_score)
         
-        return {
-            'total_score': round(total_score, 1),
-            'status': status,
-            'category_scores': {
-                'interest_rate': interest_score,
-                'risk_off': risk_score
-            },
-            'boost_conditions': boost_conditions,
-            'signals': signals,
-            'raw_data': indicators
-        }
+        return TMFResult(
+            total_score=round(total_score, 1),
+            status=status,
+            interest_rate=interest_score,
+            risk_off=risk_score,
+            boost=boost_conditions,
+            signals=tuple(signals),
+            raw=indicators,
+            regime=regime,
+            date=data.get('date')
+        )
     
     def _calculate_interest_score(self, indicators):
         """金利系スコアを計算"""
-        scores = {}
-        
         # 10年債スコア（低いほど高スコア）
         if indicators['treasury_10y'] is not None:
             t10y = indicators['treasury_10y']
             # 2% 以下で100点、6%以上で0点
-            score = max(0, min(100, (6.0 - t10y) / 4.0 * 100))
-            scores['treasury_10y'] = {
-                'value': t10y,
-                'score': round(score, 1)
-            }
+            t10y_score = round(max(0, min(100, (6.0 - t10y) / 4.0 * 100)), 1)
         else:
-            scores['treasury_10y'] = {'value': None, 'score': 0}
+            t10y_score = 0
         
         # 30年債スコア（低いほど高スコア）
         if indicators['treasury_30y'] is not None:
             t30y = indicators['treasury_30y']
             # 2.5% 以下で100点、6.5%以上で0点
-            score = max(0, min(100, (6.5 - t30y) / 4.0 * 100))
-            scores['treasury_30y'] = {
-                'value': t30y,
-                'score': round(score, 1)
-            }
+            t30y_score = round(max(0, min(100, (6.5 - t30y) / 4.0 * 100)), 1)
         else:
-            scores['treasury_30y'] = {'value': None, 'score': 0}
+            t30y_score = 0
         
         # 金利下落率スコア（急低下でハイスコア）
         if indicators['treasury_10y_change'] is not None:
-            change = indicators['treasury_10y_change']
-            change_pct = change['change_pct']
+            change_pct = indicators['treasury_10y_change']['change_pct']
             # -1.0%以下で100点、+0.5%以上で0点
             if change_pct <= -1.0:
                 score = 100
@@ -133,46 +217,36 @@ class TMFScorer:
                 score = 0
             else:
                 score = max(0, min(100, (-change_pct / 1.5) * 100))
-            
-            scores['rate_decline'] = {
-                'value': change_pct,
-                'score': round(score, 1)
-            }
+            decline_score = round(score, 1)
         else:
-            scores['rate_decline'] = {'value': None, 'score': 0}
+            decline_score = 0
         
         # 総合スコア
         total = (
-            scores['treasury_10y']['score'] * self.INTEREST_WEIGHTS['treasury_10y'] +
-            scores['treasury_30y']['score'] * self.INTEREST_WEIGHTS['treasury_30y'] +
-            scores['rate_decline']['score'] * self.INTEREST_WEIGHTS['rate_decline']
+            t10y_score * self.INTEREST_WEIGHTS['treasury_10y'] +
+            t30y_score * self.INTEREST_WEIGHTS['treasury_30y'] +
+            decline_score * self.INTEREST_WEIGHTS['rate_decline']
         )
         
-        return {
-            'total': round(total, 1),
-            'details': scores
-        }
+        # 並び順は models.CATEGORY_DETAILS['interest_rate'] に合わせる
+        return CategoryScore(
+            total=round(total, 1),
+            scores=(t10y_score, t30y_score, decline_score)
+        )
     
     def _calculate_risk_score(self, indicators):
         """リスクオフスコアを計算"""
-        scores = {}
-        
         # VIXスコア（高いほど高スコア）
         if indicators['vix'] is not None:
             vix = indicators['vix']
             # 10以下で0点、30以上で100点
-            score = max(0, min(100, (vix - 10) / 20 * 100))
-            scores['vix'] = {
-                'value': vix,
-                'score': round(score, 1)
-            }
+            vix_score = round(max(0, min(100, (vix - 10) / 20 * 100)), 1)
         else:
-            scores['vix'] = {'value': None, 'score': 0}
+            vix_score = 0
         
         # S&P500乖離率スコア（マイナス乖離で高スコア）
         if indicators['sp500'] is not None:
-            sp = indicators['sp500']
-            deviation = sp['deviation_pct']
+            deviation = indicators['sp500']['deviation_pct']
             # -10%以下で100点、+5%以上で0点
             if deviation <= -10:
                 score = 100
@@ -180,26 +254,21 @@ class TMFScorer:
                 score = 0
             else:
                 score = max(0, min(100, (-deviation / 15) * 100))
-            
-            scores['sp500_deviation'] = {
-                'value': deviation,
-                'price': sp['price'],
-                'ma_200': sp['ma_200'],
-                'score': round(score, 1)
-            }
+            sp_score = round(score, 1)
         else:
-            scores['sp500_deviation'] = {'value': None, 'score': 0}
+            sp_score = 0
         
         # 総合スコア
         total = (
-            scores['vix']['score'] * self.RISK_WEIGHTS['vix'] +
-            scores['sp500_deviation']['score'] * self.RISK_WEIGHTS['sp500_deviation']
+            vix_score * self.RISK_WEIGHTS['vix'] +
+            sp_score * self.RISK_WEIGHTS['sp500_deviation']
         )
         
-        return {
-            'total': round(total, 1),
-            'details': scores
-        }
+        # 並び順は models.CATEGORY_DETAILS['risk_off'] に合わせる
+        return CategoryScore(
+            total=round(total, 1),
+            scores=(vix_score, sp_score)
+        )
     
     def _check_boost_conditions(self, indicators):
         """補助条件（ブースト）をチェック"""
@@ -224,60 +293,53 @@ class TMFScorer:
             conditions.append('VIX高騰 + S&P500急落')
             boost_multiplier = max(boost_multiplier, 1.20)
         
-        return {
-            'boost_applied': len(conditions) > 0,
-            'boost_multiplier': boost_multiplier,
-            'conditions': conditions
-        }
+        return BoostConditions(
+            applied=len(conditions) > 0,
+            multiplier=boost_multiplier,
+            conditions=tuple(conditions)
+        )
+    
+    def _regime_adjustment(self, indicators):
+        """株債相関レジームによる補正（中立・レジーム不明の場合はNone）"""
+        regime = indicators.get('stock_bond_regime')
+        if not regime or regime['regime'] not in self.REGIME_MULTIPLIERS:
+            return None
+        return RegimeAdjustment(
+            regime=regime['regime'],
+            label=regime['label'],
+            multiplier=self.REGIME_MULTIPLIERS[regime['regime']]
+        )
     
     def _determine_status(self, score):
         """スコアからステータスを判定"""
         if score <= self.THRESHOLDS['normal'][1]:
-            return {
-                'level': 'normal',
-                'label': '通常',
-                'emoji': '🟢',
-                'color': '#10b981'
-            }
+            return Status.NORMAL
         elif score <= self.THRESHOLDS['precursor'][1]:
-            return {
-                'level': 'precursor',
-                'label': '前兆',
-                'emoji': '⚠️',
-                'color': '#f59e0b'
-            }
+            return Status.PRECURSOR
         elif score <= self.THRESHOLDS['alert'][1]:
-            return {
-                'level': 'alert',
-                'label': '警戒',
-                'emoji': '🚨',
-                'color': '#ef4444'
-            }
+            return Status.ALERT
         else:
-            return {
-                'level': 'imminent',
-                'label': '直前',
-                'emoji': '💥',
-                'color': '#dc2626'
-            }
+            return Status.IMMINENT
     
     def _identify_signals(self, indicators, interest_score, risk_score):
         """主要シグナル要因を特定"""
         signals = []
+        t10y_score, _, decline_score = interest_score.scores
+        vix_score, sp_score = risk_score.scores
         
         # 金利系シグナル
-        if interest_score['details']['treasury_10y']['score'] > 60:
-            signals.append(f"10年債低水準 ({interest_score['details']['treasury_10y']['value']}%)")
+        if t10y_score > 60:
+            signals.append(f"10年債低水準 ({indicators['treasury_10y']}%)")
         
-        if interest_score['details']['rate_decline']['score'] > 60:
-            signals.append(f"金利急低下 ({interest_score['details']['rate_decline']['value']}%)")
+        if decline_score > 60:
+            signals.append(f"金利急低下 ({indicators['treasury_10y_change']['change_pct']}%)")
         
         # リスクオフ系シグナル
-        if risk_score['details']['vix']['score'] > 60:
-            signals.append(f"VIX上昇 ({risk_score['details']['vix']['value']})")
+        if vix_score > 60:
+            signals.append(f"VIX上昇 ({indicators['vix']})")
         
-        if risk_score['details']['sp500_deviation']['score'] > 60:
-            signals.append(f"S&P500急落 ({risk_score['details']['sp500_deviation']['value']}%)")
+        if sp_score > 60:
+            signals.append(f"S&P500急落 ({indicators['sp500']['deviation_pct']}%)")
         
         if not signals:
             signals.append("目立った変化なし")
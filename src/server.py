@@ -0,0 +1,370 @@
+"""
+HTTP APIサーバーモジュール
+最新のスコア・ステータス・指標・履歴をメモリ上のキャッシュから返す（ETag・gzip対応）
+"""
+
+import argparse
+import bisect
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from models import dumps
+
+# 履歴の期間指定（YYYY-MM-DD）
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+class APIError(Exception):
+    """クライアントに返すエラー（ステータスコードとエラーコード）"""
+    
+    def __init__(self, status, code):
+        super().__init__(code)
+        self.status = status
+        self.code = code
+
+
+class CachedResponse:
+    """シリアライズ済みのレスポンス（本文・gzip・ETag を一度だけ計算）"""
+    
+    __slots__ = ('body', 'gzipped', 'etag')
+    
+    # これより小さい本文は圧縮しない
+    GZIP_MIN_BYTES = 256
+    
+    def __init__(self, obj):
+        self.body = dumps(obj)
+        self.gzipped = (
+            gzip.compress(self.body, compresslevel=6, mtime=0)
+            if len(self.body) >= self.GZIP_MIN_BYTES else None
+        )
+        # gzip の有無で表現が変わるため弱いETag
+        self.etag = f'W/"{hashlib.sha256(self.body).hexdigest()[:16]}"'
+
+
+def _history_record(data):
+    """日次データ（data.json 形式）を履歴APIの1件に縮約"""
+    return {
+        'date': data['date'],
+        'score': data['score'],
+        'status': data['status']['level'],
+        'category_scores': {
+            name: category['total']
+            for name, category in data.get('category_scores', {}).items()
+        }
+    }
+
+
+class ResultCache:
+    """
+    APIの応答をメモリに保持するキャッシュ（スレッドセーフ）
+    
+    最新結果のエンドポイントは更新時にシリアライズ・圧縮しておき、
+    リクエスト時は保持しているbytesを返すだけにする。
+    履歴は日付順の配列から二分探索で切り出し、期間ごとの応答を HISTORY_CACHE_SIZE 件まで保持する
+    """
+    
+    # 期間ごとの履歴応答を保持する件数
+    HISTORY_CACHE_SIZE = 64
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._responses = {}
+        self._dates = []
+        self._records = []
+        self._history_responses = {}
+        self.updated_at = None
+        self._source_key = None
+    
+    def update(self, data):
+        """
+        最新の実行結果で更新（実行ごとに呼ぶ）
+        
+        Args:
+            data: data.json と同じ形式のデータ
+        """
+        responses = {
+            '/score': CachedResponse({
+                'score': data['score'],
+                'status': data['status']['level'],
+                'label': data['status']['label'],
+                'date': data['date'],
+                'last_updated': data['last_updated']
+            }),
+            '/status': CachedResponse({
+                'status': data['status'],
+                'signals': data.get('signals', []),
+                'boost_conditions': data.get('boost_conditions'),
+                'last_updated': data['last_updated']
+            }),
+            '/indicators': CachedResponse({
+                'indicators': data.get('raw_data', {}),
+                'category_scores': data.get('category_scores', {}),
+                'last_updated': data['last_updated']
+            })
+        }
+        record = _history_record(data)
+        
+        with self._lock:
+            self._responses = responses
+            self._upsert(record)
+            self._history_responses = {}
+            self.updated_at = datetime.now().isoformat(timespec='seconds')
+    
+    def set_history(self, snapshots):
+        """
+        履歴を置き換え
+        
+        Args:
+            snapshots: data.json 形式の日次データ（HistoryStore.load_range の戻り値）
+        """
+        records = sorted((_history_record(data) for data in snapshots), key=lambda r: r['date'])
+        with self._lock:
+            self._records = records
+            self._dates = [record['date'] for record in records]
+            self._history_responses = {}
+    
+    def _upsert(self, record):
+        """同じ日付の履歴は置き換え、なければ日付順の位置に挿入（ロック内で呼ぶ）"""
+        index = bisect.bisect_left(self._dates, record['date'])
+        if index < len(self._dates) and self._dates[index] == record['date']:
+            self._records[index] = record
+        else:
+            self._dates.insert(index, record['date'])
+            self._records.insert(index, record)
+    
+    def load(self, docs_dir):
+        """
+        docs の data.json と history から読み込み（data.json が前回から変わっていなければ何もしない）
+        
+        Args:
+            docs_dir: 公開ディレクトリ
+        
+        Returns:
+            bool: 読み込んだか
+        """
+        from history import HistoryStore
+        
+        path = os.path.join(docs_dir, 'data.json')
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        
+        source_key = (stat.st_mtime_ns, stat.st_size)
+        if source_key == self._source_key:
+            return False
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        self.set_history(HistoryStore(os.path.join(docs_dir, 'history')).load_range())
+        self.update(data)
+        self._source_key = source_key
+        return True
+    
+    def get(self, path, query=None):
+        """
+        エンドポイントの応答を取得
+        
+        Args:
+            path: パス（例: '/score'）
+            query: クエリ文字列を parse_qs した辞書
+        
+        Returns:
+            CachedResponse
+        
+        Raises:
+            APIError: 不明なパス・不正な期間・データ未取得
+        """
+        if path == '/history':
+            return self._history(query or {})
+        
+        if path not in ('/score', '/status', '/indicators'):
+            raise APIError(404, 'not_found')
+        
+        response = self._responses.get(path)
+        if response is None:
+            raise APIError(503, 'no_data')
+        return response
+    
+    def _history(self, query):
+        """期間内の履歴（from / to は YYYY-MM-DD、省略時は全期間）"""
+        start = query.get('from', [''])[0]
+        end = query.get('to', [''])[0]
+        for value in (start, end):
+            if value and not DATE_PATTERN.match(value):
+                raise APIError(400, 'invalid_date')
+        
+        key = (start, end)
+        with self._lock:
+            # update で作り直された場合は古い応答を保持しない
+            responses = self._history_responses
+            response = responses.get(key)
+            if response is not None:
+                return response
+            
+            lo = bisect.bisect_left(self._dates, start) if start else 0
+            hi = bisect.bisect_right(self._dates, end) if end else len(self._dates)
+            records = self._records[lo:hi]
+        
+        response = CachedResponse({
+            'from': start or None,
+            'to': end or None,
+            'count': len(records),
+            'history': records
+        })
+        
+        with self._lock:
+            if responses is self._history_responses:
+                if len(responses) >= self.HISTORY_CACHE_SIZE:
+                    # 最も古く追加したものから破棄
+                    del responses[next(iter(responses))]
+                responses[key] = response
+        
+        return response
+
+
+class APIServer:
+    """
+    ResultCache を公開するHTTPサーバー
+    
+    - GET /score, /status, /indicators, /history?from=&to=
+    - If-None-Match が一致すれば 304、Accept-Encoding: gzip なら圧縮済みの本文を返す
+    """
+    
+    def __init__(self, cache, host='127.0.0.1', port=8080):
+        """
+        Args:
+            cache: ResultCache
+            host: 待ち受けホスト
+            port: 待ち受けポート（0は空きポートを自動選択）
+        """
+        self.cache = cache
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def url(self):
+        """ベースURL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self):
+        """バックグラウンドで待ち受けを開始"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='api-server', daemon=True)
+        self._thread.start()
+        return self
+    
+    def serve_forever(self):
+        """現在のスレッドで待ち受け（Ctrl+C まで）"""
+        self._server.serve_forever()
+    
+    def stop(self):
+        """待ち受けを終了"""
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def _handler_class(self):
+        cache = self.cache
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+            
+            def do_GET(self):
+                self._respond(head=False)
+            
+            def do_HEAD(self):
+                self._respond(head=True)
+            
+            def _respond(self, head):
+                url = urlsplit(self.path)
+                try:
+                    response = cache.get(url.path, parse_qs(url.query))
+                except APIError as e:
+                    self._send(e.status, json.dumps({'error': e.code}).encode('utf-8'), head=head)
+                    return
+                
+                headers = {'ETag': response.etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+                
+                if self.headers.get('If-None-Match') == response.etag:
+                    self._send(304, b'', headers, head=True)
+                    return
+                
+                body = response.body
+                if response.gzipped is not None and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = response.gzipped
+                    headers['Content-Encoding'] = 'gzip'
+                
+                self._send(200, body, headers, head=head)
+            
+            def _send(self, status, body, headers=None, head=False):
+                self.send_response(status)
+                if status != 304:
+                    self.send_header('Content-Type', 'application/json; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if not head:
+                    self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+
+
+def serve(docs_dir, host='127.0.0.1', port=8080, reload_interval=30.0):
+    """
+    docs の data.json・history を公開し、data.json が更新されたら読み込み直す（Ctrl+C まで）
+    
+    Args:
+        docs_dir: 公開ディレクトリ
+        host: 待ち受けホスト
+        port: 待ち受けポート
+        reload_interval: data.json の更新を確認する間隔（秒）
+    """
+    cache = ResultCache()
+    if not cache.load(docs_dir):
+        print(f"⚠️  data.json がありません（作成されるまで 503 を返します）: {docs_dir}")
+    
+    server = APIServer(cache, host, port).start()
+    print(f"🌐 APIサーバー起動: {server.url}/score /status /indicators /history?from=&to=")
+    try:
+        while True:
+            time.sleep(reload_interval)
+            if cache.load(docs_dir):
+                print(f"🔄 データ更新を反映: {cache.updated_at}")
+    except KeyboardInterrupt:
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TMF監視 HTTP APIサーバー')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--docs-dir', default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'docs'))
+    parser.add_argument('--reload-interval', type=float, default=30.0, help='data.json の更新を確認する間隔（秒）')
+    args = parser.parse_args()
+    
+    serve(args.docs_dir, args.host, args.port, args.reload_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Slack Incoming Webhook スタブサーバー
+ローカルでSlackのWebhook APIを模倣し、レート制限（429 + Retry-After）・遅延応答・5xxエラーを再現
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SlackStubServer:
+    """
+    Slack Incoming Webhook のスタブ
+    
+    Slackと同じく、正常時は 200 "ok"、本文不正は 400 "invalid_payload"、
+    レート超過は 429 + Retry-After（整数秒）を返す
+    """
+    
+    def __init__(self, host='127.0.0.1', port=0, rate_limit=1.0, burst=None,
+                 slow_rate=0.0, slow_delay=0.5, error_rate=0.0, seed=None):
+        """
+        Args:
+            host: 待ち受けホスト
+            port: 待ち受けポート（0は空きポートを自動選択）
+            rate_limit: 1秒あたりの受付上限（Noneは無制限）
+            burst: 連続で受け付ける最大数（省略時は1秒分）
+            slow_rate: 遅延応答にする割合（0〜1）
+            slow_delay: 遅延応答の遅延（秒）
+            error_rate: 5xxを返す割合（0〜1）
+            seed: 乱数シード
+        """
+        self.rate_limit = rate_limit
+        self.burst = burst or max(1.0, rate_limit or 1.0)
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.error_rate = error_rate
+        
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self.reset()
+        
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def url(self):
+        """Webhook URL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/services/T000/B000/stub"
+    
+    def start(self):
+        """バックグラウンドで待ち受けを開始"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='slack-stub', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """待ち受けを終了"""
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def reset(self):
+        """統計をクリア"""
+        with self._lock:
+            self.stats = {
+                'received': 0,
+                'accepted': 0,
+                'rate_limited': 0,
+                'errors': 0,
+                'invalid': 0,
+                'slow': 0,
+                'duplicates': 0
+            }
+            self.accepted_times = []
+            self.messages = []
+            self._keys = set()
+    
+    def max_rate(self, window=1.0):
+        """受け付けたメッセージ数の最大値（任意の window 秒間）"""
+        times = sorted(self.accepted_times)
+        peak = 0
+        start = 0
+        for end, t in enumerate(times):
+            while t - times[start] >= window:
+                start += 1
+            peak = max(peak, end - start + 1)
+        return peak
+    
+    def _take_token(self):
+        """
+        トークンバケットから1つ取得
+        
+        Returns:
+            float: 取得できた場合は0、できない場合は再試行までの秒数
+        """
+        if self.rate_limit is None:
+            return 0
+        
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_limit)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / self.rate_limit
+    
+    def _handle(self, body, idempotency_key):
+        """
+        1リクエストを処理
+        
+        Returns:
+            tuple: (ステータスコード, 本文, 追加ヘッダー, 遅延秒数)
+        """
+        with self._lock:
+            self.stats['received'] += 1
+            
+            retry_after = self._take_token()
+            if retry_after:
+                self.stats['rate_limited'] += 1
+                return 429, 'rate_limited', {'Retry-After': str(max(1, math.ceil(retry_after)))}, 0
+            
+            delay = 0
+            if self._random.random() < self.slow_rate:
+                self.stats['slow'] += 1
+                delay = self.slow_delay
+            
+            if self._random.random() < self.error_rate:
+                self.stats['errors'] += 1
+                return 500, 'internal_error', {}, delay
+            
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                payload = None
+            if not isinstance(payload, dict) or not (payload.get('text') or payload.get('blocks')):
+                self.stats['invalid'] += 1
+                return 400, 'invalid_payload', {}, delay
+            
+            if idempotency_key:
+                if idempotency_key in self._keys:
+                    self.stats['duplicates'] += 1
+                self._keys.add(idempotency_key)
+            
+            self.stats['accepted'] += 1
+            self.accepted_times.append(time.monotonic())
+            self.messages.append(payload)
+        
+        return 200, 'ok', {}, delay
+    
+    def _handler_class(self):
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+            
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length)
+                status, text, headers, delay = stub._handle(body, self.headers.get('X-Idempotency-Key'))
+                
+                if delay:
+                    time.sleep(delay)
+                
+                data = text.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/plain')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Slack Incoming Webhook スタブサーバー')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--rate-limit', type=float, default=1.0, help='1秒あたりの受付上限')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='遅延応答の割合')
+    parser.add_argument('--slow-delay', type=float, default=0.5, help='遅延応答の遅延（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='5xxの割合')
+    args = parser.parse_args()
+    
+    stub = SlackStubServer(
+        args.host,
+        args.port,
+        rate_limit=args.rate_limit,
+        slow_rate=args.slow_rate,
+        slow_delay=args.slow_delay,
+        error_rate=args.error_rate
+    ).start()
+    
+    print(f"🧪 Slackスタブ起動: {stub.url}")
+    print("   SLACK_WEBHOOK_URL に設定して main.py を実行できます（Ctrl+Cで終了）")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"📊 {stub.stats}")
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
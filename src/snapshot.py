@@ -0,0 +1,123 @@
+"""
+実行状態スナップショットモジュール
+温まった実行状態（FREDキャッシュ・公表カレンダー・ローリングウィンドウ）を1ファイルに書き出し、
+起動時に整合性を確認して読み込む（CIのキャッシュなど、毎回まっさらな実行環境で使う）
+
+ファイルは gzip 圧縮した「ヘッダー1行（JSON） + 本体（JSON）」で、
+ヘッダーに形式・バージョン・本体のバイト数と SHA-256 を持つ
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import zlib
+from datetime import datetime, timezone
+
+FORMAT = 'tmf-monitor-snapshot'
+
+# 本体の構造を変えたら上げる（異なるバージョンは読み込まない）
+VERSION = 1
+
+
+class SnapshotError(Exception):
+    """スナップショットを使えない（形式・バージョン・整合性の不一致）"""
+    pass
+
+
+def write_snapshot(path, sections):
+    """
+    スナップショットを書き出し（一時ファイル経由で置き換え）
+    
+    Args:
+        path: 保存先
+        sections: {セクション名: JSONにできる値}
+    
+    Returns:
+        dict: ヘッダー（'format', 'version', 'created', 'sections', 'size', 'sha256'）と圧縮後の 'bytes'
+    """
+    payload = json.dumps(sections, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    header = {
+        'format': FORMAT,
+        'version': VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'sections': sorted(sections),
+        'size': len(payload),
+        'sha256': hashlib.sha256(payload).hexdigest()
+    }
+    body = gzip.compress(json.dumps(header).encode('utf-8') + b'\n' + payload, mtime=0)
+    
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+    
+    return dict(header, bytes=len(body))
+
+
+def read_snapshot(path):
+    """
+    スナップショットを読み込み、形式・バージョン・バイト数・SHA-256 を確認
+    
+    Args:
+        path: ファイルのパス
+    
+    Returns:
+        tuple: (ヘッダー（圧縮後の 'bytes' を追加）, {セクション名: 値})
+    
+    Raises:
+        OSError: ファイルを読めない場合
+        SnapshotError: 形式・バージョン・整合性が合わない場合
+    """
+    with open(path, 'rb') as f:
+        body = f.read()
+    
+    try:
+        raw = gzip.decompress(body)
+    except (OSError, EOFError, zlib.error) as e:
+        raise SnapshotError(f"展開できません: {e}")
+    
+    header_line, _, payload = raw.partition(b'\n')
+    try:
+        header = json.loads(header_line)
+    except ValueError:
+        raise SnapshotError("ヘッダーを読めません")
+    if not isinstance(header, dict) or header.get('format') != FORMAT:
+        raise SnapshotError("スナップショットの形式ではありません")
+    if header.get('version') != VERSION:
+        raise SnapshotError(f"バージョンが異なります: {header.get('version')}（対応: {VERSION}）")
+    if len(payload) != header.get('size') or hashlib.sha256(payload).hexdigest() != header.get('sha256'):
+        raise SnapshotError("本体のバイト数・SHA-256 がヘッダーと一致しません")
+    
+    return dict(header, bytes=len(body)), json.loads(payload)
+
+
+# テスト用
+if __name__ == "__main__":
+    import tempfile
+    import time
+    
+    sections = {
+        'fred_cache': {'DGS10': {'etag': '"abc"', 'rows': [['2025-01-02', 4.57]] * 400}},
+        'release_calendar': {'series': {'DGS10': {'latest': '2025-01-02', 'samples': []}}}
+    }
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, 'snapshot.json.gz')
+        header = write_snapshot(path, sections)
+        print(f"\n=== 書き出し: {header['bytes']:,}バイト（本体 {header['size']:,}バイト） ===")
+        
+        started = time.perf_counter()
+        _, loaded = read_snapshot(path)
+        print(f"読み込み: {(time.perf_counter() - started) * 1000:.2f}ms 一致: {loaded == sections}")
+        
+        # 1バイト壊すと整合性エラー
+        raw = bytearray(gzip.decompress(open(path, 'rb').read()))
+        raw[-5] ^= 1
+        with open(path, 'wb') as f:
+            f.write(gzip.compress(bytes(raw)))
+        try:
+            read_snapshot(path)
+        except SnapshotError as e:
+            print(f"改ざん検知: {e}")
@@ -0,0 +1,133 @@
+"""
+メッセージテンプレートモジュール
+Block Kit のレイアウトを一度だけJSONにコンパイルし、イベントごとにスロットを埋めてbytesを生成
+"""
+
+import json
+import re
+
+from channels import blocks_to_text
+
+# スロットのプレースホルダー（例: "{{score}}"）
+PLACEHOLDER = re.compile(r'\{\{(\w+)\}\}')
+
+
+class Slot:
+    """型付きのスロット"""
+    
+    def __init__(self, name, kind=str, format_spec='', limit=None, bullet='• '):
+        """
+        Args:
+            name: スロット名
+            kind: 値の型（str / float / list）
+            format_spec: 数値の書式（例: '+.1f'）
+            limit: list の場合の最大件数
+            bullet: list の各行の先頭文字
+        """
+        self.name = name
+        self.kind = kind
+        self.format_spec = format_spec
+        self.limit = limit
+        self.bullet = bullet
+    
+    def render(self, value):
+        """値を文字列に変換（型が合わない場合は TypeError）"""
+        if self.kind is float:
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise TypeError(f"スロット '{self.name}' には数値が必要です: {value!r}")
+            return format(value, self.format_spec) if self.format_spec else str(value)
+        
+        if self.kind is list:
+            if not isinstance(value, (list, tuple)):
+                raise TypeError(f"スロット '{self.name}' にはリストが必要です: {value!r}")
+            return '\n'.join(f"{self.bullet}{item}" for item in value[:self.limit])
+        
+        if not isinstance(value, str):
+            raise TypeError(f"スロット '{self.name}' には文字列が必要です: {value!r}")
+        return value
+
+
+def _json_escape(text):
+    """JSON文字列リテラルの中身としてエスケープ（前後の引用符なし）"""
+    return json.dumps(text, ensure_ascii=False)[1:-1]
+
+
+class MessageTemplate:
+    """
+    コンパイル済みの Block Kit メッセージ
+    
+    ブロックを一度だけJSONへシリアライズし、プレースホルダーで分割しておく。
+    render はリテラル部分とエスケープしたスロット値を連結するだけなので、
+    入れ子の辞書を組み立ててシリアライズし直すより軽い
+    """
+    
+    def __init__(self, blocks, slots):
+        """
+        Args:
+            blocks: プレースホルダー（"{{name}}"）を含むブロックのリスト
+            slots: Slot のリスト（ブロック内のプレースホルダーはすべて宣言が必要）
+        """
+        self.blocks = blocks
+        declared = {slot.name: slot for slot in slots}
+        
+        document = json.dumps({'blocks': blocks}, ensure_ascii=False, separators=(',', ':'))
+        self._json_parts = self._compile(document, declared, lambda s: s.encode('utf-8'))
+        self._text_parts = self._compile(blocks_to_text(blocks), declared, lambda s: s)
+        
+        # このテンプレートで使うスロットのみ（values に余分なキーがあってもよい）
+        self.slots = {name: declared[name] for _, name in self._json_parts if name}
+    
+    @staticmethod
+    def _compile(source, declared, literal):
+        """テンプレート文字列を（リテラル, スロット名）の並びに分割"""
+        parts = []
+        position = 0
+        for match in PLACEHOLDER.finditer(source):
+            name = match.group(1)
+            if name not in declared:
+                raise KeyError(f"未定義のスロット: {name}")
+            parts.append((literal(source[position:match.start()]), name))
+            position = match.end()
+        parts.append((literal(source[position:]), None))
+        return parts
+    
+    def render(self, values):
+        """
+        スロットを埋めて送信用のJSON（bytes）を生成
+        
+        Args:
+            values: {スロット名: 値}
+        
+        Returns:
+            bytes: {"blocks": [...]} のJSON
+        """
+        rendered = {name: _json_escape(slot.render(values[name])).encode('utf-8') for name, slot in self.slots.items()}
+        return b''.join(
+            literal + rendered[name] if name else literal
+            for literal, name in self._json_parts
+        )
+    
+    def render_text(self, values):
+        """スロットを埋めてプレーンテキスト（メール等のフォールバック用）を生成"""
+        return ''.join(
+            literal + self.slots[name].render(values[name]) if name else literal
+            for literal, name in self._text_parts
+        )
+
+
+# テスト用
+if __name__ == "__main__":
+    template = MessageTemplate(
+        [
+            {"type": "header", "text": {"type": "plain_text", "text": "{{title}}"}},
+            {"type": "section", "text": {"type": "mrkdwn", "text": "*スコア*\n{{score}}点 ({{diff}})\n{{signals}}"}}
+        ],
+        [Slot('title'), Slot('score', float), Slot('diff', float, '+.1f'), Slot('signals', list, limit=2)]
+    )
+    values = {'title': '"TMF" 監視', 'score': 72.5, 'diff': 14.3, 'signals': ['VIX上昇', '金利急低下', '3件目']}
+    
+    body = template.render(values)
+    print("\n=== メッセージテンプレート ===")
+    print(body.decode('utf-8'))
+    print(f"JSONとして妥当: {json.loads(body)['blocks'][0]['text']['text'] == values['title']}")
+    print(template.render_text(values))
@@ -0,0 +1,138 @@
+"""
+テナント設定モジュール
+デスクごとの閾値・重み・通知先・出力先（テナントプロファイル）を読み込み
+"""
+
+import json
+import os
+import re
+
+
+class TenantProfile:
+    """
+    1テナント分の設定
+    
+    重み・閾値は指定したキーのみ TMFScorer の既定値を上書きする。
+    通知先のURLは設定ファイルに書かず、環境変数名で指定する
+    """
+    
+    # テナント名（ステージ名・ディレクトリ名に使う）
+    NAME_PATTERN = re.compile(r'^[a-z0-9][a-z0-9_-]*$')
+    
+    # メインの docs 直下でメインのモニターが使うディレクトリ（テナントの出力先にできない）
+    RESERVED_DIRS = ('archive', 'history', 'charts', 'assets')
+    
+    def __init__(self, name, docs_dir=None, weights=None, interest_weights=None, risk_weights=None,
+                 thresholds=None, channels=None, dashboard_url=None):
+        """
+        Args:
+            name: テナント名（英小文字・数字・-・_）
+            docs_dir: 出力先（メインの docs からの相対パス、省略時はテナント名。docs の外・RESERVED_DIRS は不可）
+            weights: カテゴリの重み（例: {'interest_rate': 0.6, 'risk_off': 0.4}）
+            interest_weights: 金利系の内訳の重み
+            risk_weights: リスクオフ系の内訳の重み
+            thresholds: ステータス閾値（例: {'alert': [60, 79]}）
+            channels: 通知先（channels_from_config の設定）
+            dashboard_url: ダッシュボードURL（省略時はメインのURL + 出力先）
+        """
+        if not self.NAME_PATTERN.match(name or ''):
+            raise ValueError(f"テナント名が不正です: {name!r}")
+        
+        self.name = name
+        self.docs_dir = self._normalize_docs_dir(docs_dir or name)
+        self.weights = weights
+        self.interest_weights = interest_weights
+        self.risk_weights = risk_weights
+        self.thresholds = thresholds
+        self.channels = channels or {}
+        self.dashboard_url = dashboard_url
+    
+    @classmethod
+    def _normalize_docs_dir(cls, docs_dir):
+        """出力先を正規化（メインの docs の外・メインの出力と重なる場合は ValueError）"""
+        if not isinstance(docs_dir, str) or os.path.isabs(docs_dir) or docs_dir.startswith(('/', '\\')):
+            raise ValueError(f"テナントの出力先はメインの docs からの相対パスで指定してください: {docs_dir!r}")
+        
+        normalized = os.path.normpath(docs_dir.replace('\\', '/'))
+        parts = normalized.split(os.sep)
+        if '..' in parts:
+            raise ValueError(f"テナントの出力先がメインの docs の外を指しています: {docs_dir!r}")
+        # '.'（docs 自体）や data.json などのファイル名もメインの出力と重なる
+        if parts[0] in cls.RESERVED_DIRS or '.' in parts[0]:
+            raise ValueError(f"テナントの出力先にメインの出力と同じ名前は使えません: {docs_dir!r}")
+        return normalized
+    
+    @classmethod
+    def from_dict(cls, data):
+        """設定ファイルの1要素から作成"""
+        unknown = set(data) - {
+            'name', 'docs_dir', 'weights', 'interest_weights', 'risk_weights',
+            'thresholds', 'channels', 'dashboard_url'
+        }
+        if unknown:
+            raise ValueError(f"未知の設定項目: {', '.join(sorted(unknown))}")
+        return cls(**data)
+    
+    def scorer_options(self):
+        """TMFScorer に渡す上書き設定"""
+        return {
+            'weights': self.weights,
+            'interest_weights': self.interest_weights,
+            'risk_weights': self.risk_weights,
+            'thresholds': self.thresholds,
+            'labels': {'tenant': self.name}
+        }
+
+
+def load_tenants(path):
+    """
+    テナント設定ファイル（JSON）を読み込み
+    
+    {"tenants": [{"name": "rates", "weights": {...}, "channels": {...}}, ...]}
+    
+    Args:
+        path: 設定ファイルのパス
+    
+    Returns:
+        list: TenantProfile のリスト
+    
+    Raises:
+        ValueError: 形式不正・名前や出力先の重複
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    
+    profiles = [TenantProfile.from_dict(item) for item in config.get('tenants', [])]
+    
+    for attribute in ('name', 'docs_dir'):
+        values = [getattr(profile, attribute) for profile in profiles]
+        duplicates = sorted({value for value in values if values.count(value) > 1})
+        if duplicates:
+            raise ValueError(f"テナントの {attribute} が重複しています: {', '.join(duplicates)}")
+    
+    return profiles
+
+
+# テスト用
+if __name__ == "__main__":
+    profile = TenantProfile.from_dict({
+        'name': 'rates',
+        'weights': {'interest_rate': 0.6, 'risk_off': 0.4},
+        'thresholds': {'alert': [60, 79]},
+        'channels': {'slack_webhook_env': 'RATES_SLACK_WEBHOOK_URL'}
+    })
+    
+    print("\n=== テナント設定 ===")
+    print(f"{profile.name}: 出力先 {profile.docs_dir}")
+    print(profile.scorer_options())
+    
+    # メインの出力と重なる・docs の外を指す出力先は拒否
+    for invalid in ({'name': 'archive'}, {'name': 'desk', 'docs_dir': 'history'},
+                    {'name': 'desk', 'docs_dir': '/var/www'}, {'name': 'desk', 'docs_dir': 'a/../../b'}):
+        try:
+            TenantProfile.from_dict(invalid)
+        except ValueError as e:
+            print(f"拒否: {e}")
+        else:
+            raise AssertionError(f"受け付けてしまいました: {invalid}")
+    assert TenantProfile.from_dict({'name': 'desk', 'docs_dir': 'desks/./rates/'}).docs_dir == os.path.join('desks', 'rates')